@@ -0,0 +1,77 @@
+# benchmarks/bench_backtest.py
+# Run from backend/:  python -m benchmarks.bench_backtest
+import time
+import numpy as np
+import pandas as pd
+
+from strategy.engine import run_backtest, BUY, SELL
+
+BUY_THRESHOLD = 0.15
+SELL_THRESHOLD = -0.15
+INITIAL_CAPITAL = 100000.0
+SIZES = [1_000, 10_000, 100_000, 1_000_000]
+# iterrows gets painfully slow past this, so the legacy timing stops here
+LEGACY_MAX_BARS = 100_000
+
+
+def make_bars(n, seed=0):
+    rng = np.random.default_rng(seed)
+    closes = 150 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    scores = np.clip(rng.normal(0, 0.2, n), -1, 1)
+    return pd.DataFrame({"Close": closes, "sentiment_score": scores})
+
+
+def legacy_loop(merged):
+    """The original iterrows loop from simulate_strategy, kept as the reference"""
+    cash = INITIAL_CAPITAL
+    position = 0
+    portfolio_values = []
+    transactions = []
+    for i, row in merged.iterrows():
+        price = row["Close"]
+        score = row["sentiment_score"]
+        if score > BUY_THRESHOLD and cash >= price:
+            qty = int((0.1*cash)//price)
+            if qty > 0:
+                cash -= qty*price
+                position += qty
+                transactions.append((i, BUY, qty, price))
+        elif score < SELL_THRESHOLD and position > 0:
+            cash += position*price
+            transactions.append((i, SELL, position, price))
+            position = 0
+        portfolio_values.append(cash + position*price)
+    return np.array(portfolio_values), transactions
+
+
+def check_parity(merged, result):
+    values, transactions = legacy_loop(merged)
+    assert np.array_equal(values, result["total_value"]), "portfolio values differ"
+    got = list(zip(result["tx_index"].tolist(), result["tx_action"].tolist(),
+                   result["tx_qty"].tolist(), result["tx_price"].tolist()))
+    assert got == transactions, "transactions differ"
+
+
+def main():
+    print(f"{'bars':>10} {'engine (s)':>12} {'legacy (s)':>12} {'speedup':>9}")
+    for n in SIZES:
+        merged = make_bars(n)
+        closes = merged["Close"].to_numpy()
+        scores = merged["sentiment_score"].to_numpy()
+
+        t0 = time.perf_counter()
+        result = run_backtest(closes, scores, BUY_THRESHOLD, SELL_THRESHOLD, INITIAL_CAPITAL)
+        engine_s = time.perf_counter() - t0
+
+        if n <= LEGACY_MAX_BARS:
+            t0 = time.perf_counter()
+            check_parity(merged, result)
+            legacy_s = time.perf_counter() - t0
+            print(f"{n:>10} {engine_s:>12.4f} {legacy_s:>12.4f} {legacy_s / engine_s:>8.1f}x")
+        else:
+            print(f"{n:>10} {engine_s:>12.4f} {'-':>12} {'-':>9}")
+    print("Parity with the legacy loop: OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+# benchmarks/bench_http.py
+# Sentiment API calls for a universe of tickers against a local stub server
+# with fixed latency: bare requests.get per call vs the pooled client vs the
+# concurrent asyncio client. Every ticker's first request gets a 503, so the
+# retry path is exercised too.
+# Run from backend/:  python -m benchmarks.bench_http [n_tickers]
+import json
+import os
+import sys
+import threading
+import time
+from datetime import date, timedelta
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+os.environ.setdefault("HTTP_BACKOFF", "0.01")
+
+import requests  # noqa: E402
+from strategy import http_client  # noqa: E402
+from strategy.backtest import fetch_sentiment, fetch_sentiment_many  # noqa: E402
+
+LATENCY = 0.03  # seconds per response
+DAYS = 30
+CONCURRENCY = 16
+
+
+class StubSentimentApi(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+    disable_nagle_algorithm = True  # headers and body go out in separate writes
+    seen = set()
+    lock = threading.Lock()
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        ticker = parse_qs(url.query).get("ticker", ["?"])[0]
+        with self.lock:
+            first = (url.path, ticker) not in self.seen
+            self.seen.add((url.path, ticker))
+        time.sleep(LATENCY)
+        if first:
+            return self._send(503, b"{}")
+        start = date(2025, 10, 1)
+        seed = sum(map(ord, ticker))
+        rows = [{"date": (start + timedelta(days=i)).isoformat(), "sentiment_score": ((seed * (i + 1)) % 21 - 10) / 10}
+                for i in range(DAYS)]
+        self._send(200, json.dumps(rows).encode())
+
+    def _send(self, status, body):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def bare(base, tickers):
+    """The old way: a fresh connection per call, no retries (so do our own single retry)"""
+    out = []
+    for t in tickers:
+        for _ in range(2):
+            resp = requests.get(f"{base}/sentiment/get_sentiment", params={"ticker": t}, timeout=10)
+            if resp.status_code != 503:
+                break
+        out.append(resp.json())
+    return out
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubSentimentApi)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    http_client.SENTIMENT_API_BASE = base
+    tickers = [f"T{i:04d}" for i in range(n)]
+
+    def run(name, fn):
+        StubSentimentApi.seen.clear()
+        t0 = time.perf_counter()
+        out = fn()
+        elapsed = time.perf_counter() - t0
+        print(f"{name:<28} {elapsed:>8.2f} {n / elapsed:>10.1f}")
+        return out
+
+    print(f"{'client':<28} {'seconds':>8} {'tickers/s':>10}   ({n} tickers, {LATENCY * 1000:.0f} ms latency)")
+    expected = run("bare requests.get (serial)", lambda: bare(base, tickers))
+    pooled = run("pooled session (serial)", lambda: [http_client.get_json("/sentiment/get_sentiment", {"ticker": t})
+                                                    for t in tickers])
+    concurrent = run(f"async, concurrency={CONCURRENCY}", lambda: http_client.get_json_many(
+        "/sentiment/get_sentiment", [{"ticker": t} for t in tickers], concurrency=CONCURRENCY))
+    assert pooled == expected and concurrent == expected, "clients disagree"
+
+    # the DataFrame-level helpers agree too
+    StubSentimentApi.seen.clear()
+    frames = fetch_sentiment_many(tickers[:10], concurrency=CONCURRENCY)
+    for t in tickers[:10]:
+        assert frames[t].equals(fetch_sentiment(t)), t
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+# benchmarks/bench_pipeline.py
+# Serial vs process-pool pipeline on a throwaway SQLite database.
+# Run from backend/:  python -m benchmarks.bench_pipeline [n_tickers] [workers,...]
+import contextlib
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+_tmp = tempfile.mkdtemp(prefix="bench_pipeline_")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp, 'bench.db')}"
+
+from db.db_connect import Base, get_engine, SessionLocal  # noqa: E402
+from db.models import NewsSentiment  # noqa: E402
+from db.rollup import rebuild_daily_sentiment  # noqa: E402
+import run_full_pipeline  # noqa: E402
+
+START, END = "2023-01-01", "2025-01-01"
+WORDS = ["growth", "earnings", "guidance", "probe", "buyback", "layoffs", "record", "downgrade", "upgrade", "demand"]
+
+
+def seed(n_tickers, articles_per_ticker=200, seed=0):
+    rng = random.Random(seed)
+    Base.metadata.create_all(get_engine())
+    start = datetime.strptime(START, "%Y-%m-%d")
+    span = (datetime.strptime(END, "%Y-%m-%d") - start).total_seconds()
+    rows = []
+    for t in range(n_tickers):
+        ticker = f"T{t:04d}"
+        for _ in range(articles_per_ticker):
+            rows.append({
+                "title": f"{ticker} " + " ".join(rng.sample(WORDS, 4)),
+                "sentiment": rng.choice(["Positive", "Negative", "Neutral"]),
+                "confidence": rng.random(),
+                "ticker": ticker,
+                "source": "bench",
+                "created_at": start + timedelta(seconds=rng.random() * span),
+            })
+    session = SessionLocal()
+    session.bulk_insert_mappings(NewsSentiment, rows)
+    session.commit()
+    # the backtests read daily_sentiment, which bulk inserts don't maintain
+    rebuild_daily_sentiment(session)
+    session.close()
+
+
+def timed(fn, *args, **kwargs):
+    t0 = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        out = fn(*args, **kwargs)
+    return time.perf_counter() - t0, out
+
+
+def main():
+    n_tickers = int(sys.argv[1]) if len(sys.argv) > 1 else 64
+    worker_counts = [int(w) for w in sys.argv[2].split(",")] if len(sys.argv) > 2 else [2, 4, os.cpu_count() or 1]
+    seed(n_tickers)
+
+    serial_s, _ = timed(run_full_pipeline.run_pipeline, START, END)
+    print(f"{n_tickers} tickers, cpu_count={os.cpu_count()}")
+    print(f"{'workers':>8} {'seconds':>9} {'tickers/s':>10} {'speedup':>8}")
+    print(f"{'serial':>8} {serial_s:>9.2f} {n_tickers / serial_s:>10.1f} {1.0:>7.2f}x")
+    for workers in sorted(set(worker_counts)):
+        elapsed, results = timed(run_full_pipeline.run_pipeline_parallel, START, END, workers=workers)
+        assert [r[0] for r in results] == sorted(r[0] for r in results)
+        print(f"{workers:>8} {elapsed:>9.2f} {n_tickers / elapsed:>10.1f} {serial_s / elapsed:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+# benchmarks/bench_portfolio.py
+# Run from backend/:  python -m benchmarks.bench_portfolio
+import time
+import tracemalloc
+import numpy as np
+
+from strategy.engine import roi_pct
+from strategy.portfolio import simulate_portfolio
+
+BUY_THRESHOLD = 0.15
+SELL_THRESHOLD = -0.15
+INITIAL_CAPITAL = 1_000_000.0
+SHAPES = [(252, 100), (1_260, 1_000)]  # (bars, tickers); 1,260 bars ~ 5 years daily
+
+
+def make_universe(n_bars, n_tickers, seed=0):
+    rng = np.random.default_rng(seed)
+    start = rng.uniform(20, 500, n_tickers)
+    prices = start * np.exp(np.cumsum(rng.normal(0, 0.02, (n_bars, n_tickers)), axis=0))
+    # news is sparse: most ticker-days have no articles and score 0
+    scores = np.where(rng.random((n_bars, n_tickers)) < 0.2,
+                      np.clip(rng.normal(0, 0.3, (n_bars, n_tickers)), -1, 1), 0.0)
+    return prices, scores
+
+
+def main():
+    print(f"{'bars':>7} {'tickers':>8} {'time (s)':>10} {'peak MB':>9} {'ROI%':>8}")
+    for n_bars, n_tickers in SHAPES:
+        prices, scores = make_universe(n_bars, n_tickers)
+        tracemalloc.start()
+        t0 = time.perf_counter()
+        result = simulate_portfolio(prices, scores, BUY_THRESHOLD, SELL_THRESHOLD, INITIAL_CAPITAL)
+        elapsed = time.perf_counter() - t0
+        peak = tracemalloc.get_traced_memory()[1] / 1e6
+        tracemalloc.stop()
+        roi = roi_pct(result["total_value"])
+        print(f"{n_bars:>7} {n_tickers:>8} {elapsed:>10.3f} {peak:>9.1f} {roi:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+# benchmarks/bench_robustness.py
+# Times strategy.robustness.analyze for 10k scenarios per kind at a few
+# history lengths, inline and over the process pool, after checking that
+# the vectorized backtest matches engine.run_backtest path by path and that
+# the results don't depend on the worker count.
+# Run from backend/:  python -m benchmarks.bench_robustness [--scenarios 10000] [--workers N]
+import argparse
+import os
+import time
+import numpy as np
+
+from strategy import robustness
+from strategy.engine import run_backtest, max_drawdown
+from strategy.robustness import analyze, backtest_paths, bootstrap_paths
+
+BUY_THRESHOLD = 0.15
+SELL_THRESHOLD = -0.15
+INITIAL_CAPITAL = 100000.0
+SIZE_FRACTION = 0.1
+BARS = [42, 252, 1260]  # the default API window, one and five years of trading days
+
+
+def make_series(n, seed=0):
+    rng = np.random.default_rng(seed)
+    closes = 150 * np.exp(np.cumsum(rng.normal(0, 0.015, n)))
+    # persistent sentiment, loosely ahead of the moves
+    scores = np.clip(np.convolve(rng.normal(0, 0.25, n + 4), np.ones(5) / 2.5, "valid"), -1, 1)
+    return closes, scores
+
+
+def check_parity(n_paths=200):
+    closes, scores = make_series(252, seed=1)
+    paths_p, paths_s = bootstrap_paths(closes, scores, n_paths, np.random.default_rng(2), 6)
+    roi, dd = backtest_paths(paths_p, paths_s, BUY_THRESHOLD, SELL_THRESHOLD, INITIAL_CAPITAL, SIZE_FRACTION)
+    for j in range(n_paths):
+        tv = run_backtest(paths_p[:, j], paths_s[:, j], BUY_THRESHOLD, SELL_THRESHOLD,
+                          INITIAL_CAPITAL, SIZE_FRACTION)["total_value"]
+        assert roi[j] == (tv[-1] - tv[0]) / tv[0] * 100, f"ROI differs on path {j}"
+        assert np.isclose(dd[j], max_drawdown(tv) * 100, rtol=0, atol=1e-9), f"drawdown differs on path {j}"
+    print(f"Parity with engine.run_backtest over {n_paths} bootstrap paths: OK")
+
+
+def run(closes, scores, scenarios, parallel):
+    return analyze(closes, scores, BUY_THRESHOLD, SELL_THRESHOLD, INITIAL_CAPITAL, SIZE_FRACTION,
+                   scenarios=scenarios, parallel=parallel)
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.bench_robustness")
+    parser.add_argument("--scenarios", type=int, default=10_000, help="per kind")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+    robustness.ROBUSTNESS_WORKERS = args.workers  # size of the shared pool
+
+    check_parity()
+    closes, scores = make_series(252)
+    assert run(closes, scores, 3000, False) == run(closes, scores, 3000, True), "results depend on workers"
+    print(f"Same results with 1 and {args.workers} workers: OK\n")
+
+    print(f"{'bars':>6} {'scenarios':>10} {'1 worker (s)':>13} {f'{args.workers} workers (s)':>15}")
+    for n in BARS:
+        closes, scores = make_series(n)
+        timings = []
+        for parallel in (False, True):
+            t0 = time.perf_counter()
+            result = run(closes, scores, args.scenarios, parallel)
+            timings.append(time.perf_counter() - t0)
+        print(f"{n:>6} {3 * args.scenarios:>10} {timings[0]:>13.2f} {timings[1]:>15.2f}")
+    print("\nLast run:", result["observed"], "shuffle p-value", result["scenarios"]["shuffle"]["p_value"])
+
+
+if __name__ == "__main__":
+    main()
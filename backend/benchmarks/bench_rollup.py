@@ -0,0 +1,82 @@
+# benchmarks/bench_rollup.py
+# Reading a 5-year backtest's sentiment: raw articles + pandas groupby vs the
+# daily_sentiment rollup.
+# Run from backend/:  python -m benchmarks.bench_rollup
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+_tmp = tempfile.mkdtemp(prefix="bench_rollup_")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp, 'bench.db')}"
+
+import pandas as pd  # noqa: E402
+from db.db_connect import Base, get_engine, SessionLocal  # noqa: E402
+from db.models import NewsSentiment  # noqa: E402
+from db.rollup import rebuild_daily_sentiment  # noqa: E402
+from run_full_pipeline import fetch_sentiment_from_db  # noqa: E402
+
+ARTICLES = [50_000, 250_000]
+START = datetime(2020, 1, 1)
+DAYS = 5 * 365
+REPEATS = 5
+
+
+def add_articles(n, rng):
+    session = SessionLocal()
+    session.bulk_insert_mappings(NewsSentiment, [
+        {
+            "title": "bench", "sentiment": rng.choice(["Positive", "Negative", "Neutral"]),
+            "confidence": rng.random(), "ticker": "AAPL", "source": "bench",
+            "created_at": START + timedelta(seconds=rng.random() * DAYS * 86400),
+        } for _ in range(n)
+    ])
+    session.commit()
+    session.close()
+
+
+def raw_groupby(ticker, start, end):
+    """The pre-rollup read: every article in range, scored and grouped in pandas"""
+    session = SessionLocal()
+    rows = session.query(
+        NewsSentiment.sentiment, NewsSentiment.confidence, NewsSentiment.created_at
+    ).filter(NewsSentiment.ticker == ticker, NewsSentiment.created_at.between(start, end)).all()
+    session.close()
+    data = [{"date": r.created_at.date(),
+             "sentiment_score": (1 if r.sentiment == "Positive" else -1 if r.sentiment == "Negative" else 0) * r.confidence}
+            for r in rows]
+    return pd.DataFrame(data).groupby("date")["sentiment_score"].mean().reset_index()
+
+
+def best_of(fn, *args):
+    best = float("inf")
+    for _ in range(REPEATS):
+        t0 = time.perf_counter()
+        out = fn(*args)
+        best = min(best, time.perf_counter() - t0)
+    return best, out
+
+
+def main():
+    rng = random.Random(0)
+    Base.metadata.create_all(get_engine())
+    start, end = "2020-01-01", (START + timedelta(days=DAYS)).date().isoformat()
+    total = 0
+    print(f"{'articles':>10} {'raw (s)':>9} {'rollup (s)':>11} {'rows':>6} {'speedup':>8}")
+    for target in ARTICLES:
+        add_articles(target - total, rng)
+        total = target
+        session = SessionLocal()
+        rebuild_daily_sentiment(session)
+        session.close()
+
+        raw_s, raw = best_of(raw_groupby, "AAPL", start, end)
+        rollup_s, rolled = best_of(fetch_sentiment_from_db, "AAPL", start, end)
+        assert len(raw) == len(rolled)
+        assert (raw["sentiment_score"] - rolled["sentiment_score"]).abs().max() < 1e-9
+        print(f"{total:>10} {raw_s:>9.3f} {rollup_s:>11.4f} {len(rolled):>6} {raw_s / rollup_s:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
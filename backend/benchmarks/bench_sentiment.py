@@ -0,0 +1,75 @@
+# benchmarks/bench_sentiment.py
+# Run from backend/:  python -m benchmarks.bench_sentiment [n_headlines] [--backends torch,torch-int8,onnx]
+import json
+import resource
+import subprocess
+import sys
+import time
+import random
+
+from sentiment import sentiment_model
+
+BATCH_SIZES = [1, 2, 4, 8, 16, 32, 64]
+
+SUBJECTS = ["Apple", "Tesla", "Alphabet", "Microsoft", "Nvidia", "Amazon", "Meta"]
+EVENTS = [
+    "beats quarterly earnings estimates",
+    "shares slide after weak guidance",
+    "announces new buyback program",
+    "faces regulatory probe over data practices",
+    "holds steady as investors await Fed decision",
+    "raises full-year revenue outlook on strong cloud demand",
+    "cuts jobs amid slowing sales in key markets",
+]
+
+
+def make_headlines(n, seed=0):
+    rng = random.Random(seed)
+    return [f"{rng.choice(SUBJECTS)} {rng.choice(EVENTS)}" for _ in range(n)]
+
+
+def backend_run(backend, n):
+    """One backend in this process: headlines/sec at the default batch size and peak RSS"""
+    sentiment_model.set_backend(backend)
+    headlines = make_headlines(n)
+    sentiment_model.analyze_batch(headlines[:8])  # load + warm-up
+    t0 = time.perf_counter()
+    sentiment_model.analyze_batch(headlines)
+    elapsed = time.perf_counter() - t0
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # KiB on Linux
+    print(json.dumps({"backend": backend, "per_sec": n / elapsed, "peak_mb": peak_mb}))
+
+
+def compare_backends(backends, n):
+    # each backend gets a fresh process so resident memory isn't shared between them
+    print(f"{'backend':<12} {'headlines/sec':>14} {'speedup':>8} {'peak RSS MB':>12}")
+    base = None
+    for backend in backends:
+        out = subprocess.run([sys.executable, "-m", "benchmarks.bench_sentiment", str(n), "--run", backend],
+                             capture_output=True, text=True, check=True).stdout
+        r = json.loads(out.strip().splitlines()[-1])
+        base = base or r["per_sec"]
+        print(f"{backend:<12} {r['per_sec']:>14.1f} {r['per_sec'] / base:>7.2f}x {r['peak_mb']:>12.0f}")
+
+
+def main():
+    args = sys.argv[1:]
+    n = int(args[0]) if args and args[0].isdigit() else 512
+    if "--run" in args:
+        return backend_run(args[args.index("--run") + 1], n)
+    if "--backends" in args:
+        return compare_backends(args[args.index("--backends") + 1].split(","), n)
+
+    headlines = make_headlines(n)
+    sentiment_model.analyze_batch(headlines[:8])  # warm-up
+
+    print(f"{'batch':>6} {'seconds':>9} {'headlines/sec':>14}")
+    for bs in BATCH_SIZES:
+        t0 = time.perf_counter()
+        sentiment_model.analyze_batch(headlines, batch_size=bs)
+        elapsed = time.perf_counter() - t0
+        print(f"{bs:>6} {elapsed:>9.3f} {n / elapsed:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+# benchmarks/bench_serialize.py
+# Cost of building and encoding a /simulate_strategy response: per-row dicts
+# through FastAPI's default JSON path vs orjson, columnar JSON and Arrow IPC.
+# Run from backend/:  python -m benchmarks.bench_serialize
+import time
+import numpy as np
+import pandas as pd
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from strategy.engine import run_backtest
+from run_full_pipeline import _strategy_output, _strategy_columns
+from serialize import encode_json, encode_arrow
+
+SIZES = [1_260, 10_000, 100_000]
+REPEATS = 5
+
+
+def make_result(n, seed=0):
+    rng = np.random.default_rng(seed)
+    merged = pd.DataFrame({
+        "date": pd.date_range("2000-01-01", periods=n).date,
+        "Close": 150 * np.exp(np.cumsum(rng.normal(0, 0.01, n))),
+        "sentiment_score": np.clip(rng.normal(0, 0.2, n), -1, 1),
+    })
+    closes = merged["Close"].to_numpy()
+    scores = merged["sentiment_score"].to_numpy()
+    return merged, closes, scores, run_backtest(closes, scores, 0.15, -0.15, 100000.0)
+
+
+def legacy(args):
+    return JSONResponse(jsonable_encoder(_strategy_output("AAPL", *args))).body
+
+
+def rows_orjson(args):
+    return encode_json(_strategy_output("AAPL", *args))
+
+
+def columns_orjson(args):
+    return encode_json(_strategy_columns("AAPL", *args))
+
+
+def columns_arrow(args):
+    out = _strategy_columns("AAPL", *args)
+    return encode_arrow(out["price_history"], {"metrics": out["metrics"], "transactions": out["transactions"]})
+
+
+def best_of(fn, args):
+    best = float("inf")
+    for _ in range(REPEATS):
+        t0 = time.perf_counter()
+        body = fn(args)
+        best = min(best, time.perf_counter() - t0)
+    return best, len(body)
+
+
+def main():
+    formats = [("rows+json (current)", legacy), ("rows+orjson", rows_orjson),
+               ("columns+orjson", columns_orjson), ("arrow", columns_arrow)]
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        formats.pop()
+        print("[WARN] pyarrow not installed, skipping Arrow")
+
+    print(f"{'bars':>8} {'format':<20} {'build+encode ms':>16} {'KB':>9}")
+    for n in SIZES:
+        args = make_result(n)
+        # the columnar payload carries the same values as the per-row one
+        rows = _strategy_output("AAPL", *args)["price_history"]
+        cols = _strategy_columns("AAPL", *args)["price_history"]
+        for field in cols:
+            assert [r[field] for r in rows] == list(cols[field]), field
+        for name, fn in formats:
+            seconds, size = best_of(fn, args)
+            print(f"{n:>8} {name:<20} {seconds * 1000:>16.1f} {size / 1024:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
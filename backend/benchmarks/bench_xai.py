@@ -0,0 +1,69 @@
+# benchmarks/bench_xai.py
+# /xai latency as a ticker's article history grows.
+# Run from backend/:  python -m benchmarks.bench_xai
+import os
+import itertools
+import random
+import string
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+_tmp = tempfile.mkdtemp(prefix="bench_xai_")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp, 'bench.db')}"
+# measure the query path, not the response cache
+os.environ["RESPONSE_CACHE_TTL"] = "0"
+
+from fastapi.testclient import TestClient  # noqa: E402
+from db.db_connect import Base, get_engine, SessionLocal  # noqa: E402
+from db.models import NewsSentiment  # noqa: E402
+from db.keywords import index_articles  # noqa: E402
+from db.rollup import rollup_articles  # noqa: E402
+import main  # noqa: E402
+
+HISTORY_STEPS = [1_000, 10_000, 50_000, 100_000]
+REQUESTS = 20
+WINDOW_START = datetime(2025, 10, 1)
+WINDOW_DAYS = 42
+VOCAB = ["".join(w) for w in itertools.islice(itertools.product(string.ascii_lowercase, repeat=4), 2000)]
+
+
+def add_articles(n, rng):
+    rows = []
+    for _ in range(n):
+        rows.append(NewsSentiment(
+            title="AAPL " + " ".join(rng.sample(VOCAB, 6)),
+            sentiment=rng.choice(["Positive", "Negative", "Neutral"]),
+            confidence=rng.random(),
+            ticker="AAPL",
+            source="bench",
+            created_at=WINDOW_START + timedelta(seconds=rng.random() * WINDOW_DAYS * 86400),
+        ))
+    session = SessionLocal()
+    session.add_all(rows)
+    index_articles(session, rows)
+    rollup_articles(session, rows)
+    session.commit()
+    session.close()
+
+
+def main_bench():
+    rng = random.Random(0)
+    Base.metadata.create_all(get_engine())
+    client = TestClient(main.app)
+    total = 0
+    print(f"{'articles':>10} {'p50 ms':>8} {'max ms':>8}")
+    for target in HISTORY_STEPS:
+        add_articles(target - total, rng)
+        total = target
+        times = []
+        for _ in range(REQUESTS):
+            t0 = time.perf_counter()
+            assert client.get("/xai/AAPL").status_code == 200
+            times.append((time.perf_counter() - t0) * 1000)
+        times.sort()
+        print(f"{total:>10} {times[len(times) // 2]:>8.1f} {times[-1]:>8.1f}")
+
+
+if __name__ == "__main__":
+    main_bench()
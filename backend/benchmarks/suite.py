@@ -0,0 +1,181 @@
+# benchmarks/suite.py
+# Seeds synthetic data at several scales and times the pipeline functions and
+# every FastAPI endpoint (through the test client). Emits JSON so runs from
+# different commits can be diffed.
+# Run from backend/:
+#   python -m benchmarks.suite [--scales small,medium] [--repeats 5] [--out results.json]
+#   python -m benchmarks.suite --compare base.json new.json [--threshold 1.2]
+# Uses a throwaway SQLite file unless --database-url is given (it is wiped).
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+SCALES = {
+    # tickers, days, mean articles per ticker-day
+    "small": (10, 90, 5),
+    "medium": (50, 365, 10),
+    "large": (200, 1260, 10),
+}
+PIPELINE_WINDOW = ("2025-10-01", "2025-11-12")
+
+
+def _configure(database_url):
+    os.environ["DATABASE_URL"] = database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='bench_suite_'), 'bench.db')}"
+    # time the real work, not cache hits
+    os.environ["RESPONSE_CACHE_TTL"] = "0"
+
+
+def _timed(fn, repeats):
+    times = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - t0) * 1000)
+    times.sort()
+    return {
+        "p50_ms": round(statistics.median(times), 3),
+        "p95_ms": round(times[min(len(times) - 1, int(round(0.95 * (len(times) - 1))))], 3),
+        "mean_ms": round(statistics.fmean(times), 3),
+        "repeats": repeats,
+    }
+
+
+def _quiet(fn):
+    """run_pipeline and friends print per ticker; keep that out of the timings' output"""
+    def wrapped():
+        with contextlib.redirect_stdout(io.StringIO()):
+            return fn()
+    return wrapped
+
+
+def _ok(client_call):
+    def wrapped():
+        r = client_call()
+        assert r.status_code < 400, (r.status_code, r.text[:200])
+        return r
+    return wrapped
+
+
+def run_scale(name, repeats):
+    from fastapi.testclient import TestClient
+    from db.db_connect import Base, get_engine, SessionLocal
+    from db.migrate import migrate
+    import run_full_pipeline as rfp
+    import main
+    from benchmarks.synthetic import seed_database, ticker_names
+
+    n_tickers, n_days, per_day = SCALES[name]
+    engine = get_engine()
+    Base.metadata.drop_all(engine)
+    with contextlib.redirect_stdout(io.StringIO()):
+        migrate(engine)
+    session = SessionLocal()
+    try:
+        seeded = seed_database(session, n_tickers, n_days, per_day)
+    finally:
+        session.close()
+
+    ticker = ticker_names(1)[0]  # the generator's first (and a typical) ticker
+    start, end = PIPELINE_WINDOW
+    client = TestClient(main.app)
+
+    cases = {
+        "simulate_strategy": _quiet(lambda: rfp.simulate_strategy(ticker, start, end)),
+        "simulate_strategy_full_history": _quiet(lambda: rfp.simulate_strategy(ticker, "2000-01-01", end)),
+        "generate_xai_sentences": lambda: rfp.generate_xai_sentences(ticker, start, end),
+        "run_pipeline": _quiet(lambda: rfp.run_pipeline(start, end)),
+        "GET /fetch_news": _ok(lambda: client.get(f"/fetch_news/{ticker}?days=3650")),
+        "GET /fetch_news ndjson": _ok(lambda: client.get(f"/fetch_news/{ticker}?days=3650&format=ndjson")),
+        "GET /sentiment_score": _ok(lambda: client.get(f"/sentiment_score/{ticker}?days=3650")),
+        "GET /market_mood": _ok(lambda: client.get(f"/market_mood/{ticker}?days=3650")),
+        "GET /ticker_summary": _ok(lambda: client.get(f"/ticker_summary/{ticker}?days=3650")),
+        "GET /xai": _ok(lambda: client.get(f"/xai/{ticker}")),
+        "POST /simulate_strategy": _ok(lambda: client.post(
+            "/simulate_strategy", json={"ticker": ticker, "start": start, "end": end})),
+        "POST /simulate_portfolio": _ok(lambda: client.post(
+            "/simulate_portfolio", json={"start": start, "end": end})),
+        "POST /sweep": _ok(lambda: client.post("/sweep", json={"tickers": [ticker], "start": start, "end": end})),
+    }
+    results = {}
+    for case, fn in cases.items():
+        fn()  # warm-up (imports, first connection, plan cache)
+        results[case] = _timed(fn, 1 if case == "run_pipeline" else repeats)
+        print(f"[INFO] {name:<7} {case:<32} p50 {results[case]['p50_ms']:>10.2f} ms", file=sys.stderr)
+    return {
+        "params": {"tickers": n_tickers, "days": n_days, "per_day": per_day},
+        "seed": seeded,
+        "results": results,
+    }
+
+
+def _commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def compare(base_path, new_path, threshold):
+    """Print p50 ratios new/base; returns 1 if any case got slower than `threshold`x"""
+    with open(base_path) as f:
+        base = json.load(f)
+    with open(new_path) as f:
+        new = json.load(f)
+    print(f"{base.get('commit')} -> {new.get('commit')}")
+    print(f"{'scale':<8} {'case':<32} {'base ms':>10} {'new ms':>10} {'ratio':>7}")
+    regressed = False
+    for scale, data in new["scales"].items():
+        for case, r in data["results"].items():
+            b = base["scales"].get(scale, {}).get("results", {}).get(case)
+            if b is None:
+                continue
+            ratio = r["p50_ms"] / b["p50_ms"] if b["p50_ms"] else float("inf")
+            flag = " REGRESSED" if ratio > threshold else ""
+            regressed |= ratio > threshold
+            print(f"{scale:<8} {case:<32} {b['p50_ms']:>10.2f} {r['p50_ms']:>10.2f} {ratio:>6.2f}x{flag}")
+    return 1 if regressed else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.suite")
+    parser.add_argument("--scales", default="small,medium")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--database-url", default=None, help="database to wipe and seed (default: temp SQLite)")
+    parser.add_argument("--out", default=None, help="write JSON here instead of stdout")
+    parser.add_argument("--compare", nargs=2, metavar=("BASE", "NEW"))
+    parser.add_argument("--threshold", type=float, default=1.2, help="--compare fails above this p50 ratio")
+    args = parser.parse_args()
+
+    if args.compare:
+        return compare(*args.compare, args.threshold)
+
+    _configure(args.database_url)
+    report = {
+        "commit": _commit(),
+        "timestamp": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "database": os.environ["DATABASE_URL"].split(":", 1)[0],
+        "scales": {name: run_scale(name, args.repeats) for name in args.scales.split(",")},
+    }
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
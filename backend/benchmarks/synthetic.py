@@ -0,0 +1,142 @@
+# benchmarks/synthetic.py
+# Seed news_sentiment (and its derived tables) with synthetic but plausibly
+# shaped data: N tickers x M days x ~K articles per ticker-day.
+# Run from backend/:  python -m benchmarks.synthetic --tickers 50 --days 365 --per-day 10 [--seed 0]
+# Writes to DATABASE_URL (SQLite or Postgres).
+import argparse
+import hashlib
+import time
+from datetime import date, datetime, timedelta
+import numpy as np
+
+# The /xai endpoint reads a fixed 2025-10-01..2025-11-12 window, so data ends there
+END_DATE = date(2025, 11, 12)
+INSERT_CHUNK = 5_000
+LABELS = ["Positive", "Negative", "Neutral"]
+
+SUBJECTS = ["shares", "stock", "revenue", "earnings", "guidance", "margins", "outlook", "sales", "demand", "profit"]
+UP = ["beat", "surge", "rally", "jump", "climb", "record", "upgrade", "strong", "raise", "growth"]
+DOWN = ["miss", "slide", "plunge", "drop", "fall", "downgrade", "weak", "cut", "probe", "recall"]
+FLAT = ["steady", "unchanged", "await", "ahead", "hold", "expected", "meeting", "report", "schedule", "flat"]
+CONTEXT = ["analysts", "investors", "quarter", "market", "regulators", "china", "cloud", "chips", "consumer", "fed"]
+
+
+def ticker_names(n):
+    letters = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+    return ["".join(letters[(i // 26 ** k) % 26] for k in reversed(range(4))) for i in range(n)]
+
+
+def generate_rows(n_tickers, n_days, per_day, seed=0, end=END_DATE):
+    """
+    Yield article dicts ticker by ticker.
+
+    - popularity: each ticker's mean articles/day is per_day scaled by a
+      lognormal factor, so a few names get most of the coverage
+    - volume: Poisson per day around that mean, busier on weekdays
+    - mood: a per-ticker AR(1) latent drives the Positive/Negative/Neutral
+      mix, so sentiment is persistent across days, not white noise
+    - confidence: Beta(5, 2), skewed high like FinBERT's softmax scores
+    - time of day: clustered around US market hours
+    """
+    rng = np.random.default_rng(seed)
+    start = end - timedelta(days=n_days - 1)
+    days = [start + timedelta(days=d) for d in range(n_days)]
+    weekday = np.array([1.0 if d.weekday() < 5 else 0.35 for d in days])
+    popularity = rng.lognormal(0.0, 0.75, n_tickers)
+    popularity *= n_tickers / popularity.sum()
+
+    for t, ticker in enumerate(ticker_names(n_tickers)):
+        counts = rng.poisson(per_day * popularity[t] * weekday)
+        mood = np.empty(n_days)
+        level = rng.normal(0, 0.5)
+        for d in range(n_days):
+            level = 0.9 * level + rng.normal(0, 0.3)
+            mood[d] = level
+        n = int(counts.sum())
+        if n == 0:
+            continue
+        day_of = np.repeat(np.arange(n_days), counts)
+        m = mood[day_of]
+        logits = np.stack([m, -m, np.full(n, 0.3)], axis=1)
+        probs = np.exp(logits) / np.exp(logits).sum(axis=1, keepdims=True)
+        label_idx = (rng.random(n)[:, None] > np.cumsum(probs, axis=1)).sum(axis=1)
+        confidence = np.round(rng.beta(5, 2, n), 3)
+        seconds = np.clip(rng.normal(14.5, 3.0, n), 0, 23.99) * 3600
+        words = rng.integers(0, 10, (n, 4))
+
+        for i in range(n):
+            kind = label_idx[i]
+            verbs = UP if kind == 0 else DOWN if kind == 1 else FLAT
+            w = words[i]
+            title = f"{ticker} {SUBJECTS[w[0]]} {verbs[w[1]]} as {CONTEXT[w[2]]} {verbs[w[3]]}"
+            created = datetime.combine(days[day_of[i]], datetime.min.time()) + timedelta(seconds=float(seconds[i]))
+            url = f"https://news.example.com/{ticker}/{day_of[i]}/{i}"
+            yield {
+                "title": title,
+                "sentiment": LABELS[kind],
+                "confidence": float(confidence[i]),
+                "ticker": ticker,
+                "source": "synthetic",
+                "created_at": created,
+                "url": url,
+                "dedup_key": hashlib.sha1(f"{ticker}|{url}".encode()).hexdigest(),
+            }
+
+
+def seed_database(session, n_tickers, n_days, per_day, seed=0, end=END_DATE):
+    """Bulk-insert the rows, then rebuild daily_sentiment and keyword_daily. Returns counts/timings."""
+    from db.models import NewsSentiment, NewsKey
+    from db.partitions import ensure_partitions, months_between
+    from db.rollup import rebuild_daily_sentiment
+    from db.keywords import rebuild_keyword_index
+
+    t0 = time.perf_counter()
+    # no-op on SQLite; on a partitioned Postgres table every month needs its partition first
+    ensure_partitions(session, months_between(end - timedelta(days=n_days - 1), end))
+
+    def flush(chunk):
+        session.execute(NewsSentiment.__table__.insert(), chunk)
+        session.execute(NewsKey.__table__.insert(), [{"dedup_key": r["dedup_key"]} for r in chunk])
+
+    total = 0
+    chunk = []
+    for row in generate_rows(n_tickers, n_days, per_day, seed, end):
+        chunk.append(row)
+        if len(chunk) >= INSERT_CHUNK:
+            flush(chunk)
+            total += len(chunk)
+            chunk = []
+    if chunk:
+        flush(chunk)
+        total += len(chunk)
+    session.commit()
+    insert_s = time.perf_counter() - t0
+
+    t1 = time.perf_counter()
+    rebuild_daily_sentiment(session)
+    rebuild_keyword_index(session)
+    return {"articles": total, "insert_seconds": round(insert_s, 3),
+            "derived_seconds": round(time.perf_counter() - t1, 3)}
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.synthetic")
+    parser.add_argument("--tickers", type=int, default=20)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--per-day", type=float, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    from db.db_connect import SessionLocal
+    from db.migrate import migrate
+    import response_cache  # noqa: F401 (the rebuilds invalidate a shared cache)
+    migrate()
+    session = SessionLocal()
+    try:
+        print(seed_database(session, args.tickers, args.days, args.per_day, args.seed))
+    finally:
+        session.close()
+
+
+if __name__ == "__main__":
+    main()
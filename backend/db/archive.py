@@ -0,0 +1,237 @@
+# db/archive.py
+# Retention for news_sentiment: months older than NEWS_RETENTION_MONTHS are
+# written to Parquet under NEWS_ARCHIVE_DIR, then dropped from the database
+# (a whole partition at a time on Postgres). daily_sentiment and
+# keyword_daily keep their rows, so backtests, scores and XAI keywords over
+# archived months read exactly what they did before; read_news() and
+# rebuild_archived_rollup() go back to the archived articles themselves.
+# Needs pyarrow. Run from backend/ (e.g. daily from cron):
+#   python -m db.archive run [--keep-months N] [--dry-run]
+#   python -m db.archive rollup [TICKER]
+import argparse
+import os
+import sys
+from datetime import datetime, time
+from sqlalchemy import func
+from db import changes
+from db.db_connect import SessionLocal
+from db.models import NewsSentiment, NewsContent, NewsArchive, DailySentiment
+from db.partitions import (archive_horizon, add_months, drop_month, ensure_upcoming, month_bounds,
+                           month_start, months_between)
+from db.rollup import rollup_articles
+
+NEWS_RETENTION_MONTHS = int(os.getenv("NEWS_RETENTION_MONTHS", "0"))  # full months kept besides the current one; 0 keeps everything
+NEWS_ARCHIVE_DIR = os.getenv("NEWS_ARCHIVE_DIR", "./data/archive")
+ARCHIVE_BATCH = 10_000  # rows per Parquet row group
+
+COLUMNS = ["id", "ticker", "title", "content", "sentiment", "confidence", "source", "url", "dedup_key", "created_at"]
+
+
+def _schema():
+    import pyarrow as pa
+    return pa.schema([
+        ("id", pa.int64()), ("ticker", pa.string()), ("title", pa.string()), ("content", pa.string()),
+        ("sentiment", pa.string()), ("confidence", pa.float64()), ("source", pa.string()),
+        ("url", pa.string()), ("dedup_key", pa.string()), ("created_at", pa.timestamp("us")),
+    ])
+
+
+def _root(archive_dir):
+    return os.path.join(archive_dir, NewsSentiment.__tablename__)
+
+
+# ----------------------------
+# Writing
+# ----------------------------
+def archive_month(session, month, archive_dir=NEWS_ARCHIVE_DIR):
+    """
+    Copy one month of articles (bodies included) to a new Parquet file under
+    <archive_dir>/news_sentiment/month=YYYY-MM/, then drop them from the
+    database. Articles ingested late for an already archived month just add
+    another file there. Returns the number of rows archived.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    lo, hi = month_bounds(month)
+    query = session.query(
+        *[getattr(NewsSentiment, c) for c in COLUMNS if c != "content"], NewsContent.content
+    ).outerjoin(NewsContent, NewsContent.id == NewsSentiment.id).filter(
+        NewsSentiment.created_at >= lo, NewsSentiment.created_at < hi
+    ).order_by(NewsSentiment.id)
+
+    directory = os.path.join(_root(archive_dir), f"month={month:%Y-%m}")
+    os.makedirs(directory, exist_ok=True)
+    name = f"part-{datetime.utcnow():%Y%m%dT%H%M%S%f}.parquet"
+    path = os.path.join(directory, name)
+    tmp = os.path.join(directory, f".{name}.tmp")  # dot-prefixed, so readers skip it
+
+    schema = _schema()
+    n = 0
+    tickers = set()
+    with pq.ParquetWriter(tmp, schema, compression="zstd") as writer:
+        batch = []
+        for row in query.yield_per(ARCHIVE_BATCH):
+            batch.append(row)
+            tickers.add(row.ticker)
+            if len(batch) >= ARCHIVE_BATCH:
+                writer.write_batch(pa.RecordBatch.from_pylist([r._asdict() for r in batch], schema=schema))
+                n += len(batch)
+                batch = []
+        if batch:
+            writer.write_batch(pa.RecordBatch.from_pylist([r._asdict() for r in batch], schema=schema))
+            n += len(batch)
+    if n == 0:
+        os.remove(tmp)
+        return 0
+
+    os.replace(tmp, path)
+    try:
+        drop_month(session, month)
+        session.add(NewsArchive(month=month, path=path, n_rows=n))
+        session.commit()
+    except Exception:
+        # the rows are still in the database; don't leave a second copy behind
+        session.rollback()
+        os.remove(path)
+        raise
+    # /fetch_news for these tickers no longer returns the month
+    changes.changed(tickers)
+    print(f"[INFO] Archived {n} articles from {month:%Y-%m} to {path}")
+    return n
+
+
+def apply_retention(session, keep_months=NEWS_RETENTION_MONTHS, today=None, archive_dir=NEWS_ARCHIVE_DIR,
+                    dry_run=False):
+    """
+    Archive every month before the retention window, oldest first, and make
+    sure the upcoming partitions exist. Returns [{"month", "rows"}].
+    """
+    done = []
+    if keep_months > 0:
+        cutoff = add_months(month_start(today or datetime.utcnow().date()), -keep_months)
+        oldest = session.query(func.min(NewsSentiment.created_at)).scalar()
+        if oldest is not None and oldest.date() < cutoff:
+            for month in months_between(oldest, add_months(cutoff, -1)):
+                if dry_run:
+                    lo, hi = month_bounds(month)
+                    rows = session.query(func.count(NewsSentiment.id)).filter(
+                        NewsSentiment.created_at >= lo, NewsSentiment.created_at < hi
+                    ).scalar()
+                else:
+                    rows = archive_month(session, month, archive_dir)
+                if rows:
+                    done.append({"month": f"{month:%Y-%m}", "rows": rows})
+    if not dry_run:
+        ensure_upcoming(session)
+        session.commit()
+    return done
+
+
+# ----------------------------
+# Reading
+# ----------------------------
+def read_news(tickers=None, start=None, end=None, columns=None, archive_dir=NEWS_ARCHIVE_DIR):
+    """
+    Archived articles as a DataFrame: tickers matched case-insensitively,
+    created_at in [start, end) (datetimes or dates; None = unbounded).
+    """
+    import pandas as pd
+    import pyarrow.compute as pc
+    import pyarrow.dataset as ds
+
+    columns = list(columns or COLUMNS)
+    root = _root(archive_dir)
+    if not os.path.isdir(root):
+        return pd.DataFrame(columns=columns)
+
+    dataset = ds.dataset(root, format="parquet", partitioning="hive")
+    condition = None
+
+    def both(expr):
+        return expr if condition is None else condition & expr
+
+    if tickers:
+        condition = both(pc.utf8_upper(ds.field("ticker")).isin([t.upper() for t in tickers]))
+    if start is not None:
+        start = pd.Timestamp(start).to_pydatetime()
+        # month=YYYY-MM sorts like the date, so whole directories are skipped
+        condition = both((ds.field("month") >= f"{start:%Y-%m}") & (ds.field("created_at") >= start))
+    if end is not None:
+        end = pd.Timestamp(end).to_pydatetime()
+        condition = both((ds.field("month") <= f"{end:%Y-%m}") & (ds.field("created_at") < end))
+    return dataset.to_table(columns=columns, filter=condition).to_pandas()
+
+
+def latest_headlines(session, ticker, start, end, limit=None):
+    """
+    Archived (title, sentiment, created_at) rows for `ticker` with created_at
+    in [start, end) (datetimes), newest first, at most `limit` of them;
+    empty when the window is all in the database.
+    """
+    horizon = archive_horizon(session)
+    if horizon is None or start >= datetime.combine(horizon, time.min):
+        return []
+    end = min(end, datetime.combine(horizon, time.min))
+    frame = read_news([ticker], start, end, ["id", "ticker", "title", "sentiment", "created_at"])
+    # exact ticker, like the database query it complements
+    frame = frame[frame["ticker"] == ticker]
+    frame = frame.sort_values(["created_at", "id"], ascending=False)
+    if limit is not None:
+        frame = frame.head(limit)
+    return list(frame[["title", "sentiment", "created_at"]].itertuples(index=False))
+
+
+def rebuild_archived_rollup(session, ticker=None, archive_dir=NEWS_ARCHIVE_DIR):
+    """
+    Recompute daily_sentiment before the archive horizon from the Parquet
+    files (plus any late articles for those months still in the database),
+    the counterpart of rollup.rebuild_daily_sentiment for archived days.
+    """
+    horizon = archive_horizon(session)
+    if horizon is None:
+        return 0
+    archived = read_news([ticker] if ticker else None, None, horizon,
+                         ["ticker", "sentiment", "confidence", "created_at"], archive_dir)
+    late = session.query(
+        NewsSentiment.ticker, NewsSentiment.sentiment, NewsSentiment.confidence, NewsSentiment.created_at
+    ).filter(NewsSentiment.created_at < datetime.combine(horizon, time.min))
+    wipe = session.query(DailySentiment).filter(DailySentiment.day < horizon)
+    if ticker:
+        late = late.filter(func.upper(NewsSentiment.ticker) == ticker.upper())
+        wipe = wipe.filter(DailySentiment.ticker == ticker.upper())
+    wipe.delete(synchronize_session=False)
+    articles = list(archived.itertuples(index=False)) + late.all()
+    rollup_articles(session, articles)
+    session.commit()
+    changes.changed([ticker] if ticker else None)
+    return len(articles)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m db.archive")
+    sub = parser.add_subparsers(dest="command", required=True)
+    run = sub.add_parser("run", help="archive months older than the retention window")
+    run.add_argument("--keep-months", type=int, default=NEWS_RETENTION_MONTHS)
+    run.add_argument("--archive-dir", default=NEWS_ARCHIVE_DIR)
+    run.add_argument("--dry-run", action="store_true", help="only report what would be archived")
+    rollup = sub.add_parser("rollup", help="rebuild daily_sentiment for archived days from the Parquet files")
+    rollup.add_argument("ticker", nargs="?")
+    rollup.add_argument("--archive-dir", default=NEWS_ARCHIVE_DIR)
+    args = parser.parse_args(argv)
+
+    import response_cache  # noqa: F401 (invalidates a shared cache after archiving)
+    session = SessionLocal()
+    try:
+        if args.command == "run":
+            for m in apply_retention(session, args.keep_months, archive_dir=args.archive_dir, dry_run=args.dry_run):
+                print(f"{m['month']}  {m['rows']} articles{' (dry run)' if args.dry_run else ''}")
+        else:
+            print(f"[INFO] Rolled up {rebuild_archived_rollup(session, args.ticker, args.archive_dir)} archived articles")
+    finally:
+        session.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
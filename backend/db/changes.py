@@ -0,0 +1,21 @@
+# db/changes.py
+# Change notifications for news_sentiment and the tables derived from it.
+# Rebuilds and retention call changed() after they commit; the response
+# cache subscribes (see response_cache.py), so db/ never imports app modules.
+# A CLI that writes these tables and should invalidate a shared (Redis)
+# cache has to import response_cache first, so its listener is registered.
+_listeners = []
+
+
+def subscribe(fn):
+    """fn(tickers) is called after each change; tickers=None means any ticker"""
+    _listeners.append(fn)
+    return fn
+
+
+def changed(tickers=None):
+    tickers = None if tickers is None else {t.upper() for t in tickers if t}
+    if tickers is not None and not tickers:
+        return
+    for fn in _listeners:
+        fn(tickers)
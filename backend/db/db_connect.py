@@ -1,27 +1,81 @@
 import os
+import threading
+from contextlib import contextmanager
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 from dotenv import load_dotenv
+from db import pool
 
 # Load environment variables (local only, Render ignores .env)
 load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL")
 
-if not DATABASE_URL:
-    raise RuntimeError("DATABASE_URL is not set")
+# Connection pool sizing, per worker process
+POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+
+# The engine is created on first use, so importing this module (or anything
+# that only needs the models) does not require a database to be configured.
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_engine():
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                if not DATABASE_URL:
+                    raise RuntimeError("DATABASE_URL is not set")
+                _engine = create_engine(DATABASE_URL, **_pool_options(DATABASE_URL))
+                pool.instrument(_engine)
+    return _engine
+
+
+def reset_engine():
+    """
+    Forget this process's engine so the next get_engine() builds a new one.
+    Call it in a forked worker: the parent's pooled connections must not be reused.
+    """
+    global _engine
+    with _engine_lock:
+        if _engine is not None:
+            _engine.dispose(close=False)
+        _engine = None
+
+
+def _pool_options(url):
+    options = {"pool_pre_ping": True}
+    # In-memory SQLite has to share a single connection, so it keeps SQLAlchemy's default pool
+    if url == "sqlite://" or (url.startswith("sqlite") and ":memory:" in url):
+        return options
+    options.update(
+        poolclass=pool.TimedQueuePool,
+        pool_size=POOL_SIZE,
+        max_overflow=MAX_OVERFLOW,
+        pool_recycle=POOL_RECYCLE,
+        pool_timeout=POOL_TIMEOUT,
+    )
+    return options
+
+
+def pool_stats():
+    return pool.metrics.snapshot(get_engine().pool)
 
-engine = create_engine(
-    DATABASE_URL,
-    pool_pre_ping=True
-)
 
-SessionLocal = sessionmaker(
+_session_factory = sessionmaker(
     autocommit=False,
-    autoflush=False,
-    bind=engine
+    autoflush=False
 )
 
+
+def SessionLocal():
+    return _session_factory(bind=get_engine())
+
+
 Base = declarative_base()
 
 def get_db():
@@ -32,3 +86,14 @@ def get_db():
         db.close()
 
 
+@contextmanager
+def session_scope(db=None):
+    """Use the caller's session if given, otherwise open one and close it afterwards"""
+    if db is not None:
+        yield db
+        return
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
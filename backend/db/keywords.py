@@ -1,5 +1,14 @@
+import heapq
+import re
+from collections import defaultdict
+from datetime import datetime, time
+from sqlalchemy import func
+from db import changes
 from db.db_connect import SessionLocal
-from db.models import KeywordImportance
+from db.models import KeywordImportance, KeywordDaily, NewsSentiment
+from db.partitions import archive_horizon
+from db.rollup import sentiment_sign
+from db.upsert import upsert_add
 
 def store_keywords(ticker, keywords):
     """
@@ -10,4 +19,98 @@ def store_keywords(ticker, keywords):
         db.add(KeywordImportance(ticker=ticker, word=k["word"], score=k["score"]))
     db.commit()
     db.close()
-from db.db_connect import SessionLocal
+
+
+# ----------------------------
+# Incremental keyword index (keyword_daily)
+# ----------------------------
+def tokenize(text):
+    return re.findall(r'\b[a-z]{3,}\b', (text or "").lower())
+
+def keyword_deltas(articles):
+    """
+    Fold articles (objects with ticker, title, sentiment, confidence, created_at)
+    into {(TICKER, day, keyword): [score, mentions]}.
+    """
+    deltas = defaultdict(lambda: [0.0, 0])
+    for a in articles:
+        score = sentiment_sign(a.sentiment) * float(a.confidence or 0.0)
+        key_prefix = (a.ticker.upper(), a.created_at.date())
+        for t in set(tokenize(a.title)):
+            d = deltas[key_prefix + (t,)]
+            d[0] += score
+            d[1] += 1
+    return deltas
+
+def index_articles(session, articles):
+    """Add newly ingested articles to keyword_daily (caller commits)"""
+    rows = [
+        {"ticker": ticker, "day": day, "keyword": kw, "score": score, "mentions": mentions}
+        for (ticker, day, kw), (score, mentions) in keyword_deltas(articles).items()
+    ]
+    upsert_add(session, KeywordDaily, rows, ["ticker", "day", "keyword"], ["score", "mentions"])
+
+def rebuild_keyword_index(session, ticker=None, batch_size=5000):
+    """
+    Recompute keyword_daily from news_sentiment, for one ticker or all of
+    them. Days before the archive horizon keep their existing totals.
+    """
+    wipe = session.query(KeywordDaily)
+    query = session.query(
+        NewsSentiment.ticker, NewsSentiment.title, NewsSentiment.sentiment,
+        NewsSentiment.confidence, NewsSentiment.created_at
+    )
+    if ticker:
+        wipe = wipe.filter(KeywordDaily.ticker == ticker.upper())
+        query = query.filter(func.upper(NewsSentiment.ticker) == ticker.upper())
+    horizon = archive_horizon(session)
+    if horizon:
+        wipe = wipe.filter(KeywordDaily.day >= horizon)
+        query = query.filter(NewsSentiment.created_at >= datetime.combine(horizon, time.min))
+    wipe.delete(synchronize_session=False)
+
+    batch = []
+    for row in query.yield_per(batch_size):
+        if row.ticker is None or row.created_at is None:
+            continue
+        batch.append(row)
+        if len(batch) >= batch_size:
+            index_articles(session, batch)
+            batch = []
+    index_articles(session, batch)
+    session.commit()
+    changes.changed([ticker] if ticker else None)
+
+def top_keywords(session, ticker, start, end, top_n=10):
+    """
+    Top keywords by |score| for created_at in [start, end): sums the daily
+    buckets in SQL and keeps the top_n with a heap.
+    """
+    rows = session.query(
+        KeywordDaily.keyword, func.sum(KeywordDaily.score)
+    ).filter(
+        KeywordDaily.ticker == ticker.upper(),
+        KeywordDaily.day >= start,
+        KeywordDaily.day < end
+    ).group_by(KeywordDaily.keyword)
+    best = heapq.nlargest(top_n, rows, key=lambda r: abs(r[1] or 0.0))
+    return [{"word": k, "score": round(float(v), 3)} for k, v in best]
+
+def rank_keywords(articles, top_n=10):
+    """top_keywords computed in memory from articles, for windows the index doesn't cover"""
+    totals = defaultdict(float)
+    for (_, _, keyword), (score, _) in keyword_deltas(articles).items():
+        totals[keyword] += score
+    best = heapq.nlargest(top_n, totals.items(), key=lambda kv: abs(kv[1]))
+    return [{"word": k, "score": round(float(v), 3)} for k, v in best]
+
+
+if __name__ == "__main__":
+    # Backfill keyword_daily from news_sentiment:  python -m db.keywords [TICKER]
+    import sys
+    import response_cache  # noqa: F401 (invalidates a shared cache after the rebuild)
+    db = SessionLocal()
+    try:
+        rebuild_keyword_index(db, sys.argv[1] if len(sys.argv) > 1 else None)
+    finally:
+        db.close()
@@ -0,0 +1,129 @@
+# db/migrate.py
+# Bring an existing database up to the current models.
+# Run from backend/:  python -m db.migrate [--check]
+import sys
+from datetime import date
+from sqlalchemy import text, inspect
+from sqlalchemy.schema import CreateIndex
+from sqlalchemy.orm import Session
+from db.db_connect import get_engine, Base, SessionLocal
+from db import models  # noqa: F401 (registers the tables on Base)
+from db.models import NewsSentiment, NewsContent, NewsKey, DailySentiment
+from db.partitions import TABLE, is_partitioned, create_partitioned_table, convert_to_partitioned, ensure_upcoming
+from db.rollup import rebuild_daily_sentiment, rollup_in_sync
+from db.keywords import rebuild_keyword_index
+from db.queries import ticker_window_filter
+
+
+def migrate(engine=None):
+    """
+    Create missing tables, then any indexes declared on the models that an
+    older table doesn't have yet. On Postgres news_sentiment is created (or
+    converted) as a monthly partitioned table. Safe to run repeatedly.
+    """
+    engine = engine or get_engine()
+    had_rollup = inspect(engine).has_table(DailySentiment.__tablename__)
+    had_keys = inspect(engine).has_table(NewsKey.__tablename__)
+    with engine.begin() as conn:
+        _prepare_news_table(conn)
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        _add_missing_columns(conn)
+        _split_content(conn)
+        # dedup uniqueness moved to news_keys
+        conn.execute(text("DROP INDEX IF EXISTS ux_news_sentiment_dedup_key"))
+        if not had_keys:
+            conn.execute(text(
+                f"INSERT INTO {NewsKey.__tablename__} (dedup_key) "
+                f"SELECT DISTINCT dedup_key FROM {TABLE} WHERE dedup_key IS NOT NULL"
+            ))
+        ensure_upcoming(conn)
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                # IF NOT EXISTS rather than checkfirst: reflection can't see expression indexes
+                conn.execute(CreateIndex(index, if_not_exists=True))
+                print(f"[INFO] Index ready: {index.name}")
+    # ingestion maintains the rollups for the articles it inserts; backfill them
+    # once, and again whenever something else has written news_sentiment
+    session = Session(bind=engine)
+    try:
+        if not had_rollup or not rollup_in_sync(session):
+            rebuild_daily_sentiment(session)
+            rebuild_keyword_index(session)
+            print("[INFO] Rebuilt daily_sentiment and keyword_daily")
+    finally:
+        session.close()
+
+
+def _prepare_news_table(conn):
+    """Postgres only: news_sentiment partitioned by month, before create_all would make a plain one"""
+    if conn.dialect.name != "postgresql":
+        return
+    NewsContent.__table__.create(conn, checkfirst=True)
+    if not inspect(conn).has_table(TABLE):
+        create_partitioned_table(conn)
+    elif not is_partitioned(conn):
+        convert_to_partitioned(conn)
+
+
+def _split_content(conn):
+    """Move an older table's news_sentiment.content into news_content"""
+    if "content" not in {c["name"] for c in inspect(conn).get_columns(TABLE)}:
+        return
+    conn.execute(text(
+        f"INSERT INTO {NewsContent.__tablename__} (id, content) SELECT id, content FROM {TABLE} "
+        f"WHERE content IS NOT NULL AND id NOT IN (SELECT id FROM {NewsContent.__tablename__})"
+    ))
+    conn.execute(text(f"ALTER TABLE {TABLE} DROP COLUMN content"))
+    print(f"[INFO] Moved {TABLE}.content to {NewsContent.__tablename__}")
+
+
+def _add_missing_columns(conn):
+    """ALTER TABLE ... ADD COLUMN for nullable model columns an older table lacks"""
+    inspector = inspect(conn)
+    for table in Base.metadata.sorted_tables:
+        existing = {c["name"] for c in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing or column.primary_key:
+                continue
+            col_type = column.type.compile(dialect=conn.dialect)
+            conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {col_type}'))
+            print(f"[INFO] Added column {table.name}.{column.name}")
+
+
+def explain_window_query(ticker="AAPL", start=date(2025, 10, 1)):
+    """Return the query plan lines for the API's ticker/date window read"""
+    session = SessionLocal()
+    try:
+        query = session.query(NewsSentiment.id).filter(*ticker_window_filter(ticker, start))
+        stmt = query.statement.compile(session.bind, compile_kwargs={"literal_binds": True})
+        dialect = session.bind.dialect.name
+        if dialect == "postgresql":
+            # Small tables make the planner prefer a seq scan; we only want to know the index is usable
+            session.execute(text("SET LOCAL enable_seqscan = off"))
+            rows = session.execute(text(f"EXPLAIN {stmt}")).fetchall()
+            return [r[0] for r in rows]
+        if dialect == "sqlite":
+            rows = session.execute(text(f"EXPLAIN QUERY PLAN {stmt}")).fetchall()
+            return [r[-1] for r in rows]
+        raise RuntimeError(f"EXPLAIN check not supported for {dialect}")
+    finally:
+        session.close()
+
+
+def check_index_usage():
+    """Raise if the window query would not use the ticker/created_at index"""
+    plan = explain_window_query()
+    for line in plan:
+        print(line)
+    # on a partitioned table the plan names each month's copy of the index instead
+    if not any("ix_news_sentiment_ticker_lower_created_at" in line
+               or ("news_sentiment_p" in line and "lower" in line and "Index" in line) for line in plan):
+        raise RuntimeError("news_sentiment window query is not using ix_news_sentiment_ticker_lower_created_at")
+    print("[OK] Window query uses the ticker/created_at index")
+
+
+if __name__ == "__main__":
+    migrate()
+    if "--check" in sys.argv:
+        check_index_usage()
@@ -1,19 +1,56 @@
 
-from sqlalchemy import Column, Integer, String, Float, DateTime, Text
+from sqlalchemy import Column, Integer, String, Float, DateTime, Date, Text, Index, func
 from datetime import datetime
 from .db_connect import Base
 
 class NewsSentiment(Base):
+    """
+    Scored articles: only the columns the aggregates and endpoints scan.
+    On Postgres the table is partitioned by month of created_at, see
+    db/partitions.py; article bodies live in news_content.
+    """
     __tablename__ = "news_sentiment"
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String)
-    content = Column(String)
     sentiment = Column(String)
     confidence = Column(Float)
     ticker = Column(String)
     source = Column(String)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)  # the partition key
+    url = Column(String)
+    dedup_key = Column(String)  # hash of ticker + url (or normalized title), see sentiment/ingest.py
+
+    __table_args__ = (
+        # API reads: lower(ticker) = :t AND created_at >= :start
+        Index("ix_news_sentiment_ticker_lower_created_at", func.lower(ticker), created_at),
+        # pipeline reads: ticker = :t AND created_at BETWEEN :start AND :end
+        Index("ix_news_sentiment_ticker_created_at", ticker, created_at),
+    )
+
+class NewsContent(Base):
+    """Article bodies, split out of news_sentiment; only /fetch_news?fields=context reads them"""
+    __tablename__ = "news_content"
+    id = Column(Integer, primary_key=True)  # news_sentiment.id
+    content = Column(Text)
+
+class NewsKey(Base):
+    """
+    Every dedup_key ever ingested. Uniqueness lives here rather than on
+    news_sentiment, where a partitioned table could only enforce it per month,
+    and it outlives retention so archived articles are not ingested again.
+    """
+    __tablename__ = "news_keys"
+    dedup_key = Column(String, primary_key=True)
+
+class NewsArchive(Base):
+    """One row per Parquet file written by retention, see db/archive.py"""
+    __tablename__ = "news_archive"
+    id = Column(Integer, primary_key=True)
+    month = Column(Date, index=True)  # first day of the archived month
+    path = Column(String)
+    n_rows = Column(Integer)
+    archived_at = Column(DateTime, default=datetime.utcnow)
 
 class KeywordImportance(Base):
     __tablename__ = "keyword_importance"
@@ -22,3 +59,40 @@ class KeywordImportance(Base):
     word = Column(String)
     score = Column(Float)
     created_at = Column(DateTime, default=datetime.utcnow)
+
+class KeywordDaily(Base):
+    """Per-ticker, per-day keyword totals, updated as articles are ingested"""
+    __tablename__ = "keyword_daily"
+    ticker = Column(String, primary_key=True)  # upper-cased
+    day = Column(Date, primary_key=True)
+    keyword = Column(String, primary_key=True)
+    score = Column(Float, default=0.0)  # sum of +/-confidence over articles mentioning it
+    mentions = Column(Integer, default=0)
+
+class IngestCheckpoint(Base):
+    """Where each ingestion source should resume from"""
+    __tablename__ = "ingest_checkpoint"
+    source = Column(String, primary_key=True)
+    cursor = Column(String)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class SentimentCache(Base):
+    """FinBERT results keyed by sha256(model id + normalized text), see sentiment/cache.py"""
+    __tablename__ = "sentiment_cache"
+    key = Column(String(64), primary_key=True)
+    model = Column(String)
+    sentiment = Column(String)
+    confidence = Column(Float)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+class DailySentiment(Base):
+    """Per-ticker, per-day sentiment rollup of news_sentiment, see db/rollup.py"""
+    __tablename__ = "daily_sentiment"
+    ticker = Column(String, primary_key=True)  # upper-cased
+    day = Column(Date, primary_key=True)
+    n_articles = Column(Integer, default=0)
+    score_sum = Column(Float, default=0.0)  # sum of +/-confidence
+    mean_score = Column(Float, default=0.0)  # score_sum / n_articles
+    pos = Column(Integer, default=0)
+    neg = Column(Integer, default=0)
+    neu = Column(Integer, default=0)
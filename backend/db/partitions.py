@@ -0,0 +1,180 @@
+# db/partitions.py
+# Monthly range partitions of news_sentiment on created_at (Postgres).
+# One child table per month (news_sentiment_p2025_10, ...) plus a DEFAULT
+# partition as a safety net, so retention can drop a whole month at once and
+# window scans only touch the months they cover.
+# SQLite, or a plain Postgres table made by create_all, has no partitions:
+# every helper below then falls back to ordinary range DELETEs, so the same
+# code paths run in tests.
+import os
+from datetime import date, datetime, time
+from sqlalchemy import delete, func, inspect, select, text
+from db.models import NewsSentiment, NewsContent, NewsArchive
+
+# months created ahead of the current one, so inserts never wait on DDL
+NEWS_PARTITION_LOOKAHEAD = int(os.getenv("NEWS_PARTITION_LOOKAHEAD", "2"))
+
+TABLE = NewsSentiment.__tablename__
+DEFAULT_PARTITION = f"{TABLE}_default"
+
+
+# ----------------------------
+# Months
+# ----------------------------
+def month_start(value):
+    return date(value.year, value.month, 1)
+
+
+def add_months(month, n):
+    y, m = divmod(month.year * 12 + month.month - 1 + n, 12)
+    return date(y, m + 1, 1)
+
+
+def months_between(first, last):
+    """Every month start from `first` to `last`, inclusive"""
+    months = []
+    month = month_start(first)
+    while month <= last:
+        months.append(month)
+        month = add_months(month, 1)
+    return months
+
+
+def month_bounds(month):
+    """[start, end) datetimes of a month, for created_at range predicates"""
+    return datetime.combine(month, time.min), datetime.combine(add_months(month, 1), time.min)
+
+
+def partition_name(month):
+    return f"{TABLE}_p{month:%Y_%m}"
+
+
+# ----------------------------
+# Catalog
+# ----------------------------
+def _dialect(bind):
+    # a Connection has .dialect; a Session goes through its bind
+    return getattr(bind, "dialect", None) or bind.get_bind().dialect
+
+
+def is_partitioned(bind):
+    if _dialect(bind).name != "postgresql":
+        return False
+    relkind = bind.execute(text("SELECT relkind FROM pg_class WHERE oid = to_regclass(:t)"), {"t": TABLE}).scalar()
+    return relkind == "p"
+
+
+def partition_names(bind):
+    rows = bind.execute(text(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = to_regclass(:t)"
+    ), {"t": TABLE})
+    return {r[0] for r in rows}
+
+
+def archive_horizon(session):
+    """First day not covered by the Parquet archive (None before anything is archived)"""
+    last = session.query(func.max(NewsArchive.month)).scalar()
+    return add_months(last, 1) if last else None
+
+
+# ----------------------------
+# DDL
+# ----------------------------
+def create_partitioned_table(conn):
+    """
+    news_sentiment as a partitioned table. The columns come from the model,
+    but Postgres wants the partition key in the primary key, so it is
+    (id, created_at) here while the ORM keeps mapping plain `id`.
+    """
+    columns = []
+    for c in NewsSentiment.__table__.columns:
+        if c.name == "id":
+            columns.append("id SERIAL")
+            continue
+        columns.append(f"{c.name} {c.type.compile(dialect=conn.dialect)}{'' if c.nullable else ' NOT NULL'}")
+    conn.execute(text(
+        f"CREATE TABLE {TABLE} ({', '.join(columns)}, PRIMARY KEY (id, created_at)) "
+        f"PARTITION BY RANGE (created_at)"
+    ))
+    conn.execute(text(f"CREATE TABLE {DEFAULT_PARTITION} PARTITION OF {TABLE} DEFAULT"))
+    print(f"[INFO] Created partitioned table {TABLE}")
+
+
+def convert_to_partitioned(conn):
+    """
+    Rebuild an existing plain news_sentiment as a partitioned one, keeping
+    ids, and move its content column into news_content on the way.
+    Needs news_content to exist. Locks the table for the length of the copy.
+    """
+    legacy = f"{TABLE}_unpartitioned"
+    existing = {c["name"] for c in inspect(conn).get_columns(TABLE)}
+    conn.execute(text(f"ALTER TABLE {TABLE} RENAME TO {legacy}"))
+    create_partitioned_table(conn)
+
+    first, last = conn.execute(text(f"SELECT min(created_at), max(created_at) FROM {legacy}")).one()
+    if first is not None:
+        ensure_partitions(conn, months_between(first, last.date()))
+    columns = [c.name for c in NewsSentiment.__table__.columns if c.name in existing]
+    # created_at is NOT NULL now; undated rows land in the default partition
+    selected = ["COALESCE(created_at, TIMESTAMP 'epoch')" if c == "created_at" else c for c in columns]
+    conn.execute(text(f"INSERT INTO {TABLE} ({', '.join(columns)}) SELECT {', '.join(selected)} FROM {legacy}"))
+    if "content" in existing:
+        conn.execute(text(
+            f"INSERT INTO {NewsContent.__tablename__} (id, content) "
+            f"SELECT id, content FROM {legacy} WHERE content IS NOT NULL ON CONFLICT DO NOTHING"
+        ))
+    conn.execute(text(
+        f"SELECT setval(pg_get_serial_sequence('{TABLE}', 'id'), (SELECT COALESCE(max(id), 0) + 1 FROM {TABLE}), false)"
+    ))
+    conn.execute(text(f"DROP TABLE {legacy}"))
+    print(f"[INFO] Converted {TABLE} to monthly partitions")
+
+
+def ensure_partitions(bind, timestamps):
+    """
+    Create the monthly partitions covering `timestamps` (datetimes or dates).
+    No-op unless news_sentiment is partitioned. The caller commits.
+    """
+    months = sorted({month_start(t) for t in timestamps if t is not None})
+    if not months or not is_partitioned(bind):
+        return
+    # concurrent ingesters would otherwise race to create the same month
+    bind.execute(text("SELECT pg_advisory_xact_lock(hashtext(:t))"), {"t": TABLE})
+    existing = partition_names(bind)
+    for month in months:
+        name = partition_name(month)
+        if name in existing:
+            continue
+        lo, hi = month_bounds(month)
+        bind.execute(text(f"CREATE TABLE {name} (LIKE {TABLE} INCLUDING DEFAULTS)"))
+        # attaching fails if the default partition holds rows for the month, so move them first
+        bind.execute(text(
+            f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} WHERE created_at >= :lo AND created_at < :hi "
+            f"RETURNING *) INSERT INTO {name} SELECT * FROM moved"
+        ), {"lo": lo, "hi": hi})
+        bind.execute(text(f"ALTER TABLE {TABLE} ATTACH PARTITION {name} FOR VALUES FROM ('{lo}') TO ('{hi}')"))
+        print(f"[INFO] Created partition {name}")
+
+
+def ensure_upcoming(bind, today=None):
+    """The current month and NEWS_PARTITION_LOOKAHEAD after it"""
+    current = month_start(today or datetime.utcnow().date())
+    ensure_partitions(bind, [add_months(current, n) for n in range(NEWS_PARTITION_LOOKAHEAD + 1)])
+
+
+def drop_month(bind, month):
+    """
+    Delete a month of articles and their bodies: DETACH + DROP of its
+    partition when there is one, a range DELETE otherwise. The caller commits.
+    """
+    lo, hi = month_bounds(month)
+    in_month = (NewsSentiment.created_at >= lo, NewsSentiment.created_at < hi)
+    bind.execute(delete(NewsContent.__table__).where(
+        NewsContent.id.in_(select(NewsSentiment.id).where(*in_month))
+    ))
+    if is_partitioned(bind) and partition_name(month) in partition_names(bind):
+        bind.execute(text(f"ALTER TABLE {TABLE} DETACH PARTITION {partition_name(month)}"))
+        bind.execute(text(f"DROP TABLE {partition_name(month)}"))
+    # SQLite, an unpartitioned table, or strays in the default partition
+    bind.execute(delete(NewsSentiment.__table__).where(*in_month))
@@ -0,0 +1,67 @@
+import threading
+import time
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+
+class PoolMetrics:
+    """Counters for connection checkouts and how long callers waited for one"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def record_wait(self, seconds, timed_out=False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+
+    def snapshot(self, pool):
+        with self._lock:
+            stats = {
+                "checkouts_total": self.checkouts,
+                "timeouts_total": self.timeouts,
+                "wait_avg_ms": round(self.wait_total / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                "wait_max_ms": round(self.wait_max * 1000, 3),
+            }
+        stats["pool_class"] = type(pool).__name__
+        for name in ("size", "checkedout", "checkedin", "overflow"):
+            fn = getattr(pool, name, None)
+            if callable(fn):
+                stats[name] = fn()
+        return stats
+
+
+metrics = PoolMetrics()
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited in `metrics`"""
+
+    def connect(self):
+        t0 = time.perf_counter()
+        try:
+            conn = super().connect()
+        except PoolTimeoutError:
+            metrics.record_wait(time.perf_counter() - t0, timed_out=True)
+            raise
+        metrics.record_wait(time.perf_counter() - t0)
+        return conn
+
+
+def instrument(engine):
+    """Count checkouts for pools that aren't a TimedQueuePool (e.g. in-memory SQLite)"""
+    if isinstance(engine.pool, TimedQueuePool):
+        return
+
+    @event.listens_for(engine, "checkout")
+    def _on_checkout(dbapi_conn, record, proxy):
+        metrics.record_wait(0.0)
@@ -0,0 +1,164 @@
+import base64
+import json
+from datetime import datetime, time
+from sqlalchemy import func, tuple_
+from db.models import NewsSentiment, NewsContent, DailySentiment
+
+def ticker_window_filter(ticker, start_date, end_date=None):
+    """
+    Rows for `ticker` (case-insensitive) created in [start_date, end_date).
+
+    Written as plain range predicates on created_at so the
+    (lower(ticker), created_at) index can serve them; wrapping the column in
+    DATE() would force a full scan.
+    """
+    criteria = [
+        func.lower(NewsSentiment.ticker) == ticker.lower(),
+        NewsSentiment.created_at >= datetime.combine(start_date, time.min),
+    ]
+    if end_date is not None:
+        criteria.append(NewsSentiment.created_at < datetime.combine(end_date, time.min))
+    return tuple(criteria)
+
+
+
+def sentiment_summary(session, ticker, start_date):
+    """
+    Aggregate a ticker's sentiment since `start_date` from the daily_sentiment
+    rollup, so the work is bounded by the number of days no matter how many
+    articles there are.
+    Returns {"total_articles", "score_sum", "counts", "daily"}.
+    """
+    rows = session.query(DailySentiment).filter(
+        DailySentiment.ticker == ticker.upper(),
+        DailySentiment.day >= start_date
+    ).order_by(DailySentiment.day).all()
+
+    counts = {"Positive": 0, "Negative": 0, "Neutral": 0}
+    daily = []
+    for r in rows:
+        if not r.n_articles:
+            continue
+        day_counts = {label: n for label, n in (("Negative", r.neg), ("Neutral", r.neu), ("Positive", r.pos)) if n}
+        for label, n in day_counts.items():
+            counts[label] += n
+        daily.append({
+            "date": str(r.day),
+            "articles": r.n_articles,
+            "average_score": round(r.score_sum / r.n_articles, 3),
+            "counts": day_counts
+        })
+
+    return {
+        "total_articles": sum(r.n_articles for r in rows),
+        "score_sum": sum(r.score_sum for r in rows),
+        "counts": counts,
+        "daily": daily,
+    }
+
+
+def daily_scores(session, tickers, start, end):
+    """
+    Mean confidence-weighted score per (ticker, day) for days in [start, end),
+    for many tickers in one query against the daily_sentiment rollup.
+    Returns rows of (TICKER, day, mean_score).
+    """
+    return session.query(
+        DailySentiment.ticker, DailySentiment.day, DailySentiment.mean_score
+    ).filter(
+        DailySentiment.ticker.in_([t.upper() for t in tickers]),
+        DailySentiment.day >= start,
+        DailySentiment.day < end
+    ).order_by(DailySentiment.ticker, DailySentiment.day).all()
+
+
+# ----------------------------
+# Live updates (see live.py)
+# ----------------------------
+def latest_news_id(session):
+    return session.query(func.max(NewsSentiment.id)).scalar() or 0
+
+
+def news_since(session, after_id, limit):
+    """Articles with id > after_id in id order; the live hub walks the primary key from a little under its watermark"""
+    return session.query(
+        NewsSentiment.id, NewsSentiment.ticker, NewsSentiment.title, NewsSentiment.sentiment,
+        NewsSentiment.confidence, NewsSentiment.source, NewsSentiment.created_at
+    ).filter(NewsSentiment.id > after_id).order_by(NewsSentiment.id).limit(limit).all()
+
+
+def sentiment_totals(session, tickers, start_date):
+    """
+    sentiment_summary's totals (no per-day buckets) for many tickers in one
+    grouped query. Returns {TICKER: {"total_articles", "score_sum", "counts"}}.
+    """
+    rows = session.query(
+        DailySentiment.ticker,
+        func.sum(DailySentiment.n_articles), func.sum(DailySentiment.score_sum),
+        func.sum(DailySentiment.pos), func.sum(DailySentiment.neg), func.sum(DailySentiment.neu)
+    ).filter(
+        DailySentiment.ticker.in_([t.upper() for t in tickers]),
+        DailySentiment.day >= start_date
+    ).group_by(DailySentiment.ticker).all()
+    return {
+        ticker: {
+            "total_articles": int(n or 0),
+            "score_sum": float(score_sum or 0.0),
+            "counts": {"Positive": int(pos or 0), "Negative": int(neg or 0), "Neutral": int(neu or 0)},
+        }
+        for ticker, n, score_sum, pos, neg, neu in rows
+    }
+
+
+# ----------------------------
+# /fetch_news keyset pagination
+# ----------------------------
+# response field -> column
+NEWS_FIELDS = {
+    "title": NewsSentiment.title,
+    "context": NewsContent.content,  # joined in only when asked for
+    "sentiment": NewsSentiment.sentiment,
+    "confidence": NewsSentiment.confidence,
+    "source": NewsSentiment.source,
+    "created_at": NewsSentiment.created_at,
+}
+
+
+def encode_cursor(created_at, row_id):
+    raw = json.dumps([created_at.isoformat(), row_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """Inverse of encode_cursor; raises ValueError on anything malformed"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        ts, row_id = json.loads(raw)
+        return datetime.fromisoformat(ts), int(row_id)
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def news_page_query(session, ticker, start_date, fields, after=None):
+    """
+    Newest-first news for a ticker, selecting only `fields` (plus created_at
+    and id for the cursor). `after` is a decoded cursor; rows strictly older
+    than it in (created_at, id) order are returned.
+    """
+    columns = [NEWS_FIELDS[f].label(f) for f in fields if f != "created_at"]
+    query = session.query(
+        NewsSentiment.id.label("_id"), NewsSentiment.created_at.label("created_at"), *columns
+    ).filter(*ticker_window_filter(ticker, start_date))
+    if "context" in fields:
+        query = query.outerjoin(NewsContent, NewsContent.id == NewsSentiment.id)
+    if after is not None:
+        query = query.filter(tuple_(NewsSentiment.created_at, NewsSentiment.id) < tuple_(*after))
+    return query.order_by(NewsSentiment.created_at.desc(), NewsSentiment.id.desc())
+
+
+def news_row_to_dict(row, fields):
+    out = {}
+    for f in fields:
+        value = getattr(row, f)
+        out[f] = value.strftime("%Y-%m-%d %H:%M:%S") if f == "created_at" else value
+    return out
@@ -0,0 +1,150 @@
+# db/rollup.py
+# daily_sentiment: one row per (ticker, day) summarising news_sentiment, kept
+# up to date by ingestion so readers never touch the raw articles.
+# Backtests and summaries read only this table, so anything else that writes
+# news_sentiment must either call rollup_articles() (and
+# keywords.index_articles()) with the new rows in the same transaction, as
+# sentiment.ingest does, or rebuild afterwards. Otherwise those articles are
+# invisible to readers. db.migrate checks for that (rollup_in_sync) and
+# rebuilds when the counts disagree.
+# Rebuild from backend/:  python -m db.rollup [TICKER]
+from collections import defaultdict
+from datetime import datetime, time
+from sqlalchemy import case, func, insert, select
+from db import changes
+from db.db_connect import SessionLocal
+from db.models import DailySentiment, NewsSentiment
+from db.partitions import archive_horizon
+from db.upsert import dialect_insert
+
+COUNT_COLS = ("n_articles", "score_sum", "pos", "neg", "neu")
+LABEL_COLS = {"Positive": "pos", "Negative": "neg", "Neutral": "neu"}
+SIGNS = {"Positive": 1, "Negative": -1, "Neutral": 0}
+
+
+def sentiment_label(sentiment):
+    """
+    The stored label as Positive / Negative / Neutral, case-insensitively.
+    Missing or unknown labels count as Neutral: daily_sentiment only has
+    pos / neg / neu columns. Every reader of a raw label goes through here
+    (or _label below, its SQL twin), so they all agree.
+    """
+    label = (sentiment or "").lower()
+    return "Positive" if label == "positive" else "Negative" if label == "negative" else "Neutral"
+
+
+def sentiment_sign(sentiment):
+    """+1 / -1 / 0 for an article's label"""
+    return SIGNS[sentiment_label(sentiment)]
+
+
+# +1 / -1 / 0 per article, weighted by model confidence (same as the old to_score)
+_label = func.coalesce(func.lower(NewsSentiment.sentiment), "neutral")
+_weighted_score = case(
+    (_label == "positive", 1.0),
+    (_label == "negative", -1.0),
+    else_=0.0
+) * NewsSentiment.confidence
+
+
+def daily_deltas(articles):
+    """
+    Fold articles (objects with ticker, sentiment, confidence, created_at)
+    into {(TICKER, day): {n_articles, score_sum, pos, neg, neu}}.
+    """
+    deltas = defaultdict(lambda: dict.fromkeys(COUNT_COLS, 0))
+    for a in articles:
+        if a.ticker is None or a.created_at is None:
+            continue
+        label = sentiment_label(a.sentiment)
+        d = deltas[(a.ticker.upper(), a.created_at.date())]
+        d["n_articles"] += 1
+        d["score_sum"] += SIGNS[label] * float(a.confidence or 0.0)
+        d[LABEL_COLS[label]] += 1
+    return deltas
+
+
+def rollup_articles(session, articles):
+    """Add newly ingested articles to daily_sentiment (caller commits)"""
+    rows = [
+        {"ticker": ticker, "day": day, "mean_score": d["score_sum"] / d["n_articles"], **d}
+        for (ticker, day), d in daily_deltas(articles).items()
+    ]
+    if not rows:
+        return
+    table = DailySentiment.__table__
+    stmt = dialect_insert(session, table)
+    n_articles = table.c.n_articles + stmt.excluded.n_articles
+    score_sum = table.c.score_sum + stmt.excluded.score_sum
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.ticker, table.c.day],
+        set_={
+            **{c: table.c[c] + stmt.excluded[c] for c in COUNT_COLS},
+            "mean_score": score_sum / n_articles,
+        }
+    )
+    session.execute(stmt, rows)
+
+
+def rollup_in_sync(session):
+    """
+    True when daily_sentiment counts exactly the articles in news_sentiment
+    (from the archive horizon on, like rebuild_daily_sentiment).
+    """
+    rolled = session.query(func.coalesce(func.sum(DailySentiment.n_articles), 0))
+    articles = session.query(func.count(NewsSentiment.id)).filter(
+        NewsSentiment.ticker.isnot(None), NewsSentiment.created_at.isnot(None)
+    )
+    horizon = archive_horizon(session)
+    if horizon:
+        rolled = rolled.filter(DailySentiment.day >= horizon)
+        articles = articles.filter(NewsSentiment.created_at >= datetime.combine(horizon, time.min))
+    return rolled.scalar() == articles.scalar()
+
+
+def rebuild_daily_sentiment(session, ticker=None):
+    """
+    Recompute daily_sentiment from news_sentiment in one INSERT ... SELECT.
+    Days before the archive horizon are left alone: their articles are in
+    Parquet now (see db/archive.py for rebuilding those).
+    """
+    wipe = session.query(DailySentiment)
+    ticker_col = func.upper(NewsSentiment.ticker)
+    day = func.date(NewsSentiment.created_at)
+    n = func.count()
+    score_sum = func.coalesce(func.sum(_weighted_score), 0.0)
+
+    def label_count(label):
+        return func.sum(case((_label == label, 1), else_=0))
+
+    source = select(
+        ticker_col, day, n, score_sum, score_sum / n,
+        label_count("positive"), label_count("negative"),
+        n - label_count("positive") - label_count("negative"),
+    ).where(
+        NewsSentiment.ticker.isnot(None), NewsSentiment.created_at.isnot(None)
+    ).group_by(ticker_col, day)
+    if ticker:
+        wipe = wipe.filter(DailySentiment.ticker == ticker.upper())
+        source = source.where(ticker_col == ticker.upper())
+    horizon = archive_horizon(session)
+    if horizon:
+        wipe = wipe.filter(DailySentiment.day >= horizon)
+        source = source.where(NewsSentiment.created_at >= datetime.combine(horizon, time.min))
+    wipe.delete(synchronize_session=False)
+
+    session.execute(insert(DailySentiment).from_select(
+        ["ticker", "day", "n_articles", "score_sum", "mean_score", "pos", "neg", "neu"], source
+    ))
+    session.commit()
+    changes.changed([ticker] if ticker else None)
+
+
+if __name__ == "__main__":
+    import sys
+    import response_cache  # noqa: F401 (invalidates a shared cache after the rebuild)
+    db = SessionLocal()
+    try:
+        rebuild_daily_sentiment(db, sys.argv[1] if len(sys.argv) > 1 else None)
+    finally:
+        db.close()
@@ -0,0 +1,45 @@
+from sqlalchemy.dialects import postgresql, sqlite
+
+
+def dialect_insert(session, table):
+    """The dialect's INSERT construct for `table`, which has on_conflict_do_*"""
+    name = session.get_bind().dialect.name
+    if name == "postgresql":
+        return postgresql.insert(table)
+    if name == "sqlite":
+        return sqlite.insert(table)
+    raise NotImplementedError(f"upsert is not supported on {name}")
+
+
+def upsert_add(session, model, rows, key_cols, add_cols):
+    """
+    Insert rows into model's table; where the key already exists, add the
+    incoming add_cols values to the stored ones (INSERT ... ON CONFLICT DO UPDATE).
+    rows: list of dicts with key_cols + add_cols.
+    """
+    if not rows:
+        return
+    table = model.__table__
+    stmt = dialect_insert(session, table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c[c] for c in key_cols],
+        set_={c: table.c[c] + stmt.excluded[c] for c in add_cols}
+    )
+    session.execute(stmt, rows)
+
+
+def insert_ignore(session, model, rows, key_cols, returning=()):
+    """
+    Bulk insert rows, skipping any whose key already exists (ON CONFLICT DO
+    NOTHING). Returns the `returning` columns of the rows actually inserted.
+    """
+    if not rows:
+        return []
+    table = model.__table__
+    stmt = dialect_insert(session, table).on_conflict_do_nothing(
+        index_elements=[table.c[c] for c in key_cols]
+    )
+    if not returning:
+        session.execute(stmt, rows)
+        return []
+    return session.execute(stmt.returning(*[table.c[c] for c in returning]), rows).all()
@@ -0,0 +1,136 @@
+# jobs.py
+# In-process background jobs for long-running work such as the full pipeline.
+import os
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+# Finished jobs beyond this many are forgotten, oldest first
+JOB_HISTORY = int(os.getenv("JOB_HISTORY", "100"))
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED = (SUCCEEDED, FAILED, CANCELLED)
+
+
+class Job:
+    def __init__(self, kind, params):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.params = params
+        self.status = QUEUED
+        self.error = None
+        self.created_at = datetime.utcnow()
+        self.started_at = None
+        self.finished_at = None
+        self.tickers = {}   # ticker -> pending / running / done / failed
+        self.results = {}   # ticker -> metrics or error message
+        self.cancel_event = threading.Event()
+        self.future = None
+        # progress() runs on the job thread while to_dict() serves GET /jobs/{id}
+        self._lock = threading.Lock()
+
+    def progress(self, ticker, state, payload):
+        """on_progress callback for run_pipeline"""
+        with self._lock:
+            self.tickers[ticker] = state
+            if state in ("done", "failed"):
+                self.results[ticker] = payload
+
+    def to_dict(self):
+        with self._lock:
+            tickers = dict(self.tickers)
+            results = dict(self.results)
+        done = sum(1 for s in tickers.values() if s in ("done", "failed"))
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "params": self.params,
+            "status": self.status,
+            "error": self.error,
+            "created_at": _fmt(self.created_at),
+            "started_at": _fmt(self.started_at),
+            "finished_at": _fmt(self.finished_at),
+            "progress": {"done": done, "total": len(tickers)},
+            "tickers": tickers,
+            "results": results,
+        }
+
+
+def _fmt(ts):
+    return ts.strftime("%Y-%m-%d %H:%M:%S") if ts else None
+
+
+class JobStore:
+    """Bounded worker pool plus an in-memory registry of submitted jobs"""
+
+    def __init__(self, workers=JOB_WORKERS, history=JOB_HISTORY):
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="job")
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._history = history
+
+    def submit(self, kind, fn, **params):
+        """
+        Queue fn(job, **params) and return the Job right away. fn should call
+        job.progress(...) as it goes and return when job.cancel_event is set.
+        """
+        job = Job(kind, params)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._evict()
+        job.future = self._executor.submit(self._run, job, fn, params)
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id):
+        job = self.get(job_id)
+        if job is None:
+            return None
+        if job.status in FINISHED:
+            return job
+        job.cancel_event.set()
+        if job.future is not None and job.future.cancel():
+            # never started
+            job.status = CANCELLED
+            job.finished_at = datetime.utcnow()
+        return job
+
+    def shutdown(self):
+        for job in list(self._jobs.values()):
+            job.cancel_event.set()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self, job, fn, params):
+        if job.cancel_event.is_set():
+            job.status = CANCELLED
+            job.finished_at = datetime.utcnow()
+            return
+        job.status = RUNNING
+        job.started_at = datetime.utcnow()
+        try:
+            fn(job, **params)
+            job.status = CANCELLED if job.cancel_event.is_set() else SUCCEEDED
+        except Exception as e:
+            job.status = FAILED
+            job.error = str(e)
+        finally:
+            job.finished_at = datetime.utcnow()
+
+    def _evict(self):
+        finished = [j for j in self._jobs.values() if j.status in FINISHED]
+        excess = len(finished) - self._history
+        if excess > 0:
+            for job in sorted(finished, key=lambda j: j.created_at)[:excess]:
+                del self._jobs[job.id]
+
+
+store = JobStore()
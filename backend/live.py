@@ -0,0 +1,270 @@
+# live.py
+# In-process fan-out hub behind the /stream server-sent events endpoint.
+# One background task per worker polls the database once per tick for
+# articles past a watermark on news_sentiment.id, plus the rolling totals of
+# the tickers that changed, and hands every subscriber the slice it asked
+# for. Database work per tick depends on how much news arrived, not on how
+# many dashboards are connected. Polling (rather than a hook in ingest) also
+# picks up rows written by the ingest CLI or another worker.
+#
+# Ids are handed out when a row is inserted, not when its transaction
+# commits, so a chunk that commits late can become visible below ids that
+# were already fanned out. Each tick therefore re-reads the last LIVE_RESCAN
+# ids under the watermark and skips the ones already sent. A transaction
+# that commits after more than LIVE_RESCAN newer ids are visible is still
+# missed by the stream (clients see it on their next REST load); raise
+# LIVE_RESCAN if many writers ingest concurrently with large chunks.
+import asyncio
+import os
+from datetime import datetime, timedelta
+from db.db_connect import session_scope
+from db.queries import latest_news_id, news_since, sentiment_totals
+from serialize import encode_json
+
+LIVE_TICK = float(os.getenv("LIVE_TICK", "1.0"))                   # seconds between polls
+LIVE_WINDOW_DAYS = int(os.getenv("LIVE_WINDOW_DAYS", "30"))        # rolling window for the aggregates
+LIVE_QUEUE_SIZE = int(os.getenv("LIVE_QUEUE_SIZE", "64"))          # ticks buffered per client before a resync
+LIVE_MAX_TICKERS = int(os.getenv("LIVE_MAX_TICKERS", "50"))        # per connection
+LIVE_HEARTBEAT = float(os.getenv("LIVE_HEARTBEAT", "15"))          # seconds of silence before a keep-alive comment
+LIVE_RESCAN = int(os.getenv("LIVE_RESCAN", "2000"))                # ids under the watermark re-read for late commits
+LIVE_MAX_ROWS = 5_000                                              # articles read per tick; the rest wait a tick
+
+
+class Subscription:
+    def __init__(self, tickers, queue_size):
+        self.tickers = frozenset(tickers)
+        # (event, data bytes) pairs
+        self.queue = asyncio.Queue(maxsize=queue_size)
+
+
+def article_payload(row):
+    return {
+        "id": row.id,
+        "ticker": row.ticker.upper(),
+        "title": row.title,
+        "sentiment": row.sentiment,
+        "confidence": row.confidence,
+        "source": row.source,
+        "created_at": row.created_at.strftime("%Y-%m-%d %H:%M:%S"),
+    }
+
+
+def aggregate_payload(ticker, totals):
+    """Same fields and rounding as /ticker_summary's score and mood, over LIVE_WINDOW_DAYS"""
+    if totals is None or not totals["total_articles"]:
+        return {"ticker": ticker, "average_score": 0.0, "total_articles": 0, "dominant_mood": "Neutral",
+                "counts": {"Positive": 0, "Negative": 0, "Neutral": 0}}
+    counts = totals["counts"]
+    return {
+        "ticker": ticker,
+        "average_score": round(totals["score_sum"] / totals["total_articles"], 3),
+        "total_articles": totals["total_articles"],
+        "dominant_mood": max(counts, key=counts.get),
+        "counts": counts,
+    }
+
+
+def sse_event(event, data):
+    """One text/event-stream frame; `data` is single-line JSON bytes"""
+    return b"event: " + event.encode() + b"\ndata: " + data + b"\n\n"
+
+
+class Hub:
+    def __init__(self, tick=LIVE_TICK, window_days=LIVE_WINDOW_DAYS, queue_size=LIVE_QUEUE_SIZE):
+        self.tick = tick
+        self.window_days = window_days
+        self.queue_size = queue_size
+        self.subscribers = set()
+        self._aggregates = {}        # TICKER -> latest aggregate payload, for subscribed tickers only
+        self._aggregates_day = None  # the window slides at midnight; recompute then
+        self._last_id = None         # watermark: highest news_sentiment.id already fanned out
+        self._seen = set()           # ids within LIVE_RESCAN of the watermark already fanned out
+        self._task = None
+        self._snapshot_lock = None
+        self.ticks = 0
+        self.db_queries = 0
+        self.messages = 0
+        self.resyncs = 0
+
+    # ----------------------------
+    # Subscribers
+    # ----------------------------
+    def subscribe(self, tickers):
+        sub = Subscription((t.upper() for t in tickers), self.queue_size)
+        self.subscribers.add(sub)
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+        return sub
+
+    def unsubscribe(self, sub):
+        self.subscribers.discard(sub)
+        # nothing refreshes a ticker nobody watches, so don't keep its aggregate around
+        watched = self._watched()
+        for ticker in list(self._aggregates):
+            if ticker not in watched:
+                del self._aggregates[ticker]
+
+    def _watched(self):
+        return set().union(*(s.tickers for s in self.subscribers))
+
+    async def snapshot(self, tickers):
+        """
+        Current aggregates for `tickers`, loading only those no subscriber has
+        asked for yet. Concurrent callers share one load, so a burst of
+        dashboards opening on the same ticker costs one query.
+        """
+        if self._snapshot_lock is None:
+            self._snapshot_lock = asyncio.Lock()
+        tickers = [t.upper() for t in tickers]
+        async with self._snapshot_lock:
+            self._roll_window()
+            missing = [t for t in tickers if t not in self._aggregates]
+            if missing:
+                self._aggregates.update(await asyncio.to_thread(self._load_aggregates, missing))
+        return [self._aggregates.get(t) or aggregate_payload(t, None) for t in tickers]
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    # ----------------------------
+    # Poll loop
+    # ----------------------------
+    async def _run(self):
+        # start at the current head: clients load history over REST, the stream only carries what's new
+        if self._last_id is None:
+            await asyncio.to_thread(self._start_at_head)
+        while self.subscribers:
+            await asyncio.sleep(self.tick)
+            try:
+                await self.poll()
+            except Exception as e:
+                print(f"[WARN] Live update poll failed: {e}")
+        # idle: the next subscriber starts from the head again instead of replaying the gap
+        self._last_id = None
+        self._seen = set()
+
+    async def poll(self):
+        """One tick: read what's new, fan it out. Returns the number of new articles seen."""
+        watched = self._watched()
+        if not watched:
+            return 0
+        self._roll_window()
+        rows, aggregates = await asyncio.to_thread(self._load_changes, watched)
+        self.ticks += 1
+        self._aggregates.update(aggregates)
+        if rows or aggregates:
+            self._fan_out(rows, aggregates)
+        return len(rows)
+
+    def _roll_window(self):
+        today = datetime.now().date()
+        if self._aggregates_day != today:
+            self._aggregates.clear()
+            self._aggregates_day = today
+
+    def _window_start(self):
+        return (datetime.now() - timedelta(days=self.window_days)).date()
+
+    def _start_at_head(self):
+        """Watermark at the newest id; rows already in the rescan window count as sent"""
+        with session_scope() as session:
+            head = latest_news_id(session)
+            rows = news_since(session, max(head - LIVE_RESCAN, 0), LIVE_RESCAN)
+            self.db_queries += 2
+        self._seen = {r.id for r in rows if r.id <= head}
+        self._last_id = head
+
+    def _load_aggregates(self, tickers):
+        with session_scope() as session:
+            totals = sentiment_totals(session, tickers, self._window_start())
+            self.db_queries += 1
+        return {t: aggregate_payload(t, totals.get(t)) for t in tickers}
+
+    def _load_changes(self, watched):
+        """Runs in a worker thread: new articles for watched tickers, and fresh totals for those tickers"""
+        with session_scope() as session:
+            rows = news_since(session, max(self._last_id - LIVE_RESCAN, 0), LIVE_MAX_ROWS)
+            self.db_queries += 1
+            rows = [r for r in rows if r.id not in self._seen]
+            if not rows:
+                return [], {}
+            # the watermark moves past every new row, watched or not
+            self._last_id = max(self._last_id, rows[-1].id)
+            floor = self._last_id - LIVE_RESCAN
+            self._seen = {i for i in self._seen if i > floor}
+            self._seen.update(r.id for r in rows if r.id > floor)
+            articles = [article_payload(r) for r in rows if r.ticker and r.ticker.upper() in watched]
+            changed = {a["ticker"] for a in articles}
+            if not changed:
+                return [], {}
+            totals = sentiment_totals(session, changed, self._window_start())
+            self.db_queries += 1
+        return articles, {t: aggregate_payload(t, totals.get(t)) for t in changed}
+
+    def _fan_out(self, articles, aggregates):
+        # subscribers watching the same tickers get the same bytes, so encode once per ticker set
+        groups = {}
+        for sub in self.subscribers:
+            groups.setdefault(sub.tickers, []).append(sub)
+        for tickers, subs in groups.items():
+            batch = [a for a in articles if a["ticker"] in tickers]
+            if not batch:
+                continue
+            data = encode_json({
+                "articles": batch,
+                "aggregates": [aggregates[t] for t in sorted(tickers) if t in aggregates],
+            })
+            for sub in subs:
+                self._deliver(sub, "update", data)
+
+    def _deliver(self, sub, event, data):
+        try:
+            sub.queue.put_nowait((event, data))
+            self.messages += 1
+        except asyncio.QueueFull:
+            # a client this far behind gets one "resync" instead of the backlog; it refetches over REST
+            while not sub.queue.empty():
+                sub.queue.get_nowait()
+            sub.queue.put_nowait(("resync", b"{}"))
+            self.resyncs += 1
+
+    def stats(self):
+        return {
+            "subscribers": len(self.subscribers),
+            "tickers": len(self._watched()),
+            "ticks": self.ticks,
+            "db_queries": self.db_queries,
+            "messages": self.messages,
+            "resyncs": self.resyncs,
+        }
+
+
+async def stream(hub, request, tickers, heartbeat=LIVE_HEARTBEAT):
+    """
+    text/event-stream body for one client: a "snapshot" of the current
+    aggregates, then an "update" per tick with news for its tickers.
+    """
+    sub = hub.subscribe(tickers)
+    try:
+        yield b"retry: 3000\n\n"
+        yield sse_event("snapshot", encode_json({"aggregates": await hub.snapshot(tickers)}))
+        while True:
+            try:
+                event, data = await asyncio.wait_for(sub.queue.get(), heartbeat)
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    break
+                yield b": ping\n\n"
+                continue
+            yield sse_event(event, data)
+    finally:
+        hub.unsubscribe(sub)
+
+
+hub = Hub()
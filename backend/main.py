@@ -1,18 +1,55 @@
-from fastapi import FastAPI, HTTPException
+import json
+import os
+import threading
+import time
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Depends, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
 from pydantic import BaseModel
 from datetime import datetime, timedelta
-from sqlalchemy.orm import sessionmaker
-from db.db_connect import engine
-from db.models import NewsSentiment, KeywordImportance
-from sqlalchemy import func
-from run_full_pipeline import simulate_strategy, generate_xai_sentences, run_pipeline
+from typing import List, Optional
+from sqlalchemy.orm import Session
+from db.db_connect import get_db, get_engine, pool_stats, session_scope
+from db.queries import (sentiment_summary, NEWS_FIELDS, news_page_query, news_row_to_dict,
+                        encode_cursor, decode_cursor)
+from startup import warm_up
+from response_cache import cache as response_cache, etag_matches
+from serialize import JSON, ARROW, encode_json, encode_arrow, wants_arrow
+import jobs
+import live
+import metrics
+from strategy import robustness
+
+MAX_SWEEP_COMBOS = int(os.getenv("MAX_SWEEP_COMBOS", "100000"))
+MAX_ROBUSTNESS_SCENARIOS = int(os.getenv("MAX_ROBUSTNESS_SCENARIOS", "100000"))
+MAX_NEWS_PAGE = int(os.getenv("MAX_NEWS_PAGE", "1000"))
+XAI_MAX_SENTENCES = int(os.getenv("XAI_MAX_SENTENCES", "50"))  # latest headlines /xai explains
+NEWS_STREAM_BATCH = 500
+
+# run_full_pipeline (pandas) is imported inside the endpoints that need it, so
+# workers serving only the read-only endpoints start without it.
 
 
 # ----------------------------
 # FastAPI app setup
 # ----------------------------
-app = FastAPI(title="HedgeFundSim API", version="1.0")
+@asynccontextmanager
+async def lifespan(app):
+    # per-request DB query counts and timings for /metrics and Server-Timing
+    metrics.instrument_engine(get_engine())
+    # Optional warm-up, e.g. WARMUP_ON_STARTUP=db,pipeline,model. Runs in the
+    # background so the worker accepts requests straight away.
+    targets = [t.strip() for t in os.getenv("WARMUP_ON_STARTUP", "").split(",") if t.strip()]
+    if targets:
+        threading.Thread(target=warm_up, args=(targets,), daemon=True).start()
+    yield
+    await live.hub.stop()
+    jobs.store.shutdown()
+    robustness.shutdown()
+
+
+app = FastAPI(title="HedgeFundSim API", version="1.0", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -22,8 +59,39 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-Session = sessionmaker(bind=engine)
-session = Session()
+metrics.register(metrics.Gauges("db_pool", "DB connection pool counter (see /pool_stats)", pool_stats))
+metrics.register(metrics.Gauges("response_cache", "Response cache counter (see /cache_stats)", lambda: response_cache.stats()))
+metrics.register(metrics.Gauges("live", "Live update hub counter (see /stream)", live.hub.stats))
+
+
+@app.middleware("http")
+async def record_metrics(request, call_next):
+    """
+    Latency per route, DB queries and stage timings per request (also sent
+    back as a Server-Timing header). With PROFILING_ENABLED=1, ?profile=1
+    returns collapsed stacks sampled while the request ran instead of its body.
+    """
+    stats = metrics.RequestStats()
+    token = metrics.current.set(stats)
+    status = 500
+    t0 = time.perf_counter()
+    try:
+        if metrics.PROFILING_ENABLED and request.query_params.get("profile") == "1":
+            with metrics.SamplingProfiler() as profiler:
+                response = await call_next(request)
+            response = PlainTextResponse(profiler.collapsed(), headers={"X-Profile-Samples": str(profiler.samples)})
+        else:
+            response = await call_next(request)
+        status = response.status_code
+    finally:
+        metrics.current.reset(token)
+        route = request.scope.get("route")
+        path = route.path if route is not None else "unmatched"
+        metrics.REQUEST_SECONDS.observe(time.perf_counter() - t0, request.method, path, status)
+        metrics.REQUEST_DB_QUERIES.observe(stats.db_queries, path)
+        metrics.REQUEST_DB_SECONDS.observe(stats.db_seconds, path)
+    response.headers["Server-Timing"] = stats.server_timing()
+    return response
 
 
 # ----------------------------
@@ -32,12 +100,45 @@ session = Session()
 class RunPipelineRequest(BaseModel):
     start: str = "2025-10-01"
     end: str = "2025-11-12"
+    workers: Optional[int] = None  # >1 runs tickers in a process pool
 
 
 class BacktestRequest(BaseModel):
     ticker: str
     start: str
     end: str
+    layout: str = "rows"  # or "columns": one array per field
+
+
+class PortfolioRequest(BaseModel):
+    tickers: List[str] = []  # empty = every ticker with news
+    start: str = "2025-10-01"
+    end: str = "2025-11-12"
+    buy_threshold: Optional[float] = None
+    sell_threshold: Optional[float] = None
+    size_fraction: Optional[float] = None
+
+
+class RobustnessRequest(BaseModel):
+    ticker: str
+    start: str = "2025-10-01"
+    end: str = "2025-11-12"
+    scenarios: int = 10000  # per kind
+    kinds: List[str] = ["bootstrap", "noise", "shuffle"]
+    block_size: Optional[int] = None  # bootstrap block length in days; default cube root of the bars
+    noise_std: float = 0.1  # std of the noise added to sentiment scores
+    confidence: float = 0.95
+    seed: int = 0
+
+
+class SweepRequest(BaseModel):
+    tickers: List[str] = []  # empty = every ticker with news
+    start: str = "2025-10-01"
+    end: str = "2025-11-12"
+    buy_thresholds: List[float] = [0.05, 0.1, 0.15, 0.2, 0.25, 0.3]
+    sell_thresholds: List[float] = [-0.05, -0.1, -0.15, -0.2, -0.25, -0.3]
+    size_fractions: List[float] = [0.05, 0.1, 0.2, 0.3]
+    top: int = 50
 
 
 # ----------------------------
@@ -53,86 +154,166 @@ def home():
 # 1️⃣ Fetch News API
 # ----------------------------
 @app.get("/fetch_news/{ticker}")
-def fetch_news(ticker: str, days: int = 7):
+def fetch_news(ticker: str, days: int = 7, limit: Optional[int] = None, cursor: Optional[str] = None,
+               fields: Optional[str] = None, format: str = "json", db: Session = Depends(get_db)):
     """
     Fetch latest news for a ticker from the last 'days' days.
     Automatically adjusts for timezone and missing recent entries.
+
+    Results come newest-first, limit (default and maximum MAX_NEWS_PAGE) per
+    page; pass next_cursor back as cursor for the next page (null on the last).
+    fields picks the returned keys (e.g. fields=title,sentiment skips the body),
+    and format=ndjson streams one JSON object per line (the whole window
+    unless limit is given).
     """
     end_date = datetime.now()
     start_date = end_date - timedelta(days=days)
 
-    # Use DATE() for better matching and avoid timezone mismatch
-    news = session.query(NewsSentiment).filter(
-        func.lower(NewsSentiment.ticker) == ticker.lower(),
-        func.date(NewsSentiment.created_at) >= start_date.date()
-    ).order_by(NewsSentiment.created_at.desc()).all()
+    selected = [f.strip() for f in fields.split(",") if f.strip()] if fields else list(NEWS_FIELDS)
+    unknown = [f for f in selected if f not in NEWS_FIELDS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    if limit is not None and not 0 < limit <= MAX_NEWS_PAGE:
+        raise HTTPException(status_code=400, detail=f"limit must be between 1 and {MAX_NEWS_PAGE}")
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if format == "ndjson":
+        return StreamingResponse(
+            _stream_news(ticker, start_date.date(), selected, after, limit),
+            media_type="application/x-ndjson"
+        )
+
+    # Whole days from start_date, as a range the ticker/created_at index can use;
+    # one row past the page tells whether there is another
+    limit = limit or MAX_NEWS_PAGE
+    news = news_page_query(db, ticker, start_date.date(), selected, after).limit(limit + 1).all()
 
     if not news:
-        return {"status": "success", "data": [], "message": f"No news found for {ticker}"}
+        return {"status": "success", "data": [], "next_cursor": None, "message": f"No news found for {ticker}"}
+
+    next_cursor = None
+    if len(news) > limit:
+        news = news[:limit]
+        next_cursor = encode_cursor(news[-1].created_at, news[-1]._id)
+
+    results = [news_row_to_dict(n, selected) for n in news]
+    return {"status": "success", "count": len(results), "data": results, "next_cursor": next_cursor}
+
+
+def _stream_news(ticker, start_date, fields, after, limit):
+    # Own session: the request's session is closed before a streamed body is sent.
+    # stream_results uses a server-side cursor, so rows are never all in memory.
+    with session_scope() as session:
+        query = news_page_query(session, ticker, start_date, fields, after)
+        if limit is not None:
+            query = query.limit(limit + 1)
+        rows = query.execution_options(stream_results=True, yield_per=NEWS_STREAM_BATCH)
+        sent = 0
+        for row in rows:
+            if limit is not None and sent == limit:
+                yield json.dumps({"next_cursor": encode_cursor(last.created_at, last._id)}) + "\n"
+                break
+            yield json.dumps(news_row_to_dict(row, fields), ensure_ascii=False) + "\n"
+            last = row
+            sent += 1
+
 
-    results = [
-        {
-            "title": n.title,
-            "context": n.content,
-            "sentiment": n.sentiment,
-            "confidence": n.confidence,
-            "source": n.source,
-            "created_at": n.created_at.strftime("%Y-%m-%d %H:%M:%S")
-        } for n in news
-    ]
+# ----------------------------
+# Response cache
+# ----------------------------
+def _render(payload):
+    with metrics.stage("render"):
+        return encode_json(payload)
 
-    return {"status": "success", "count": len(results), "data": results}
+
+def _cached(request, endpoint, ticker, params, build, encode=_render, media_type=JSON):
+    """
+    Serve build()'s payload through the response cache with an ETag; a
+    matching If-None-Match gets an empty 304. Entries expire after
+    RESPONSE_CACHE_TTL or as soon as new news for `ticker` is ingested.
+    """
+    body, etag = response_cache.get_or_compute(
+        endpoint, ticker, params, lambda: encode(build())
+    )
+    headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        response_cache.not_modified += 1
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type=media_type, headers=headers)
 
 
 @app.get("/sentiment_score/{ticker}")
-def sentiment_score(ticker: str, days: int = 30):
+def sentiment_score(ticker: str, request: Request, days: int = 30, db: Session = Depends(get_db)):
     """
     Returns the average sentiment score for the given ticker over the last 'days' days.
     """
-    end_date = datetime.now()
-    start_date = end_date - timedelta(days=days)
+    # the window moves with the calendar, so today's date is part of the key
+    params = {"days": days, "today": datetime.now().date()}
+    return _cached(request, "sentiment_score", ticker, params, lambda: _sentiment_score(ticker, days, db))
 
-    rows = session.query(NewsSentiment).filter(
-        func.lower(NewsSentiment.ticker) == ticker.lower(),
-        func.date(NewsSentiment.created_at) >= start_date.date()
-    ).all()
 
-    if not rows:
-        return {"ticker": ticker, "average_score": 0.0, "message": "No data found"}
+def _sentiment_score(ticker, days, db):
+    start_date = datetime.now() - timedelta(days=days)
+    summary = sentiment_summary(db, ticker, start_date.date())
 
-    def to_score(sentiment):
-        if sentiment.lower() == "positive":
-            return 1
-        elif sentiment.lower() == "negative":
-            return -1
-        return 0
-
-    scores = [to_score(r.sentiment) * r.confidence for r in rows]
-    avg_score = round(sum(scores) / len(scores), 3)
+    if not summary["total_articles"]:
+        return {"ticker": ticker, "average_score": 0.0, "message": "No data found"}
 
-    return {"ticker": ticker, "average_score": avg_score, "total_articles": len(rows)}
+    return _score_payload(ticker, summary)
 
 
 @app.get("/market_mood/{ticker}")
-def market_mood(ticker: str, days: int = 30):
+def market_mood(ticker: str, request: Request, days: int = 30, db: Session = Depends(get_db)):
     """
     Returns overall market mood for a ticker based on sentiment data.
     """
-    end_date = datetime.now()
-    start_date = end_date - timedelta(days=days)
+    params = {"days": days, "today": datetime.now().date()}
+    return _cached(request, "market_mood", ticker, params, lambda: _market_mood(ticker, days, db))
+
 
-    rows = session.query(NewsSentiment).filter(
-        func.lower(NewsSentiment.ticker) == ticker.lower(),
-        func.date(NewsSentiment.created_at) >= start_date.date()
-    ).all()
+def _market_mood(ticker, days, db):
+    start_date = datetime.now() - timedelta(days=days)
+    summary = sentiment_summary(db, ticker, start_date.date())
 
-    if not rows:
+    if not summary["total_articles"]:
         return {"ticker": ticker, "mood": "Neutral", "message": "No sentiment data"}
 
-    sentiment_counts = {"Positive": 0, "Negative": 0, "Neutral": 0}
-    for r in rows:
-        sentiment_counts[r.sentiment.capitalize()] = sentiment_counts.get(r.sentiment.capitalize(), 0) + 1
+    return _mood_payload(ticker, summary)
+
+
+@app.get("/ticker_summary/{ticker}")
+def ticker_summary(ticker: str, request: Request, days: int = 30, db: Session = Depends(get_db)):
+    """
+    Sentiment score, market mood and per-day buckets for a ticker, from one query.
+    """
+    params = {"days": days, "today": datetime.now().date()}
+    return _cached(request, "ticker_summary", ticker, params, lambda: _ticker_summary(ticker, days, db))
+
+
+def _ticker_summary(ticker, days, db):
+    start_date = datetime.now() - timedelta(days=days)
+    summary = sentiment_summary(db, ticker, start_date.date())
+
+    if not summary["total_articles"]:
+        return {"ticker": ticker, "average_score": 0.0, "mood": "Neutral", "daily": [], "message": "No data found"}
+
+    return {
+        **_score_payload(ticker, summary),
+        **_mood_payload(ticker, summary),
+        "daily": summary["daily"]
+    }
+
 
+def _score_payload(ticker, summary):
+    avg_score = round(summary["score_sum"] / summary["total_articles"], 3)
+    return {"ticker": ticker, "average_score": avg_score, "total_articles": summary["total_articles"]}
+
+
+def _mood_payload(ticker, summary):
+    sentiment_counts = summary["counts"]
     dominant = max(sentiment_counts, key=sentiment_counts.get)
     mood_summary = {
         "Positive": f"{ticker} sentiment is optimistic 🚀",
@@ -144,56 +325,224 @@ def market_mood(ticker: str, days: int = 30):
         "ticker": ticker,
         "dominant_mood": dominant,
         "counts": sentiment_counts,
-        "summary": mood_summary[dominant]
+        "summary": mood_summary.get(dominant, f"{ticker} sentiment is {dominant.lower()}")
     }
 # ----------------------------
 # 4️⃣ Run Full Pipeline
 # ----------------------------
-@app.post("/run_full_pipeline")
+@app.post("/run_full_pipeline", status_code=202)
 def run_full_pipeline_endpoint(req: RunPipelineRequest):
+    """
+    Queue the pipeline as a background job and return its id straight away.
+    Poll /jobs/{job_id} for per-ticker progress.
+    """
+    job = jobs.store.submit("run_full_pipeline", _pipeline_job, start=req.start, end=req.end, workers=req.workers)
+    return {"status": "accepted", "job_id": job.id, "message": "Pipeline queued"}
+
+
+def _pipeline_job(job, start, end, workers=None):
+    from run_full_pipeline import run_pipeline, run_pipeline_parallel, PIPELINE_WORKERS
+    if (workers or PIPELINE_WORKERS) > 1:
+        run_pipeline_parallel(start, end, workers=workers, on_progress=job.progress,
+                              should_stop=job.cancel_event.is_set)
+    else:
+        run_pipeline(start, end, on_progress=job.progress, should_stop=job.cancel_event.is_set)
+
+
+@app.get("/jobs/{job_id}")
+def get_job(job_id: str):
+    job = jobs.store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job {job_id}")
+    return job.to_dict()
+
+
+@app.delete("/jobs/{job_id}")
+def cancel_job(job_id: str):
+    """Cancel a queued job, or stop a running one before its next ticker"""
+    job = jobs.store.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job {job_id}")
+    return job.to_dict()
+
+
+# ----------------------------
+# 5️⃣ Backtest / Simulate Strategy
+# ----------------------------
+@app.post("/simulate_strategy")
+def run_backtest(req: BacktestRequest, request: Request, db: Session = Depends(get_db)):
+    """
+    Backtest one ticker. Send Accept: application/vnd.apache.arrow.stream for
+    price_history as an Arrow IPC stream (ticker, metrics and transactions in
+    the schema metadata under "meta").
+    """
+    if req.layout not in ("rows", "columns"):
+        raise HTTPException(status_code=400, detail="layout must be 'rows' or 'columns'")
+    arrow = wants_arrow(request.headers.get("accept"))
+    if arrow:
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise HTTPException(status_code=406, detail="Arrow responses need pyarrow installed on the server")
     try:
-        run_pipeline(req.start, req.end)
-        return {"status": "success", "message": "Pipeline executed successfully"}
+        from run_full_pipeline import simulate_strategy
+        layout = "columns" if arrow else req.layout
+        params = {"start": req.start, "end": req.end, "layout": layout, "arrow": arrow}
+        build = lambda: {"status": "success", "results": simulate_strategy(req.ticker, req.start, req.end, db, layout)}
+        if arrow:
+            return _cached(request, "simulate_strategy", req.ticker, params, build,
+                           encode=_render_arrow, media_type=ARROW)
+        return _cached(request, "simulate_strategy", req.ticker, params, build)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _render_arrow(payload):
+    results = payload["results"]
+    with metrics.stage("render"):
+        return encode_arrow(results["price_history"], {
+            "ticker": results["ticker"],
+            "metrics": results["metrics"],
+            "transactions": results["transactions"],
+        })
+
+
 # ----------------------------
-# 5️⃣ Backtest / Simulate Strategy
+# Portfolio backtest (shared cash)
 # ----------------------------
-@app.post("/simulate_strategy")
-def run_backtest(req: BacktestRequest):
+@app.post("/simulate_portfolio")
+def run_portfolio_backtest(req: PortfolioRequest, db: Session = Depends(get_db)):
     try:
-        results = simulate_strategy(req.ticker, req.start, req.end)
+        import run_full_pipeline as rfp
+        results = rfp.simulate_portfolio(
+            req.tickers, req.start, req.end, db,
+            buy_threshold=rfp.BUY_THRESHOLD if req.buy_threshold is None else req.buy_threshold,
+            sell_threshold=rfp.SELL_THRESHOLD if req.sell_threshold is None else req.sell_threshold,
+            size_fraction=rfp.SIZE_FRACTION if req.size_fraction is None else req.size_fraction,
+        )
         return {"status": "success", "results": results}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# ----------------------------
+# Parameter sweep
+# ----------------------------
+@app.post("/sweep")
+def run_sweep(req: SweepRequest, db: Session = Depends(get_db)):
+    """
+    Backtest every combination of the given thresholds and sizing fractions
+    and return the best `top` rows ranked by ROI%.
+    """
+    n_combos = len(req.buy_thresholds) * len(req.sell_thresholds) * len(req.size_fractions)
+    if n_combos > MAX_SWEEP_COMBOS:
+        raise HTTPException(status_code=400, detail=f"Grid has {n_combos} combinations, limit is {MAX_SWEEP_COMBOS}")
+    try:
+        from run_full_pipeline import sweep_strategy
+        ranked = sweep_strategy(req.tickers, req.start, req.end, req.buy_thresholds,
+                                req.sell_thresholds, req.size_fractions, db)
+        return {"status": "success", "combinations": n_combos, "results": ranked[:req.top]}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# ----------------------------
+# Robustness (Monte Carlo / bootstrap)
+# ----------------------------
+@app.post("/robustness")
+def run_robustness(req: RobustnessRequest, request: Request, db: Session = Depends(get_db)):
+    """
+    Re-run the backtest over `scenarios` resampled paths per kind (block
+    bootstrap, sentiment noise, shuffled timing; at most
+    MAX_ROBUSTNESS_SCENARIOS in total) and return confidence
+    intervals for ROI% / MaxDrawdown% and the shuffle test's p-value.
+    """
+    kinds = tuple(dict.fromkeys(req.kinds))
+    unknown = [k for k in kinds if k not in robustness.KINDS]
+    if unknown or not kinds:
+        raise HTTPException(status_code=400,
+                            detail=f"kinds must be a non-empty subset of {', '.join(robustness.KINDS)}")
+    # the cap is on the total work, so asking for every kind can't triple it
+    if req.scenarios < 1 or req.scenarios * len(kinds) > MAX_ROBUSTNESS_SCENARIOS:
+        raise HTTPException(status_code=400,
+                            detail=f"scenarios x kinds must be between 1 and {MAX_ROBUSTNESS_SCENARIOS}")
+    if not 0 < req.confidence < 1 or req.noise_std < 0 or (req.block_size is not None and req.block_size < 1):
+        raise HTTPException(status_code=400, detail="confidence must be in (0, 1), noise_std >= 0 and block_size >= 1")
+    try:
+        from run_full_pipeline import robustness_strategy
+        params = req.model_dump(exclude={"ticker"})
+        build = lambda: {"status": "success", "results": robustness_strategy(
+            req.ticker, req.start, req.end, db, req.scenarios, kinds, req.block_size,
+            req.noise_std, req.confidence, req.seed,
+        )}
+        # seeded, so the same request gives the same answer until new news arrives
+        return _cached(request, "robustness", req.ticker, params, build)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 # ----------------------------
 # 6️⃣ XAI Endpoint
 # ----------------------------
 @app.get("/xai/{ticker}")
-def explain_ticker(ticker: str):
+def explain_ticker(ticker: str, request: Request, db: Session = Depends(get_db)):
     try:
-        start = "2025-10-01"
-        end = "2025-11-12"
-        sentences = generate_xai_sentences(ticker, start, end)
-        
-        # Get top keywords from database
-        top_keywords = session.query(KeywordImportance).filter(
-            KeywordImportance.ticker == ticker
-        ).order_by(KeywordImportance.importance_score.desc()).limit(10).all()
-        
-        keywords = [
-            {"word": k.keyword, "score": float(k.importance_score)}
-            for k in top_keywords
-        ] if top_keywords else []
-        
-        return {
-            "ticker": ticker,
-            "explanations": sentences,
-            "keywords": keywords
-        }
+        return _cached(request, "xai", ticker, {}, lambda: _explain_ticker(ticker, db))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+def _explain_ticker(ticker, db):
+    from run_full_pipeline import generate_xai_sentences, xai_keywords
+    start = "2025-10-01"
+    end = "2025-11-12"
+    sentences = generate_xai_sentences(ticker, start, end, db, max_sentences=XAI_MAX_SENTENCES)
+    keywords = xai_keywords(ticker, start, end, db)
+    
+    return {
+        "ticker": ticker,
+        "explanations": sentences,
+        "keywords": keywords
+    }
+
+
+# ----------------------------
+# Live updates (server-sent events)
+# ----------------------------
+@app.get("/stream")
+async def stream_updates(request: Request, tickers: str):
+    """
+    Server-sent events for a comma-separated list of tickers: a "snapshot" of
+    each ticker's rolling aggregates, then an "update" per tick carrying newly
+    ingested articles and the refreshed aggregates. A "resync" event means
+    the client fell behind and should refetch over REST.
+    """
+    wanted = list(dict.fromkeys(t.strip().upper() for t in tickers.split(",") if t.strip()))
+    if not wanted:
+        raise HTTPException(status_code=400, detail="tickers is empty")
+    if len(wanted) > live.LIVE_MAX_TICKERS:
+        raise HTTPException(status_code=400, detail=f"At most {live.LIVE_MAX_TICKERS} tickers per stream")
+    return StreamingResponse(
+        live.stream(live.hub, request, wanted),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+# ----------------------------
+# DB connection pool stats
+# ----------------------------
+@app.get("/pool_stats")
+def get_pool_stats():
+    return pool_stats()
+
+
+@app.get("/metrics")
+def get_metrics():
+    """Prometheus text exposition of the counters above"""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/cache_stats")
+def get_cache_stats():
+    return response_cache.stats()
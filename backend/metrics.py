@@ -0,0 +1,214 @@
+# metrics.py
+# Latency histograms, per-request DB query counts and stage timings, rendered
+# in the Prometheus text format for /metrics, plus an opt-in sampling profiler.
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from sqlalchemy import event
+
+# 1 = honour ?profile=1 on any request (samples every thread, so use it on a quiet instance)
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "0") == "1"
+PROFILE_INTERVAL = float(os.getenv("PROFILE_INTERVAL", "0.005"))  # seconds between samples
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 25, 50, 100, 250)
+
+
+# ----------------------------
+# Metric types
+# ----------------------------
+class Histogram:
+    def __init__(self, name, help, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = buckets
+        self._series = {}  # label values -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted(self._series.items())
+        for label_values, series in items:
+            base = _labels(self.labels, label_values)
+            for bound, n in zip(self.buckets, series):
+                lines.append(f"{self.name}_bucket{_labels(self.labels, label_values, le=bound)} {n}")
+            lines.append(f"{self.name}_bucket{_labels(self.labels, label_values, le='+Inf')} {series[-1]}")
+            lines.append(f"{self.name}_sum{base} {series[-2]:.6f}")
+            lines.append(f"{self.name}_count{base} {series[-1]}")
+        return lines
+
+
+class Gauges:
+    """Values read at scrape time from a callback returning {name: value}"""
+
+    def __init__(self, prefix, help, collect):
+        self.prefix = prefix
+        self.help = help
+        self.collect = collect
+
+    def render(self):
+        lines = []
+        try:
+            values = self.collect()
+        except Exception as e:
+            return [f"# {self.prefix} unavailable: {e}"]
+        for key, value in sorted(values.items()):
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                continue
+            name = f"{self.prefix}_{key}"
+            lines += [f"# HELP {name} {self.help}", f"# TYPE {name} gauge", f"{name} {value}"]
+        return lines
+
+
+def _labels(names, values, le=None):
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if le is not None:
+        pairs.append(f'le="{le}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+REQUEST_SECONDS = Histogram("http_request_duration_seconds", "Request latency by route",
+                            ("method", "route", "status"))
+REQUEST_DB_QUERIES = Histogram("http_request_db_queries", "DB queries issued per request",
+                               ("route",), COUNT_BUCKETS)
+REQUEST_DB_SECONDS = Histogram("http_request_db_seconds", "Time spent in DB queries per request", ("route",))
+STAGE_SECONDS = Histogram("stage_duration_seconds", "Time per pipeline / backtest stage", ("stage",))
+DB_QUERY_SECONDS = Histogram("db_query_duration_seconds", "Duration of individual DB queries")
+
+registry = [REQUEST_SECONDS, REQUEST_DB_QUERIES, REQUEST_DB_SECONDS, STAGE_SECONDS, DB_QUERY_SECONDS]
+
+
+def register(collector):
+    registry.append(collector)
+
+
+def render():
+    lines = []
+    for collector in registry:
+        lines += collector.render()
+    return "\n".join(lines) + "\n"
+
+
+# ----------------------------
+# Per-request accounting
+# ----------------------------
+class RequestStats:
+    def __init__(self):
+        self.db_queries = 0
+        self.db_seconds = 0.0
+        self.stages = {}  # stage -> seconds
+
+    def server_timing(self):
+        """Server-Timing header value, so the browser dev tools show the breakdown"""
+        parts = [f"db;desc=\"{self.db_queries} queries\";dur={self.db_seconds * 1000:.1f}"]
+        parts += [f"{name};dur={s * 1000:.1f}" for name, s in self.stages.items()]
+        return ", ".join(parts)
+
+
+# set by the middleware; FastAPI copies the context into the threadpool that runs sync endpoints
+current = ContextVar("request_stats", default=None)
+
+
+@contextmanager
+def stage(name):
+    """Time a block into stage_duration_seconds and the current request's Server-Timing"""
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - t0
+        STAGE_SECONDS.observe(elapsed, name)
+        stats = current.get()
+        if stats is not None:
+            stats.stages[name] = stats.stages.get(name, 0.0) + elapsed
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+    DB_QUERY_SECONDS.observe(elapsed)
+    stats = current.get()
+    if stats is not None:
+        stats.db_queries += 1
+        stats.db_seconds += elapsed
+
+
+def instrument_engine(engine):
+    """
+    Time every statement on `engine` and charge it to the current request.
+    Called by main.py at startup; safe to call again for the same engine.
+    """
+    if event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        return engine
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    return engine
+
+
+# ----------------------------
+# Sampling profiler
+# ----------------------------
+_IDLE_FILES = ("threading.py", "queue.py", "selectors.py", "thread.py", "base_events.py")
+
+
+class SamplingProfiler:
+    """
+    Samples the stacks of every other thread every `interval` seconds and
+    counts them as collapsed stacks ("a;b;c count", the flamegraph.pl input
+    format). Threads parked in a lock or selector wait are skipped.
+    """
+
+    def __init__(self, interval=PROFILE_INTERVAL):
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        me = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            self.samples += 1
+            for ident, frame in sys._current_frames().items():
+                if ident == me or frame.f_code.co_filename.endswith(_IDLE_FILES):
+                    continue
+                names = []
+                while frame is not None:
+                    names.append(f"{frame.f_code.co_name} ({os.path.basename(frame.f_code.co_filename)}:{frame.f_lineno})")
+                    frame = frame.f_back
+                self.stacks[";".join(reversed(names))] += 1
+
+    def collapsed(self):
+        return "\n".join(f"{stack} {n}" for stack, n in self.stacks.most_common()) + "\n"
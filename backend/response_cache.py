@@ -0,0 +1,189 @@
+# response_cache.py
+# TTL + LRU cache for computed API responses. Keys carry a per-ticker data
+# version that ingestion bumps, so new news_sentiment rows invalidate every
+# cached response for that ticker at once, plus a global version for
+# rebuilds that touch every ticker. Rebuilds and retention in db/ reach the
+# cache through db.changes.
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from db import changes
+
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "60"))  # seconds; 0 disables
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "1024"))
+# e.g. redis://localhost:6379/0 to share entries and versions across workers
+RESPONSE_CACHE_URL = os.getenv("RESPONSE_CACHE_URL", "")
+
+
+# ----------------------------
+# Backends
+# ----------------------------
+# A backend stores bytes with a TTL and keeps integer counters:
+#   get(key) -> bytes | None, set(key, value, ttl), incr(key) -> int, counter(key) -> int
+
+class MemoryBackend:
+    """Per-process store. Versions bumped in another process (e.g. the ingest
+    CLI) are not seen here, so those changes show up after at most one TTL."""
+
+    def __init__(self, maxsize=RESPONSE_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def incr(self, key):
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+    def counter(self, key):
+        return self._counters.get(key, 0)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class RedisBackend:
+    """Shared store; needs the `redis` package. Redis does its own LRU
+    eviction when configured with maxmemory-policy allkeys-lru."""
+
+    def __init__(self, url, prefix="hfs:"):
+        import redis
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def get(self, key):
+        return self.client.get(self.prefix + key)
+
+    def set(self, key, value, ttl):
+        self.client.set(self.prefix + key, value, ex=max(1, int(ttl)))
+
+    def incr(self, key):
+        return int(self.client.incr(self.prefix + key))
+
+    def counter(self, key):
+        return int(self.client.get(self.prefix + key) or 0)
+
+    def clear(self):
+        for key in self.client.scan_iter(self.prefix + "resp:*"):
+            self.client.delete(key)
+
+    def __len__(self):
+        return sum(1 for _ in self.client.scan_iter(self.prefix + "resp:*"))
+
+
+def make_backend(url=RESPONSE_CACHE_URL):
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisBackend(url)
+    return MemoryBackend()
+
+
+# ----------------------------
+# Cache
+# ----------------------------
+class ResponseCache:
+    def __init__(self, backend=None, ttl=RESPONSE_CACHE_TTL):
+        self.backend = backend if backend is not None else make_backend()
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    @property
+    def enabled(self):
+        return self.ttl > 0
+
+    def version(self, ticker):
+        return self.backend.counter(f"ver:{ticker.upper()}")
+
+    def bump(self, tickers):
+        """Invalidate everything cached for these tickers"""
+        for ticker in {t.upper() for t in tickers if t}:
+            self.backend.incr(f"ver:{ticker}")
+
+    def bump_all(self):
+        """Invalidate every cached response"""
+        self.backend.incr("ver:*")
+
+    def invalidate(self, tickers=None):
+        """db.changes listener: tickers=None means everything"""
+        if tickers is None:
+            self.bump_all()
+        else:
+            self.bump(tickers)
+
+    def key(self, endpoint, ticker, params):
+        # the ticker is keyed as given because payloads echo it back; versions are per upper-cased ticker
+        versions = [self.backend.counter("ver:*"), self.version(ticker)]
+        basis = json.dumps([endpoint, ticker, versions, params], sort_keys=True, default=str)
+        return "resp:" + hashlib.sha1(basis.encode()).hexdigest()
+
+    def get_or_compute(self, endpoint, ticker, params, compute):
+        """
+        Return (body, etag) for the response; compute() -> bytes runs only on a
+        miss. Exceptions from compute() propagate and nothing is cached.
+        """
+        key = self.key(endpoint, ticker, params)
+        body = self.backend.get(key) if self.enabled else None
+        if body is not None:
+            self.hits += 1
+        else:
+            self.misses += 1
+            body = compute()
+            if self.enabled:
+                self.backend.set(key, body, self.ttl)
+        return body, etag_for(body)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "backend": type(self.backend).__name__,
+            "ttl": self.ttl,
+            "entries": len(self.backend),
+            "hits": self.hits,
+            "misses": self.misses,
+            "not_modified": self.not_modified,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+def etag_for(body):
+    return '"' + hashlib.sha1(body).hexdigest() + '"'
+
+
+def etag_matches(if_none_match, etag):
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [t.strip().removeprefix("W/") for t in if_none_match.split(",")]
+    return etag in candidates
+
+
+cache = ResponseCache()
+changes.subscribe(cache.invalidate)
@@ -1,18 +1,23 @@
 # run_full_pipeline.py
+import multiprocessing
+import os
+import queue
+import numpy as np
 import pandas as pd
-import yfinance as yf
-from datetime import datetime
+from datetime import datetime, time, timedelta
 from collections import Counter
-import re
-from sqlalchemy.orm import sessionmaker
-from db.db_connect import engine
-from db.models import NewsSentiment, KeywordImportance
-
-# ----------------------------
-# DB session
-# ----------------------------
-Session = sessionmaker(bind=engine)
-session = Session()
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from db.db_connect import session_scope, reset_engine
+from db.models import NewsSentiment
+from db.keywords import tokenize, top_keywords, rank_keywords
+from db.rollup import sentiment_label
+from db.archive import latest_headlines
+from strategy.engine import run_backtest, max_drawdown, roi_pct, BUY
+from strategy.sweep import sweep
+from strategy.portfolio import align, simulate_portfolio as run_portfolio, portfolio_metrics
+from strategy.robustness import analyze, KINDS
+from db.queries import daily_scores, ticker_window_filter
+from metrics import stage
 
 # ----------------------------
 # Demo price data
@@ -26,26 +31,18 @@ def fetch_demo_prices(ticker, start, end):
 # ----------------------------
 # Fetch sentiment from DB (use demo if empty)
 # ----------------------------
-def fetch_sentiment_from_db(ticker, start, end):
-    rows = session.query(NewsSentiment).filter(
-        NewsSentiment.ticker==ticker,
-        NewsSentiment.created_at.between(start, end)
-    ).all()
-    
-    data = []
-    for r in rows:
-        score = 1 if r.sentiment=="Positive" else -1 if r.sentiment=="Negative" else 0
-        data.append({"date": r.created_at.date(), "sentiment_score": score * r.confidence})
+def fetch_sentiment_from_db(ticker, start, end, db=None):
+    """Daily mean sentiment_score for [start, end) from the daily_sentiment rollup"""
+    with session_scope(db) as session:
+        rows = daily_scores(session, [ticker], pd.Timestamp(start).date(), pd.Timestamp(end).date())
     
-    df = pd.DataFrame(data)
+    df = pd.DataFrame([(r.day, r.mean_score) for r in rows], columns=["date", "sentiment_score"])
     
     if df.empty:
         # generate demo sentiment if none exists
         dates = pd.date_range(start=start, end=end)
         demo_scores = [0.2 if i%2==0 else -0.1 for i in range(len(dates))]
         df = pd.DataFrame({"date": dates.date, "sentiment_score": demo_scores})
-    else:
-        df = df.groupby("date")["sentiment_score"].mean().reset_index()
     
     return df
 
@@ -55,128 +52,382 @@ def fetch_sentiment_from_db(ticker, start, end):
 BUY_THRESHOLD = 0.15
 SELL_THRESHOLD = -0.15
 INITIAL_CAPITAL = 100000.0
+SIZE_FRACTION = 0.1  # share of cash spent per BUY
+
+def load_merged(ticker, start, end, db=None):
+    """Daily Close and mean sentiment_score for a ticker, one row per date"""
+    with stage("fetch_sentiment"):
+        sentiment_df = fetch_sentiment_from_db(ticker, start, end, db)
+    with stage("fetch_prices"):
+        prices_df = fetch_demo_prices(ticker, start, end)
+    with stage("merge"):
+        return prices_df.merge(sentiment_df, left_on="date", right_on="date", how="left").fillna(0.0)
+
+def simulate_strategy(ticker, start, end, db=None, layout="rows"):
+    """
+    Backtest one ticker. layout="rows" returns price_history / transactions as
+    lists of per-day dicts (what the dashboard charts take); layout="columns"
+    returns one array per field, which is far cheaper to build and encode.
+    """
+    merged = load_merged(ticker, start, end, db)
+    
+    closes = merged["Close"].to_numpy(dtype=float)
+    scores = merged["sentiment_score"].to_numpy(dtype=float)
+    with stage("simulate"):
+        result = run_backtest(closes, scores, BUY_THRESHOLD, SELL_THRESHOLD, INITIAL_CAPITAL, SIZE_FRACTION)
+    with stage("serialize"):
+        if layout == "columns":
+            return _strategy_columns(ticker, merged, closes, scores, result)
+        return _strategy_output(ticker, merged, closes, scores, result)
+
+def _strategy_metrics(portfolio_values):
+    drawdown = max_drawdown(portfolio_values)*100
+    return {
+        "InitialCapital": INITIAL_CAPITAL,
+        "ROI%": round(roi_pct(portfolio_values), 2),
+        "MaxDrawdown%": round(drawdown, 2),
+        "CurrentPortfolioValue": round(float(portfolio_values[-1]), 2)
+    }
+
+def _strategy_columns(ticker, merged, closes, scores, result):
+    """Columnar output: numpy arrays, left for the encoder to serialize directly"""
+    dates = merged["date"].astype(str).to_numpy()
+    tx_index = result["tx_index"]
+    return {
+        "ticker": ticker,
+        "price_history": {
+            "date": dates.tolist(),
+            "Close": np.round(closes, 2),
+            "sentiment_score": np.round(scores, 3),
+            "total_value": np.round(result["total_value"], 2),
+        },
+        "transactions": {
+            "date": dates[tx_index].tolist(),
+            "action": np.where(result["tx_action"] == BUY, "BUY", "SELL").tolist(),
+            "qty": result["tx_qty"],
+            "price": result["tx_price"],
+        },
+        "metrics": _strategy_metrics(result["total_value"]),
+    }
 
-def simulate_strategy(ticker, start, end):
-    sentiment_df = fetch_sentiment_from_db(ticker, start, end)
-    prices_df = fetch_demo_prices(ticker, start, end)
-    
-    merged = prices_df.merge(sentiment_df, left_on="date", right_on="date", how="left").fillna(0.0)
-    
-    cash = INITIAL_CAPITAL
-    position = 0
-    portfolio_values = []
-    transactions = []
-    
-    for _, row in merged.iterrows():
-        price = row["Close"]
-        score = row["sentiment_score"]
-        action = "HOLD"
-        if score > BUY_THRESHOLD and cash >= price:
-            qty = int((0.1*cash)//price)
-            if qty > 0:
-                cash -= qty*price
-                position += qty
-                action="BUY"
-                transactions.append({"date": str(row["date"]), "action": action, "qty": qty, "price": price})
-        elif score < SELL_THRESHOLD and position > 0:
-            cash += position*price
-            action="SELL"
-            transactions.append({"date": str(row["date"]), "action": action, "qty": position, "price": price})
-            position = 0
-        total_value = cash + position*price
-        portfolio_values.append(total_value)
-    
-    merged["total_value"] = portfolio_values
-    roi = (portfolio_values[-1] - portfolio_values[0])/portfolio_values[0]*100
-    max_drawdown = ((merged["total_value"].cummax() - merged["total_value"])/merged["total_value"].cummax()).max()*100
+def _strategy_output(ticker, merged, closes, scores, result):
+    portfolio_values = result["total_value"]
+    dates = [str(d) for d in merged["date"]]
+    
+    transactions = [
+        {"date": dates[i], "action": "BUY" if a == BUY else "SELL", "qty": q, "price": p}
+        for i, a, q, p in zip(result["tx_index"].tolist(), result["tx_action"].tolist(),
+                              result["tx_qty"].tolist(), result["tx_price"].tolist())
+    ]
     
     # Build price_history for frontend
-    price_history = []
-    for idx, row in merged.iterrows():
-        price_history.append({
-            "date": str(row["date"]),
-            "Close": round(float(row["Close"]), 2),
-            "sentiment_score": round(float(row["sentiment_score"]), 3),
-            "total_value": round(float(row["total_value"]), 2)
-        })
+    price_history = [
+        {
+            "date": d,
+            "Close": round(c, 2),
+            "sentiment_score": round(s, 3),
+            "total_value": round(v, 2)
+        } for d, c, s, v in zip(dates, closes.tolist(), scores.tolist(), portfolio_values.tolist())
+    ]
     
     return {
         "ticker": ticker,
         "price_history": price_history,
         "transactions": transactions,
-        "metrics": {
-            "InitialCapital": INITIAL_CAPITAL,
-            "ROI%": round(roi, 2),
-            "MaxDrawdown%": round(max_drawdown, 2),
-            "CurrentPortfolioValue": round(portfolio_values[-1], 2)
-        }
+        "metrics": _strategy_metrics(portfolio_values)
     }
 
 # ----------------------------
-# XAI
+# Parameter sweep
+# ----------------------------
+def sweep_strategy(tickers, start, end, buy_thresholds, sell_thresholds, size_fractions, db=None):
+    """
+    Rank every (buy, sell, size) combination by ROI over the given tickers.
+    Prices and sentiment are loaded once per ticker and shared by the whole grid.
+    """
+    with session_scope(db) as session:
+        tickers = tickers or list_tickers(session)
+        series = {}
+        for ticker in tickers:
+            merged = load_merged(ticker, start, end, session)
+            series[ticker] = (merged["Close"].to_numpy(dtype=float), merged["sentiment_score"].to_numpy(dtype=float))
+    return sweep(series, buy_thresholds, sell_thresholds, size_fractions, INITIAL_CAPITAL)
+
 # ----------------------------
-def tokenize(text):
-    return re.findall(r'\b[a-z]{3,}\b', text.lower())
+# Robustness (Monte Carlo / bootstrap)
+# ----------------------------
+def robustness_strategy(ticker, start, end, db=None, scenarios=10_000, kinds=KINDS, block_size=None,
+                        noise_std=0.1, confidence=0.95, seed=0, parallel=True):
+    """
+    simulate_strategy's ROI% / MaxDrawdown% next to their spread over resampled
+    scenarios (see strategy/robustness.py). Deterministic for a given seed.
+    """
+    merged = load_merged(ticker, start, end, db)
+    with stage("robustness"):
+        result = analyze(
+            merged["Close"].to_numpy(dtype=float), merged["sentiment_score"].to_numpy(dtype=float),
+            BUY_THRESHOLD, SELL_THRESHOLD, INITIAL_CAPITAL, SIZE_FRACTION,
+            scenarios=scenarios, kinds=kinds, block_size=block_size, noise_std=noise_std,
+            confidence=confidence, seed=seed, parallel=parallel,
+        )
+    return {"ticker": ticker, **result}
 
-def generate_xai_sentences(ticker, start, end):
-    rows = session.query(NewsSentiment).filter(
-        NewsSentiment.ticker==ticker,
-        NewsSentiment.created_at.between(start, end)
-    ).all()
+# ----------------------------
+# Portfolio (shared cash across tickers)
+# ----------------------------
+def simulate_portfolio(tickers, start, end, db=None, buy_threshold=BUY_THRESHOLD,
+                       sell_threshold=SELL_THRESHOLD, size_fraction=SIZE_FRACTION):
+    """
+    Backtest a universe of tickers against one shared INITIAL_CAPITAL.
+    Sentiment for every ticker comes from the daily_sentiment rollup in one
+    query; days without news count as a neutral 0 score.
+    """
+    with session_scope(db) as session:
+        tickers = sorted({t.upper() for t in tickers or list_tickers(session)})
+        # [start, end), the same days as fetch_sentiment_from_db feeds simulate_strategy
+        rows = daily_scores(session, tickers, pd.Timestamp(start).date(), pd.Timestamp(end).date())
     
-    sentences = []
-    demo_headlines = [
+    scores = {}
+    if rows:
+        long = pd.DataFrame(rows, columns=["ticker", "date", "sentiment_score"])
+        long["date"] = pd.to_datetime(long["date"]).dt.date
+        for ticker, group in long.groupby("ticker"):
+            scores[ticker] = group.set_index("date")["sentiment_score"].astype(float)
+    prices = {t: fetch_demo_prices(t, start, end).set_index("date")["Close"] for t in tickers}
+    
+    dates, tickers, price_matrix, score_matrix = align(prices, scores)
+    result = run_portfolio(price_matrix, score_matrix, buy_threshold, sell_threshold,
+                           INITIAL_CAPITAL, size_fraction)
+    
+    held = result["positions"] > 0
+    return {
+        "tickers": tickers,
+        "metrics": portfolio_metrics(result["total_value"], INITIAL_CAPITAL),
+        "history": {
+            "date": [str(d) for d in dates],
+            "total_value": [round(v, 2) for v in result["total_value"].tolist()],
+            "cash": [round(v, 2) for v in result["cash"].tolist()],
+        },
+        "positions": {t: int(q) for t, q in zip(np.array(tickers)[held].tolist(), result["positions"][held].tolist())},
+        "trades": {"buys": int(result["buys"].sum()), "sells": int(result["sells"].sum())},
+    }
+
+# ----------------------------
+# XAI
+# ----------------------------
+XAI_KEYWORD_FALLBACK_ROWS = int(os.getenv("XAI_KEYWORD_FALLBACK_ROWS", "5000"))  # latest articles tokenized when the index is empty
+
+def demo_headlines(ticker):
+    return [
         f"{ticker} shows stable growth amid market fluctuations.",
         f"{ticker} has a few negative news points, but overall sentiment is positive.",
         f"Investors are cautiously optimistic about {ticker}."
     ]
+
+def _xai_window(start, end):
+    """[start, end + 1 day) as dates: both XAI reads take `end` as an inclusive date"""
+    start_day = pd.Timestamp(start).date()
+    end_day = pd.Timestamp(end).date() + timedelta(days=1)
+    return start_day, end_day
+
+def generate_xai_sentences(ticker, start, end, db=None, max_sentences=None):
+    """
+    One sentence per headline in the window, oldest first; with max_sentences
+    only the latest that many. Read-only; keywords come from xai_keywords.
+    """
+    start_day, end_day = _xai_window(start, end)
+    lo, hi = datetime.combine(start_day, time.min), datetime.combine(end_day, time.min)
+    with session_scope(db) as session:
+        rows = session.query(
+            NewsSentiment.title, NewsSentiment.sentiment, NewsSentiment.created_at
+        ).filter(
+            NewsSentiment.ticker==ticker,
+            NewsSentiment.created_at >= lo,
+            NewsSentiment.created_at < hi
+        ).order_by(NewsSentiment.created_at.desc(), NewsSentiment.id.desc()).limit(max_sentences).all()
+        if max_sentences is None or len(rows) < max_sentences:
+            # older months may have been moved to the Parquet archive by retention
+            rest = None if max_sentences is None else max_sentences - len(rows)
+            rows += latest_headlines(session, ticker, lo, hi, rest)
     
     if not rows:
-        # Use demo headlines for XAI and keywords
-        rows = []
-        for h in demo_headlines:
-            rows.append(type('obj', (object,), {"title": h, "sentiment": "Positive", "confidence": 0.8, "created_at": datetime.now()} )())
-        sentences.append(f"For {ticker}, overall market mood is moderately positive based on recent news.")
-    else:
-        # real data
-        for r in rows:
-            mood = "positive" if r.sentiment=="Positive" else "negative" if r.sentiment=="Negative" else "neutral"
-            sentences.append(f"On {r.created_at.date()}, the news headline '{r.title}' indicates {mood} market mood.")
-    
-    # extract top keywords from whatever headlines we have
-    counter = Counter()
-    for r in rows:
-        tokens = set(tokenize(r.title))
-        score = 1 if r.sentiment=="Positive" else -1 if r.sentiment=="Negative" else 0
-        for t in tokens:
-            counter[t] += score * float(r.confidence)
-    top_keywords = sorted(counter.items(), key=lambda x: abs(x[1]), reverse=True)[:10]
-    for k, v in top_keywords:
-        ki = KeywordImportance(ticker=ticker, word=k, score=float(round(v, 3)))
-        session.add(ki)
-    session.commit()
+        return [f"For {ticker}, overall market mood is moderately positive based on recent news."]
     
+    sentences = []
+    for r in reversed(rows):
+        mood = sentiment_label(r.sentiment).lower()
+        sentences.append(f"On {r.created_at.date()}, the news headline '{r.title}' indicates {mood} market mood.")
     return sentences
 
+def xai_keywords(ticker, start, end, db=None, top_n=10):
+    """
+    Top keywords for the window from the keyword_daily index. When nothing is
+    indexed for it, the window's latest XAI_KEYWORD_FALLBACK_ROWS articles are
+    tokenized on the fly; the demo headlines are only used when there are no
+    articles either.
+    """
+    start_day, end_day = _xai_window(start, end)
+    with session_scope(db) as session:
+        keywords = top_keywords(session, ticker, start_day, end_day, top_n)
+        if keywords:
+            return keywords
+        articles = session.query(
+            NewsSentiment.ticker, NewsSentiment.title, NewsSentiment.sentiment,
+            NewsSentiment.confidence, NewsSentiment.created_at
+        ).filter(*ticker_window_filter(ticker, start_day, end_day)).order_by(
+            NewsSentiment.created_at.desc(), NewsSentiment.id.desc()
+        ).limit(XAI_KEYWORD_FALLBACK_ROWS).all()
+    if articles:
+        return rank_keywords(articles, top_n)
+    
+    counter = Counter()
+    for h in demo_headlines(ticker):
+        for t in set(tokenize(h)):
+            counter[t] += 0.8  # demo headlines are Positive at 0.8 confidence
+    return [{"word": k, "score": round(v, 3)} for k, v in counter.most_common(top_n)]
+
 
 # ----------------------------
 # Full pipeline
 # ----------------------------
-def run_pipeline(start="2025-10-01", end="2025-11-12"):
-    tickers = [row[0] for row in session.query(NewsSentiment.ticker).distinct()]
-    
-    for ticker in tickers:
+def list_tickers(db=None):
+    with session_scope(db) as session:
+        return [row[0] for row in session.query(NewsSentiment.ticker).distinct()]
+
+def run_ticker(ticker, start, end):
+    """Backtest + XAI for one ticker in its own session; returns the backtest metrics"""
+    # one short-lived session per ticker so a failure can't poison the next one
+    with session_scope() as session:
         print(f"\n📈 STEP 1: Running backtest for {ticker} from {start} to {end}...")
-        results = simulate_strategy(ticker, start, end)
+        with stage("pipeline_backtest"):
+            results = simulate_strategy(ticker, start, end, session)
         print("Backtest metrics:", results.get("metrics", "No data"))
         
         print(f"\n📊 STEP 2: Running XAI for {ticker}...")
         try:
-            xai_sentences = generate_xai_sentences(ticker, start, end)
+            with stage("pipeline_xai"):
+                xai_sentences = generate_xai_sentences(ticker, start, end, session)
             for s in xai_sentences:
                 print("-", s)
         except Exception as e:
             print(f"[ERROR] Skipping {ticker}: {e}")
+    return results.get("metrics")
+
+def run_pipeline(start="2025-10-01", end="2025-11-12", on_progress=None, should_stop=None):
+    """
+    Run every ticker in turn. on_progress(ticker, state, payload) is called as
+    each ticker starts ("running"), finishes ("done", metrics) or fails
+    ("failed", message); should_stop() is checked before each ticker.
+    """
+    tickers = list_tickers()
+    if on_progress:
+        for ticker in tickers:
+            on_progress(ticker, "pending", None)
+    
+    for ticker in tickers:
+        if should_stop and should_stop():
+            break
+        if on_progress:
+            on_progress(ticker, "running", None)
+        try:
+            metrics = run_ticker(ticker, start, end)
+        except Exception as e:
+            if not on_progress:
+                raise
+            on_progress(ticker, "failed", str(e))
+            continue
+        if on_progress:
+            on_progress(ticker, "done", metrics)
+
+# ----------------------------
+# Parallel pipeline
+# ----------------------------
+PIPELINE_WORKERS = int(os.getenv("PIPELINE_WORKERS", "1"))
+# seconds between checks of should_stop while chunks are running
+PIPELINE_POLL = 0.2
+
+def _init_pipeline_worker():
+    # each worker process opens its own DB engine
+    reset_engine()
+
+def _run_chunk(tickers, start, end, events=None, stop=None):
+    """
+    Runs in a pool worker. With `events` (a manager queue) every ticker's
+    ("running" / "done" / "failed") is reported as it happens; `stop` (a
+    manager event) is checked before each ticker, as run_pipeline does.
+    """
+    out = []
+    for ticker in tickers:
+        if stop is not None and stop.is_set():
+            break
+        if events is not None:
+            events.put((ticker, "running", None))
+        try:
+            item = (ticker, "done", run_ticker(ticker, start, end))
+        except Exception as e:
+            item = (ticker, "failed", str(e))
+        if events is not None:
+            events.put(item)
+        out.append(item)
+    return out
+
+def run_pipeline_parallel(start="2025-10-01", end="2025-11-12", workers=None, chunk_size=None,
+                          on_progress=None, should_stop=None):
+    """
+    Same work as run_pipeline, spread over a process pool in chunks of tickers.
+    Returns [(ticker, state, metrics_or_error), ...] in ticker order, whatever
+    order the chunks finish in.
+
+    Chunks are submitted as workers free up, so should_stop() is checked
+    before each one is handed out (and by the workers before each ticker);
+    on a stop, chunks not yet started are dropped. on_progress sees the same
+    per-ticker states as in run_pipeline.
+
+    Workers are spawned rather than forked: this runs on a job thread inside
+    the server, and a forked child would inherit other threads' locks (the
+    engine pool, the event loop) in whatever state they happened to be in.
+    """
+    workers = workers or PIPELINE_WORKERS
+    tickers = sorted(list_tickers())
+    if not tickers:
+        return []
+    chunk_size = chunk_size or max(1, -(-len(tickers) // (workers * 4)))
+    chunks = [tickers[i:i + chunk_size] for i in range(0, len(tickers), chunk_size)]
+    if on_progress:
+        for ticker in tickers:
+            on_progress(ticker, "pending", None)
+    
+    results = {}
+    ctx = multiprocessing.get_context("spawn")
+    with ctx.Manager() as manager:
+        events = manager.Queue() if on_progress else None
+        stop = manager.Event()
+
+        def report():
+            while events is not None:
+                try:
+                    ticker, state, payload = events.get_nowait()
+                except queue.Empty:
+                    return
+                on_progress(ticker, state, payload)
+
+        with ProcessPoolExecutor(max_workers=workers, mp_context=ctx, initializer=_init_pipeline_worker) as pool:
+            pending = list(reversed(chunks))
+            running = set()
+            while pending or running:
+                if should_stop and should_stop():
+                    stop.set()
+                    pending.clear()
+                while pending and len(running) < workers:
+                    running.add(pool.submit(_run_chunk, pending.pop(), start, end, events, stop))
+                finished, running = wait(running, timeout=PIPELINE_POLL, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    for ticker, state, payload in future.result():
+                        results[ticker] = (state, payload)
+                report()
+        report()
+    
+    return [(t, *results[t]) for t in tickers if t in results]
 
 if __name__ == "__main__":
     run_pipeline()
@@ -0,0 +1,130 @@
+# sentiment/cache.py
+# Content-hash cache in front of FinBERT: in-memory LRU, backed by the
+# sentiment_cache table, so a headline is scored once per model.
+import hashlib
+import os
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+from db.db_connect import session_scope
+from db.models import SentimentCache
+from db.upsert import insert_ignore
+from sentiment import sentiment_model
+
+SENTIMENT_CACHE_SIZE = int(os.getenv("SENTIMENT_CACHE_SIZE", "100000"))
+DB_LOOKUP_CHUNK = 500
+
+
+def normalize(text):
+    # finbert-tone's tokenizer is uncased, so case and spacing don't change the score
+    text = unicodedata.normalize("NFKC", text or "")
+    return re.sub(r"\s+", " ", text).strip().lower()
+
+
+def model_id():
+    return sentiment_model.model_id()
+
+
+def cache_key(text, model=None):
+    return hashlib.sha256(f"{model or model_id()}\0{normalize(text)}".encode()).hexdigest()
+
+
+class SentimentResultCache:
+    def __init__(self, maxsize=SENTIMENT_CACHE_SIZE, persist=True):
+        self.maxsize = maxsize
+        self.persist = persist
+        self._lru = OrderedDict()
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.db_hits = 0
+        self.misses = 0
+
+    # ---- in-memory LRU ----
+    def _get(self, key):
+        with self._lock:
+            value = self._lru.get(key)
+            if value is not None:
+                self._lru.move_to_end(key)
+            return value
+
+    def _put(self, key, value):
+        with self._lock:
+            self._lru[key] = value
+            self._lru.move_to_end(key)
+            while len(self._lru) > self.maxsize:
+                self._lru.popitem(last=False)
+
+    # ---- backing table ----
+    def _load(self, keys, db):
+        found = {}
+        with session_scope(db) as session:
+            for i in range(0, len(keys), DB_LOOKUP_CHUNK):
+                rows = session.query(
+                    SentimentCache.key, SentimentCache.sentiment, SentimentCache.confidence
+                ).filter(SentimentCache.key.in_(keys[i:i + DB_LOOKUP_CHUNK])).all()
+                for key, sentiment, confidence in rows:
+                    found[key] = {"sentiment": sentiment, "confidence": confidence}
+        return found
+
+    def _store(self, results, db):
+        model = model_id()
+        rows = [
+            {"key": k, "model": model, "sentiment": v["sentiment"], "confidence": v["confidence"]}
+            for k, v in results.items()
+        ]
+        with session_scope(db) as session:
+            insert_ignore(session, SentimentCache, rows, ["key"])
+            session.commit()
+
+    # ---- public ----
+    def analyze_batch(self, texts, batch_size=sentiment_model.DEFAULT_BATCH_SIZE, db=None):
+        """analyze_batch with the cache in front; identical texts in one call are scored once"""
+        texts = list(texts)
+        keys = [cache_key(t) for t in texts]
+        results = {}
+        pending = []
+        for key in dict.fromkeys(keys):
+            value = self._get(key)
+            if value is not None:
+                results[key] = value
+                self.memory_hits += 1
+            else:
+                pending.append(key)
+
+        if pending and self.persist:
+            for key, value in self._load(pending, db).items():
+                results[key] = value
+                self._put(key, value)
+                self.db_hits += 1
+            pending = [k for k in pending if k not in results]
+
+        if pending:
+            text_for = dict(zip(keys, texts))
+            scored = sentiment_model.analyze_batch([text_for[k] for k in pending], batch_size=batch_size)
+            fresh = dict(zip(pending, scored))
+            self.misses += len(fresh)
+            for key, value in fresh.items():
+                self._put(key, value)
+            results.update(fresh)
+            if self.persist:
+                self._store(fresh, db)
+
+        return [dict(results[k]) for k in keys]
+
+    def analyze(self, text, db=None):
+        return self.analyze_batch([text], batch_size=1, db=db)[0]
+
+    def stats(self):
+        lookups = self.memory_hits + self.db_hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "db_hits": self.db_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.memory_hits + self.db_hits) / lookups, 4) if lookups else 0.0,
+            "entries": len(self._lru),
+            "maxsize": self.maxsize,
+        }
+
+
+cache = SentimentResultCache()
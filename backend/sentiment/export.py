@@ -0,0 +1,128 @@
+# sentiment/export.py
+# Convert FinBERT for the faster CPU backends and check they still agree with
+# the fp32 torch model. Run from backend/:
+#   python -m sentiment.export onnx [--quantize] [--out PATH]
+#   python -m sentiment.export check [--backends torch-int8,onnx] [--fixture PATH]
+import argparse
+import json
+import os
+import sys
+import time
+from sentiment import sentiment_model
+
+FIXTURE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "labeled_headlines.jsonl")
+ONNX_OPSET = 17
+# a backend passes the check if it picks the same label as fp32 torch this often ...
+MIN_AGREEMENT = 0.95
+# ... and its confidences are on average this close
+MAX_MEAN_CONFIDENCE_DELTA = 0.02
+INPUT_NAMES = ["input_ids", "attention_mask", "token_type_ids"]
+
+
+def export_onnx(path=sentiment_model.ONNX_MODEL_PATH, quantize=False):
+    """
+    Trace the fp32 torch model to ONNX with dynamic batch and sequence axes.
+    quantize=True also applies ONNX Runtime's dynamic int8 weight quantization.
+    """
+    import torch
+    from transformers import AutoTokenizer, AutoModelForSequenceClassification
+
+    tokenizer = AutoTokenizer.from_pretrained(sentiment_model.MODEL_NAME)
+    model = AutoModelForSequenceClassification.from_pretrained(sentiment_model.MODEL_NAME)
+    model.eval()
+    sample = tokenizer(["Shares rise after earnings beat", "Stock falls"], padding=True, return_tensors="pt")
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in INPUT_NAMES}
+    dynamic_axes["logits"] = {0: "batch"}
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    target = path + ".fp32" if quantize else path
+    with torch.inference_mode():
+        torch.onnx.export(
+            model, tuple(sample[name] for name in INPUT_NAMES), target,
+            input_names=INPUT_NAMES, output_names=["logits"], dynamic_axes=dynamic_axes,
+            opset_version=ONNX_OPSET, dynamo=False,
+        )
+    # the onnx backend tokenizes with this file, without importing transformers
+    tokenizer.save_pretrained(os.path.dirname(path) or ".")
+    if quantize:
+        from onnxruntime.quantization import quantize_dynamic, QuantType
+        quantize_dynamic(target, path, weight_type=QuantType.QInt8)
+        os.remove(target)
+    print(f"[INFO] Wrote {path} ({os.path.getsize(path) / 1e6:.1f} MB)")
+    return path
+
+
+def load_fixture(path=FIXTURE_PATH):
+    with open(path) as f:
+        rows = [json.loads(line) for line in f if line.strip()]
+    return [r["text"] for r in rows], [r["label"] for r in rows]
+
+
+def _score(backend, texts):
+    sentiment_model.set_backend(backend)
+    sentiment_model.analyze_batch(texts[:2])  # load + warm up outside the timing
+    t0 = time.perf_counter()
+    results = sentiment_model.analyze_batch(texts)
+    return results, time.perf_counter() - t0
+
+
+def check_parity(backends=("torch-int8", "onnx"), fixture=FIXTURE_PATH):
+    """
+    Score the labelled fixture with fp32 torch and each backend. Returns one
+    report dict per backend; "ok" is False when a backend drifts too far.
+    """
+    texts, gold = load_fixture(fixture)
+    previous = sentiment_model.backend()
+    try:
+        baseline, baseline_s = _score("torch", texts)
+        reports = [_report("torch", baseline, baseline, gold, baseline_s, len(texts))]
+        for name in backends:
+            if name == "torch":
+                continue
+            results, seconds = _score(name, texts)
+            reports.append(_report(name, results, baseline, gold, seconds, len(texts)))
+    finally:
+        sentiment_model.set_backend(previous)
+    return reports
+
+
+def _report(name, results, baseline, gold, seconds, n):
+    agree = sum(r["sentiment"] == b["sentiment"] for r, b in zip(results, baseline)) / n
+    deltas = [abs(r["confidence"] - b["confidence"]) for r, b in zip(results, baseline)]
+    mean_delta = sum(deltas) / n
+    return {
+        "backend": name,
+        "accuracy": round(sum(r["sentiment"] == g for r, g in zip(results, gold)) / n, 3),
+        "agreement": round(agree, 3),
+        "mean_confidence_delta": round(mean_delta, 4),
+        "max_confidence_delta": round(max(deltas), 4),
+        "headlines_per_sec": round(n / seconds, 1),
+        "ok": agree >= MIN_AGREEMENT and mean_delta <= MAX_MEAN_CONFIDENCE_DELTA,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m sentiment.export")
+    sub = parser.add_subparsers(dest="command", required=True)
+    onnx = sub.add_parser("onnx", help="export the model to ONNX")
+    onnx.add_argument("--out", default=sentiment_model.ONNX_MODEL_PATH)
+    onnx.add_argument("--quantize", action="store_true", help="int8 weights (smaller, faster, slightly less exact)")
+    check = sub.add_parser("check", help="compare backends against fp32 torch on the labelled fixture")
+    check.add_argument("--backends", default="torch-int8,onnx")
+    check.add_argument("--fixture", default=FIXTURE_PATH)
+    args = parser.parse_args(argv)
+
+    if args.command == "onnx":
+        export_onnx(args.out, args.quantize)
+        return 0
+
+    reports = check_parity([b.strip() for b in args.backends.split(",") if b.strip()], args.fixture)
+    print(f"{'backend':<12} {'accuracy':>9} {'agreement':>10} {'mean Δconf':>11} {'max Δconf':>10} {'headlines/s':>12}")
+    for r in reports:
+        print(f"{r['backend']:<12} {r['accuracy']:>9.3f} {r['agreement']:>10.3f} {r['mean_confidence_delta']:>11.4f} "
+              f"{r['max_confidence_delta']:>10.4f} {r['headlines_per_sec']:>12.1f} {'' if r['ok'] else 'FAIL'}")
+    return 0 if all(r["ok"] for r in reports) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
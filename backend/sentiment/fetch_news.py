@@ -1,15 +1,25 @@
+import os
 import requests
-def get_news():
+
+NEWS_API_URL = "https://newsapi.org/v2/everything"
+NEWS_API_KEY = os.getenv("NEWS_API_KEY", "a192c5ac149e4a7abf123eeb812e85bc")
+
+def get_news(query="finance OR stock market OR economy", page=1, page_size=100, from_date=None, raise_errors=False):
+    """Articles from NewsAPI; on any error an empty list, or the exception with raise_errors"""
     print("Fetching news from API...")  # Debug line
-    url = "https://newsapi.org/v2/everything"
+    url = NEWS_API_URL
     params = {
-        "q": "finance OR stock market OR economy",
+        "q": query,
         "language": "en",
         "sortBy": "publishedAt",
-        "apiKey": "a192c5ac149e4a7abf123eeb812e85bc"
+        "page": page,
+        "pageSize": page_size,
+        "apiKey": NEWS_API_KEY
     }
+    if from_date:
+        params["from"] = from_date
     try:
-        response = requests.get(url, params=params)
+        response = requests.get(url, params=params, timeout=15)
         response.raise_for_status()  # Triggers error if bad response
         data = response.json()
         print(f"✅ API Status: {response.status_code}")
@@ -17,6 +27,8 @@ def get_news():
         return data.get("articles", [])
     except Exception as e:
         print(f"❌ Error fetching news: {e}")
+        if raise_errors:
+            raise
         return []
 
 if __name__ == "__main__":
@@ -24,4 +36,3 @@ if __name__ == "__main__":
     print(f"Fetched {len(news)} articles.")
     if news:
         print("Sample article:", news[0].get("title", "No title"))
-
@@ -0,0 +1,239 @@
+# sentiment/ingest.py
+# Streaming ingestion: source -> dedup -> micro-batch scoring -> bulk insert.
+# Run from backend/:  python -m sentiment.ingest TICKER [fixture.jsonl]
+import hashlib
+import itertools
+import json
+import re
+import sys
+from collections import OrderedDict
+from datetime import datetime
+from db.db_connect import session_scope
+from db.models import NewsSentiment, NewsContent, NewsKey, IngestCheckpoint
+from db.keywords import index_articles
+from db.partitions import ensure_partitions
+from db.rollup import rollup_articles
+from db.upsert import insert_ignore
+from response_cache import cache as response_cache
+from sentiment.fetch_news import get_news
+
+CHUNK_SIZE = 500        # articles per DB insert / commit
+SCORE_BATCH_SIZE = 32   # articles per FinBERT forward pass
+RECENT_KEYS = 100_000   # dedup keys remembered in memory across chunks
+
+
+# ----------------------------
+# Sources
+# ----------------------------
+# A source has a `name` and iter_from(cursor) yielding (cursor, article) pairs.
+# The cursor of the last article in a committed chunk is saved per
+# (source, ticker), and passed back to iter_from on the next run. An article of None just moves the cursor.
+# Articles are dicts with title, content, source, url, published_at.
+
+class NewsApiSource:
+    def __init__(self, query, page_size=100, max_pages=5):
+        self.name = f"newsapi:{query}"
+        self.query = query
+        self.page_size = page_size
+        self.max_pages = max_pages
+
+    def iter_from(self, cursor):
+        # cursor = "<from timestamp>|<next page>|<newest seen>". Results are
+        # newest first, so the window only moves forward (to the newest
+        # timestamp seen) once a page comes back short, i.e. every page has
+        # been read. A failed request or the max_pages budget leaves the cursor
+        # on the unread page, and the next run picks up from there.
+        parts = cursor.split("|") if cursor else ["", "1"]
+        since, first = parts[0], int(parts[1])
+        newest = parts[2] if len(parts) > 2 else since
+        for page in range(first, first + self.max_pages):
+            try:
+                articles = get_news(self.query, page=page, page_size=self.page_size, from_date=since or None,
+                                    raise_errors=True)
+            except Exception as e:
+                print(f"[WARN] {self.name}: page {page} failed ({e}); resuming there next run")
+                return
+            for a in articles:
+                published = a.get("publishedAt") or ""
+                newest = max(newest, published)
+                yield f"{since}|{page}|{newest}", {
+                    "title": a.get("title"),
+                    "content": a.get("content") or a.get("description"),
+                    "source": (a.get("source") or {}).get("name"),
+                    "url": a.get("url"),
+                    "published_at": published,
+                }
+            if len(articles) < self.page_size:
+                yield f"{newest}|1|{newest}", None
+                return
+            yield f"{since}|{page + 1}|{newest}", None
+
+
+class FileSource:
+    """JSON-lines fixture, one article per line; the cursor is the line number"""
+
+    def __init__(self, path):
+        self.name = f"file:{path}"
+        self.path = path
+
+    def iter_from(self, cursor):
+        done = int(cursor) if cursor else 0
+        with open(self.path) as f:
+            for lineno, line in enumerate(f, 1):
+                if lineno <= done or not line.strip():
+                    continue
+                yield str(lineno), json.loads(line)
+
+
+# ----------------------------
+# Pipeline stages
+# ----------------------------
+def dedup_key(ticker, article):
+    """Hash of ticker + url, or + normalized title when there is no url"""
+    basis = article.get("url") or re.sub(r"\W+", " ", (article.get("title") or "").lower()).strip()
+    return hashlib.sha1(f"{ticker.upper()}|{basis}".encode()).hexdigest()
+
+
+def _parse_ts(value):
+    if isinstance(value, datetime):
+        return value
+    if not value:
+        return datetime.utcnow()
+    return datetime.fromisoformat(value.replace("Z", "+00:00")).replace(tzinfo=None)
+
+
+def _deduplicated(pairs, ticker, recent):
+    """Drop repeats already seen recently; `recent` is a bounded LRU of keys"""
+    for cursor, article in pairs:
+        if article is None:
+            yield cursor, None
+            continue
+        # skipped articles still advance the cursor
+        if not article.get("title"):
+            yield cursor, None
+            continue
+        key = dedup_key(ticker, article)
+        if key in recent:
+            recent.move_to_end(key)
+            yield cursor, None
+            continue
+        recent[key] = True
+        if len(recent) > RECENT_KEYS:
+            recent.popitem(last=False)
+        article["dedup_key"] = key
+        yield cursor, article
+
+
+def _chunks(iterable, size):
+    it = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _score(articles, scorer, batch_size):
+    results = []
+    for batch in _chunks(articles, batch_size):
+        results.extend(scorer([a["title"] for a in batch]))
+    return results
+
+
+def _insert_new(session, rows, bodies):
+    """
+    Claim each row's dedup_key in news_keys, insert only the rows whose key
+    was new, then their bodies into news_content. Returns the inserted rows
+    as (id, ticker, title, sentiment, confidence, created_at, dedup_key).
+    """
+    claimed = insert_ignore(
+        session, NewsKey, [{"dedup_key": r["dedup_key"]} for r in rows], ["dedup_key"], returning=("dedup_key",)
+    )
+    new_keys = {k.dedup_key for k in claimed}
+    rows = [r for r in rows if r["dedup_key"] in new_keys]
+    if not rows:
+        return []
+    ensure_partitions(session, [r["created_at"] for r in rows])
+    table = NewsSentiment.__table__
+    inserted = session.execute(table.insert().returning(
+        *[table.c[c] for c in ("id", "ticker", "title", "sentiment", "confidence", "created_at", "dedup_key")]
+    ), rows).all()
+    contents = [{"id": r.id, "content": bodies[r.dedup_key]} for r in inserted if bodies.get(r.dedup_key)]
+    if contents:
+        session.execute(NewsContent.__table__.insert(), contents)
+    return inserted
+
+
+def _after_insert(session, inserted):
+    """Keep derived tables in step with newly inserted news_sentiment rows"""
+    index_articles(session, inserted)
+    rollup_articles(session, inserted)
+
+
+def load_checkpoint(session, name):
+    row = session.get(IngestCheckpoint, name)
+    return row.cursor if row else None
+
+
+def save_checkpoint(session, name, cursor):
+    row = session.get(IngestCheckpoint, name)
+    if row is None:
+        session.add(IngestCheckpoint(source=name, cursor=cursor))
+    else:
+        row.cursor = cursor
+
+
+def ingest(source, ticker, scorer=None, chunk_size=CHUNK_SIZE, score_batch_size=SCORE_BATCH_SIZE, db=None):
+    """
+    Stream `source` into news_sentiment for `ticker`, resuming from its saved
+    checkpoint. At most one chunk is held in memory. Returns counters.
+    """
+    use_cache = scorer is None
+    if use_cache:
+        # identical (syndicated) headlines are only run through FinBERT once
+        from sentiment.cache import cache
+        scorer = cache.analyze_batch
+
+    stats = {"seen": 0, "scored": 0, "inserted": 0, "chunks": 0}
+    recent = OrderedDict()
+    checkpoint = f"{source.name}|{ticker.upper()}"
+    with session_scope(db) as session:
+        cursor = load_checkpoint(session, checkpoint)
+        pairs = _deduplicated(source.iter_from(cursor), ticker, recent)
+
+        for chunk in _chunks(pairs, chunk_size):
+            articles = [a for _, a in chunk if a is not None]
+            stats["seen"] += len(articles)
+            scores = _score(articles, scorer, score_batch_size)
+            stats["scored"] += len(scores)
+
+            rows = [
+                {
+                    "title": a["title"],
+                    "sentiment": s["sentiment"],
+                    "confidence": s["confidence"],
+                    "ticker": ticker,
+                    "source": a.get("source"),
+                    "url": a.get("url"),
+                    "dedup_key": a["dedup_key"],
+                    "created_at": _parse_ts(a.get("published_at")),
+                }
+                for a, s in zip(articles, scores)
+            ]
+            inserted = _insert_new(session, rows, {a["dedup_key"]: a.get("content") for a in articles})
+            _after_insert(session, inserted)
+            save_checkpoint(session, checkpoint, chunk[-1][0])
+            session.commit()
+            # after the commit, so a reader can't cache pre-insert data under the new version
+            response_cache.bump(row.ticker for row in inserted)
+            stats["inserted"] += len(inserted)
+            stats["chunks"] += 1
+    if use_cache:
+        stats["cache"] = cache.stats()
+    return stats
+
+
+if __name__ == "__main__":
+    ticker = sys.argv[1]
+    src = FileSource(sys.argv[2]) if len(sys.argv) > 2 else NewsApiSource(ticker)
+    print(ingest(src, ticker))
@@ -1,17 +1,219 @@
+import contextlib
+import os
+import threading
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
 
-from transformers import AutoTokenizer, AutoModelForSequenceClassification
-import torch
-
-tokenizer = AutoTokenizer.from_pretrained("yiyanghkust/finbert-tone")
-model = AutoModelForSequenceClassification.from_pretrained("yiyanghkust/finbert-tone")
+MODEL_NAME = os.getenv("SENTIMENT_MODEL", "yiyanghkust/finbert-tone")
+MAX_LENGTH = 512
+DEFAULT_BATCH_SIZE = 32
 
 labels =["Positive","Negative","Neutral"]
 
+# Inference backend: "torch" (fp32), "torch-int8" (dynamically quantized
+# Linear layers) or "onnx" (ONNX Runtime on a graph written by
+# `python -m sentiment.export onnx`).
+BACKENDS = ("torch", "torch-int8", "onnx")
+SENTIMENT_BACKEND = os.getenv("SENTIMENT_BACKEND", "torch")
+ONNX_MODEL_PATH = os.getenv(
+    "SENTIMENT_ONNX_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "models", "finbert-tone.onnx")
+)
+
+# torch/transformers and the FinBERT weights are loaded on first use, not at
+# import, so processes that never score text don't pay for them.
+# (backend, tokenizer, model), replaced as a whole: a call in flight keeps the
+# tuple it started with even if set_backend() runs meanwhile.
+_loaded = None
+_backend = SENTIMENT_BACKEND
+_num_threads = int(os.getenv("SENTIMENT_NUM_THREADS", "0"))
+_load_lock = threading.Lock()
+
+
+def set_num_threads(n):
+    """Set the intra-op thread count torch uses for CPU inference (0 keeps torch's default)"""
+    global _num_threads
+    _num_threads = n
+    # ONNX Runtime takes its thread count when the session is created
+    if n and n > 0 and _backend != "onnx":
+        import torch
+        torch.set_num_threads(n)
+
+
+def set_backend(name):
+    """Switch inference backend; the next call loads the model for it"""
+    global _backend, _loaded
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown sentiment backend {name!r}, expected one of {BACKENDS}")
+    with _load_lock:
+        _backend, _loaded = name, None
+
+
+def backend():
+    return _backend
+
+
+def model_id():
+    """Identifies what produced a score; backends can differ in the last digit, so it's part of the id"""
+    return MODEL_NAME if _backend == "torch" else f"{MODEL_NAME}+{_backend}"
+
+
+def load_model():
+    """
+    Return (tokenizer, model) for the configured backend, loading them once in
+    a thread-safe way. For "onnx" the model is an onnxruntime InferenceSession.
+    """
+    return _load()[1:]
+
+
+def _load():
+    """(backend, tokenizer, model) for the configured backend, loaded once"""
+    global _loaded
+    loaded = _loaded
+    if loaded is None:
+        with _load_lock:
+            loaded = _loaded
+            if loaded is None:
+                name = _backend
+                if name not in BACKENDS:
+                    raise ValueError(f"Unknown sentiment backend {name!r}, expected one of {BACKENDS}")
+                if name == "onnx":
+                    tokenizer, model = _OnnxTokenizer(), _load_onnx()
+                else:
+                    from transformers import AutoTokenizer
+                    tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME)
+                    model = _load_torch(name == "torch-int8")
+                loaded = _loaded = (name, tokenizer, model)
+    return loaded
+
+
+def _load_torch(quantize):
+    import torch
+    from transformers import AutoModelForSequenceClassification
+    set_num_threads(_num_threads)
+    model = AutoModelForSequenceClassification.from_pretrained(MODEL_NAME)
+    model.eval()
+    if quantize:
+        # int8 weights for every nn.Linear; activations are quantized on the fly
+        model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    return model
+
+
+def _load_onnx():
+    import onnxruntime as ort
+    if not os.path.exists(ONNX_MODEL_PATH):
+        raise FileNotFoundError(f"{ONNX_MODEL_PATH} not found; run `python -m sentiment.export onnx` first")
+    options = ort.SessionOptions()
+    if _num_threads > 0:
+        options.intra_op_num_threads = _num_threads
+    return ort.InferenceSession(ONNX_MODEL_PATH, options, providers=["CPUExecutionProvider"])
+
+
+class _OnnxTokenizer:
+    """
+    The two tokenizer calls analyze_batch makes, on the `tokenizers` library
+    alone, so ONNX workers never import torch/transformers. Reads the
+    tokenizer.json that `python -m sentiment.export onnx` writes next to the model.
+    """
+
+    def __init__(self, path=None):
+        from tokenizers import Tokenizer
+        path = path or os.path.join(os.path.dirname(ONNX_MODEL_PATH), "tokenizer.json")
+        self._tok = Tokenizer.from_file(path)
+        self._tok.no_padding()
+        self._pad_id = self._tok.token_to_id("[PAD]") or 0
+
+    def __call__(self, texts, truncation=True, max_length=MAX_LENGTH):
+        if truncation:
+            self._tok.enable_truncation(max_length)
+        encodings = self._tok.encode_batch(texts)
+        return {
+            "input_ids": [e.ids for e in encodings],
+            "attention_mask": [e.attention_mask for e in encodings],
+            "token_type_ids": [e.type_ids for e in encodings],
+        }
+
+    def pad(self, features, return_tensors="np"):
+        width = max(len(f["input_ids"]) for f in features)
+        out = {}
+        for key in features[0]:
+            fill = self._pad_id if key == "input_ids" else 0
+            out[key] = np.array([f[key] + [fill] * (width - len(f[key])) for f in features], dtype=np.int64)
+        return out
+
+
+def _probabilities(backend_name, tokenizer, model, features):
+    """Class probabilities (numpy, batch x labels) for one padded batch"""
+    if backend_name == "onnx":
+        inputs = tokenizer.pad(features, return_tensors="np")
+        feed = {i.name: inputs[i.name].astype(np.int64) for i in model.get_inputs()}
+        logits = model.run(None, feed)[0]
+        exp = np.exp(logits - logits.max(axis=-1, keepdims=True))
+        return exp / exp.sum(axis=-1, keepdims=True)
+    import torch
+    inputs = tokenizer.pad(features, return_tensors="pt")
+    return torch.nn.functional.softmax(model(**inputs).logits, dim=-1).numpy()
+
+
 def analyze(text):
-    inputs = tokenizer(text, return_tensors="pt", truncation=True,max_length=512)
-    outputs =model(**inputs)
-    probs = torch.nn.functional.softmax(outputs.logits,dim =-1)
-    sentiment = labels[torch.argmax(probs)]
-    score = torch.max(probs).item()
-    return {"sentiment":sentiment,"confidence":round(score,3)}
+    return analyze_batch([text], batch_size=1)[0]
+
+
+def analyze_batch(texts, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Score many headlines at once. Returns one {"sentiment","confidence"} dict per
+    text, in input order.
+
+    Texts are sorted by token length and padded per batch, so short headlines
+    are not padded out to the longest one in the whole input.
+    """
+    texts = list(texts)
+    if not texts:
+        return []
+
+    backend_name, tokenizer, model = _load()
+    encoded = tokenizer(texts, truncation=True, max_length=MAX_LENGTH)
+    keys = list(encoded.keys())
+    order = sorted(range(len(texts)), key=lambda i: len(encoded["input_ids"][i]))
+
+    results = [None] * len(texts)
+    with _no_grad(backend_name):
+        for start in range(0, len(order), batch_size):
+            idx = order[start:start + batch_size]
+            features = [{k: encoded[k][i] for k in keys} for i in idx]
+            probs = _probabilities(backend_name, tokenizer, model, features)
+            best = probs.argmax(axis=-1)
+            scores = probs[np.arange(len(idx)), best]
+            for i, label, score in zip(idx, best.tolist(), scores.tolist()):
+                results[i] = {"sentiment": labels[label], "confidence": round(score, 3)}
+    return results
+
+
+def _no_grad(backend_name):
+    if backend_name == "onnx":
+        return contextlib.nullcontext()
+    import torch
+    return torch.inference_mode()
+
+
+def _init_worker(num_threads, backend_name):
+    set_backend(backend_name)
+    set_num_threads(num_threads)
+
+
+def analyze_parallel(texts, workers=None, batch_size=DEFAULT_BATCH_SIZE, threads_per_worker=1):
+    """
+    Split texts across a process pool and score each slice with analyze_batch.
+    Meant for ingestion boxes with many cores; results keep input order.
+    """
+    texts = list(texts)
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(texts) <= batch_size:
+        return analyze_batch(texts, batch_size=batch_size)
 
+    chunk = -(-len(texts) // workers)
+    slices = [texts[i:i + chunk] for i in range(0, len(texts), chunk)]
+    with ProcessPoolExecutor(max_workers=len(slices), initializer=_init_worker,
+                             initargs=(threads_per_worker, _backend)) as pool:
+        parts = pool.map(analyze_batch, slices, [batch_size] * len(slices))
+        return [r for part in parts for r in part]
@@ -0,0 +1,36 @@
+# serialize.py
+# Response encoders: orjson for JSON (numpy arrays included), Arrow IPC for
+# columnar results when the client asks for it.
+import orjson
+from fastapi.encoders import jsonable_encoder
+
+JSON = "application/json"
+ARROW = "application/vnd.apache.arrow.stream"
+
+_JSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+def encode_json(payload):
+    # jsonable_encoder only runs for the odd type orjson can't handle itself
+    return orjson.dumps(payload, default=jsonable_encoder, option=_JSON_OPTIONS)
+
+
+def wants_arrow(accept):
+    return ARROW in (accept or "")
+
+
+def encode_arrow(columns, metadata=None):
+    """
+    One record batch in the Arrow IPC stream format. `columns` is
+    {name: array-like of equal length}; `metadata` (anything JSON-encodable)
+    rides along in the schema metadata under b"meta".
+    Needs pyarrow; raises ImportError without it.
+    """
+    import pyarrow as pa
+    table = pa.table(columns)
+    if metadata is not None:
+        table = table.replace_schema_metadata({"meta": encode_json(metadata)})
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
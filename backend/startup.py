@@ -0,0 +1,89 @@
+# startup.py
+# Warm-up hook for the API workers and an import-time report.
+# Report:  python startup.py [module] [top_n]
+import re
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+
+def _warm_db():
+    from db.db_connect import get_engine
+    with get_engine().connect():
+        pass
+
+
+def _warm_pipeline():
+    import run_full_pipeline  # noqa: F401 (pulls in pandas/numpy)
+
+
+def _warm_model():
+    from sentiment.sentiment_model import load_model
+    load_model()
+
+
+WARMUP_TARGETS = {
+    "db": _warm_db,
+    "pipeline": _warm_pipeline,
+    "model": _warm_model,
+}
+
+
+def warm_up(targets):
+    """Load the named heavy dependencies ahead of the first request; returns seconds per target"""
+    timings = {}
+    for name in targets:
+        fn = WARMUP_TARGETS.get(name)
+        if fn is None:
+            print(f"[WARN] Unknown warm-up target: {name}")
+            continue
+        t0 = time.perf_counter()
+        try:
+            fn()
+        except Exception as e:
+            print(f"[WARN] Warm-up of {name} failed: {e}")
+            continue
+        timings[name] = round(time.perf_counter() - t0, 3)
+        print(f"[INFO] Warm-up {name}: {timings[name]}s")
+    return timings
+
+
+_IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def import_report(module="main", top_n=20):
+    """
+    Import `module` in a fresh interpreter with -X importtime and sum the
+    self-time per top-level package. Returns (total_seconds, [(package, seconds), ...]).
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr else f"import {module} failed")
+
+    per_package = defaultdict(int)
+    total_us = 0
+    for line in proc.stderr.splitlines():
+        m = _IMPORTTIME_LINE.match(line)
+        if not m:
+            continue
+        self_us, cumulative_us, indent, name = int(m.group(1)), int(m.group(2)), m.group(3), m.group(4)
+        per_package[name.split(".")[0]] += self_us
+        if len(indent) == 1:  # top-level imports of `module` itself
+            total_us += cumulative_us
+
+    ranked = sorted(per_package.items(), key=lambda x: x[1], reverse=True)[:top_n]
+    return total_us / 1e6, [(name, us / 1e6) for name, us in ranked]
+
+
+if __name__ == "__main__":
+    module = sys.argv[1] if len(sys.argv) > 1 else "main"
+    top_n = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    total, ranked = import_report(module, top_n)
+    print(f"Importing {module} took {total:.3f}s")
+    print(f"{'package':<30} {'seconds':>9}")
+    for name, seconds in ranked:
+        print(f"{name:<30} {seconds:>9.3f}")
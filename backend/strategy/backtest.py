@@ -1,31 +1,51 @@
  
-import requests
 import pandas as pd
-import yfinance as yf
 from datetime import datetime, timedelta
-import os
 
-# Base URL for Hazel's sentiment API (or mock_sentiment)
-SENTIMENT_API_BASE = os.environ.get("SENTIMENT_API_BASE", "http://localhost:8000")
+from strategy.engine import run_backtest, BUY
+from strategy import price_cache
+from strategy import http_client
+from metrics import stage
 
 # Strategy constants
 BUY_THRESHOLD = 0.2
 SELL_THRESHOLD = -0.2
 INITIAL_CAPITAL = 100000.0
+SIZE_FRACTION = 0.1  # share of cash spent per BUY
 
 
-def fetch_sentiment(ticker, start=None, end=None):
-    """Fetch sentiment data for a given ticker from Hazel's API"""
-    url = f"{SENTIMENT_API_BASE}/sentiment/get_sentiment"
+def _sentiment_params(ticker, start, end):
     params = {"ticker": ticker}
     if start:
         params["start"] = start
     if end:
         params["end"] = end
+    return params
+
+
+def fetch_sentiment(ticker, start=None, end=None):
+    """Fetch sentiment data for a given ticker from Hazel's API"""
+    records = http_client.get_json("/sentiment/get_sentiment", _sentiment_params(ticker, start, end))
+    return _sentiment_frame(ticker, records)
+
+
+def fetch_sentiment_many(tickers, start=None, end=None, concurrency=None):
+    """
+    fetch_sentiment for many tickers with the requests in flight concurrently.
+    Returns {ticker: DataFrame}; a ticker whose request failed maps to the exception.
+    """
+    tickers = list(tickers)
+    responses = http_client.get_json_many(
+        "/sentiment/get_sentiment", [_sentiment_params(t, start, end) for t in tickers], concurrency=concurrency
+    )
+    return {
+        t: r if isinstance(r, Exception) else _sentiment_frame(t, r)
+        for t, r in zip(tickers, responses)
+    }
 
-    resp = requests.get(url, params=params, timeout=10)
-    resp.raise_for_status()
-    df = pd.DataFrame(resp.json())
+
+def _sentiment_frame(ticker, records):
+    df = pd.DataFrame(records)
 
     if df.empty:
         print(f"[WARN] No sentiment data for {ticker}")
@@ -40,31 +60,16 @@ def fetch_sentiment(ticker, start=None, end=None):
 
 
 def fetch_prices(ticker, start, end):
-    """Fetch and clean historical stock prices using Yahoo Finance"""
-    data = yf.download(ticker, start=start, end=end, progress=False)
+    """Historical close prices, served from the local price cache (Yahoo Finance for uncached ranges)"""
+    data = price_cache.cache.get(ticker, start, end)
     if data.empty:
         raise ValueError(f"No price data found for {ticker}")
+    return data
 
-    # ✅ FIX: handle MultiIndex columns like ('AAPL', 'Close')
-    if isinstance(data.columns, pd.MultiIndex):
-        # flatten multi-index into single column names like 'AAPL_Close'
-        data.columns = ["_".join(col).strip() for col in data.columns.values]
 
-        # try to locate the Close column dynamically
-        close_col = [c for c in data.columns if "Close" in c][0]
-        data = data[[close_col]].rename(columns={close_col: "Close"})
-    else:
-        # regular single index case
-        if "Close" not in data.columns:
-            raise ValueError(f"Expected 'Close' column not found for {ticker}")
-        data = data[["Close"]].copy()
-
-    # ✅ clean up index
-    data = data.reset_index()
-    data["date"] = pd.to_datetime(data["Date"]).dt.date
-    data = data[["date", "Close"]]
-    data = data.set_index("date")
-    return data
+def fetch_prices_many(tickers, start, end):
+    """fetch_prices for a list of tickers, with uncached ranges downloaded in bulk"""
+    return price_cache.cache.get_many(tickers, start, end)
 
 
 def compute_metrics(portfolio_values):
@@ -80,8 +85,7 @@ def compute_metrics(portfolio_values):
     return {"ROI%": round(roi, 2), "MaxDrawdown%": round(max_drawdown, 2)}
 
 
-def simulate_strategy(ticker, start=None, end=None):
-    """Run sentiment-based trading simulation"""
+def _window(start, end):
     # Default to last 30 days
     if end is None:
         end_date = datetime.utcnow().date()
@@ -92,69 +96,93 @@ def simulate_strategy(ticker, start=None, end=None):
         start_date = end_date - timedelta(days=30)
     else:
         start_date = datetime.strptime(start, "%Y-%m-%d").date()
+    return start_date, end_date
+
+
+def simulate_strategy(ticker, start=None, end=None):
+    """Run sentiment-based trading simulation"""
+    start_date, end_date = _window(start, end)
 
     print(f"[INFO] Running simulation for {ticker} from {start_date} to {end_date}")
 
     # Fetch prices and sentiment
-    prices = fetch_prices(ticker, start_date.isoformat(), end_date.isoformat())
-    sentiment = fetch_sentiment(ticker, start_date.isoformat(), end_date.isoformat())
-
+    with stage("fetch_prices"):
+        prices = fetch_prices(ticker, start_date.isoformat(), end_date.isoformat())
+    with stage("fetch_sentiment"):
+        sentiment = fetch_sentiment(ticker, start_date.isoformat(), end_date.isoformat())
+
+    return _simulate(ticker, start_date, end_date, prices, sentiment)
+
+
+def simulate_many(tickers, start=None, end=None, concurrency=None):
+    """
+    simulate_strategy over a universe. Prices come from the cache in one bulk
+    call and the sentiment requests overlap, so network latency is paid about
+    once per `concurrency` tickers rather than once per ticker.
+    Returns {ticker: result}, or {ticker: {"ticker", "error"}} where a ticker failed.
+    """
+    start_date, end_date = _window(start, end)
+    tickers = list(dict.fromkeys(tickers))
+    print(f"[INFO] Running simulation for {len(tickers)} tickers from {start_date} to {end_date}")
+
+    with stage("fetch_prices"):
+        prices = fetch_prices_many(tickers, start_date.isoformat(), end_date.isoformat())
+    with stage("fetch_sentiment"):
+        sentiment = fetch_sentiment_many(tickers, start_date.isoformat(), end_date.isoformat(), concurrency)
+
+    results = {}
+    for ticker in tickers:
+        try:
+            if isinstance(sentiment[ticker], Exception):
+                raise sentiment[ticker]
+            if prices[ticker].empty:
+                raise ValueError(f"No price data found for {ticker}")
+            results[ticker] = _simulate(ticker, start_date, end_date, prices[ticker], sentiment[ticker])
+        except Exception as e:
+            print(f"[WARN] {ticker}: {e}")
+            results[ticker] = {"ticker": ticker, "error": str(e)}
+    return results
+
+
+def _simulate(ticker, start_date, end_date, prices, sentiment):
     # ✅ Safe merge using reset_index
-    prices.index = pd.to_datetime(prices.index)
-    sentiment.index = pd.to_datetime(sentiment.index)
-    prices.index.name = "date"
-    sentiment.index.name = "date"
-
-    merged = prices.reset_index().merge(
-        sentiment.reset_index(), on="date", how="left"
-    ).fillna(0.0)
-
-    df = merged.set_index("date")
-
-    # Initialize portfolio
-    cash = INITIAL_CAPITAL
-    position = 0
-    portfolio_values = []
-    transactions = []
-
-    for date, row in df.iterrows():
-        price = row["Close"]
-        sent_score = row["sentiment_score"]
-        action = "HOLD"
-
-        # Buy logic
-        if sent_score > BUY_THRESHOLD and cash >= price:
-            qty = int((0.1 * cash) // price)
-            if qty > 0:
-                cash -= qty * price
-                position += qty
-                action = "BUY"
-                transactions.append({
-                    "date": str(date.date()),
-                    "action": action,
-                    "qty": qty,
-                    "price": round(price, 2),
-                    "sentiment": round(sent_score, 3)
-                })
-
-        # Sell logic
-        elif sent_score < SELL_THRESHOLD and position > 0:
-            cash += position * price
-            action = "SELL"
-            transactions.append({
-                "date": str(date.date()),
-                "action": action,
-                "qty": position,
-                "price": round(price, 2),
-                "sentiment": round(sent_score, 3)
-            })
-            position = 0
-
-        total_value = cash + position * price
-        portfolio_values.append(total_value)
+    with stage("merge"):
+        prices.index = pd.to_datetime(prices.index)
+        sentiment.index = pd.to_datetime(sentiment.index)
+        prices.index.name = "date"
+        sentiment.index.name = "date"
+
+        merged = prices.reset_index().merge(
+            sentiment.reset_index(), on="date", how="left"
+        ).fillna(0.0)
+
+        df = merged.set_index("date")
+
+    # Run the strategy on plain arrays
+    closes = df["Close"].to_numpy(dtype=float)
+    scores = df["sentiment_score"].to_numpy(dtype=float)
+    with stage("simulate"):
+        result = run_backtest(closes, scores, BUY_THRESHOLD, SELL_THRESHOLD, INITIAL_CAPITAL, SIZE_FRACTION)
+
+    with stage("serialize"):
+        return _simulation_output(ticker, start_date, end_date, df, scores, result)
+
+
+def _simulation_output(ticker, start_date, end_date, df, scores, result):
+    transactions = [
+        {
+            "date": str(df.index[i].date()),
+            "action": "BUY" if action == BUY else "SELL",
+            "qty": qty,
+            "price": round(price, 2),
+            "sentiment": round(scores[i].item(), 3)
+        }
+        for i, action, qty, price in zip(result["tx_index"].tolist(), result["tx_action"].tolist(),
+                                         result["tx_qty"].tolist(), result["tx_price"].tolist())
+    ]
 
     # Record metrics
-    df["total_value"] = portfolio_values
+    df["total_value"] = result["total_value"]
     metrics = compute_metrics(df["total_value"])
 
     print(f"[RESULT] {ticker} ROI={metrics['ROI%']}%, MaxDrawdown={metrics['MaxDrawdown%']}%")
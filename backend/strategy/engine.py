@@ -0,0 +1,96 @@
+import numpy as np
+
+# Action codes used in the transaction arrays
+BUY = 1
+SELL = -1
+
+
+def run_backtest(prices, scores, buy_threshold, sell_threshold, initial_capital, size_fraction=0.1):
+    """
+    Array-based core of the sentiment strategy.
+
+    Same rules as the original row loop: buy int((size_fraction * cash) // price)
+    shares when score > buy_threshold and cash >= price, otherwise sell the whole
+    position when score < sell_threshold. Cash and position only change on bars
+    that carry a signal, so only those bars are stepped through; everything else
+    is forward-filled with NumPy.
+
+    Returns a dict of arrays: position, cash, total_value (one entry per bar)
+    and tx_index, tx_action, tx_qty, tx_price (one entry per transaction).
+    """
+    prices = np.asarray(prices, dtype=np.float64)
+    scores = np.asarray(scores, dtype=np.float64)
+    n = len(prices)
+
+    candidates = np.flatnonzero((scores > buy_threshold) | (scores < sell_threshold))
+
+    cash = float(initial_capital)
+    position = 0
+    tx_index, tx_action, tx_qty, tx_price = [], [], [], []
+    # state after each bar that changed it, as (bar, cash, position)
+    change_bars, change_cash, change_pos = [], [], []
+
+    for i, price, score in zip(candidates.tolist(), prices[candidates].tolist(), scores[candidates].tolist()):
+        if score > buy_threshold and cash >= price:
+            qty = int((size_fraction * cash) // price)
+            if qty > 0:
+                cash -= qty * price
+                position += qty
+                tx_index.append(i)
+                tx_action.append(BUY)
+                tx_qty.append(qty)
+                tx_price.append(price)
+            else:
+                continue
+        elif score < sell_threshold and position > 0:
+            cash += position * price
+            tx_index.append(i)
+            tx_action.append(SELL)
+            tx_qty.append(position)
+            tx_price.append(price)
+            position = 0
+        else:
+            continue
+        change_bars.append(i)
+        change_cash.append(cash)
+        change_pos.append(position)
+
+    # Forward-fill the state: bar k takes the state of the last change at or before k
+    state_cash = np.array([float(initial_capital)] + change_cash, dtype=np.float64)
+    state_pos = np.array([0] + change_pos, dtype=np.int64)
+    which = np.searchsorted(np.array(change_bars, dtype=np.int64), np.arange(n), side="right")
+
+    cash_arr = state_cash[which]
+    pos_arr = state_pos[which]
+    total_value = cash_arr + pos_arr * prices
+
+    return {
+        "position": pos_arr,
+        "cash": cash_arr,
+        "total_value": total_value,
+        "tx_index": np.array(tx_index, dtype=np.int64),
+        "tx_action": np.array(tx_action, dtype=np.int8),
+        "tx_qty": np.array(tx_qty, dtype=np.int64),
+        "tx_price": np.array(tx_price, dtype=np.float64),
+    }
+
+
+def roi_pct(total_value):
+    """
+    Return over a value series in percent, measured from its first bar. Every
+    ROI% the API reports (simulate_strategy, simulate_portfolio, robustness)
+    uses this base.
+    """
+    total_value = np.asarray(total_value, dtype=np.float64)
+    if total_value.size == 0:
+        return 0.0
+    return float((total_value[-1] - total_value[0]) / total_value[0] * 100)
+
+
+def max_drawdown(total_value):
+    """Largest peak-to-trough drop of a value series, as a positive fraction"""
+    total_value = np.asarray(total_value, dtype=np.float64)
+    if total_value.size == 0:
+        return 0.0
+    running_max = np.maximum.accumulate(total_value)
+    return float(((running_max - total_value) / running_max).max())
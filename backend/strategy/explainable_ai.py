@@ -1,15 +1,19 @@
 
-import requests
 from collections import Counter
 import re
-import os
 
-SENTIMENT_API_BASE = os.environ.get("SENTIMENT_API_BASE", "http://localhost:8000")
+from strategy import http_client
 
 def get_headlines(ticker):
-    resp = requests.get(f"{SENTIMENT_API_BASE}/sentiment/get_headlines", params={"ticker": ticker})
-    resp.raise_for_status()
-    return resp.json()
+    return http_client.get_json("/sentiment/get_headlines", {"ticker": ticker})
+
+def get_headlines_many(tickers, concurrency=None):
+    """{ticker: headlines} fetched concurrently; a failed ticker maps to its exception"""
+    tickers = list(tickers)
+    responses = http_client.get_json_many(
+        "/sentiment/get_headlines", [{"ticker": t} for t in tickers], concurrency=concurrency
+    )
+    return dict(zip(tickers, responses))
 
 def tokenize(text):
     text = text.lower()
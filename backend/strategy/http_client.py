@@ -0,0 +1,96 @@
+# strategy/http_client.py
+# Shared HTTP layer for calls to the sentiment API: keep-alive pooling,
+# timeouts and retry with backoff, plus an asyncio variant that fetches many
+# tickers at once under a concurrency limit.
+import asyncio
+import os
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Base URL for Hazel's sentiment API (or mock_sentiment)
+SENTIMENT_API_BASE = os.environ.get("SENTIMENT_API_BASE", "http://localhost:8000")
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "10"))        # seconds, connect and read
+HTTP_RETRIES = int(os.getenv("HTTP_RETRIES", "3"))           # extra attempts after the first
+HTTP_BACKOFF = float(os.getenv("HTTP_BACKOFF", "0.25"))      # sleeps 0.25, 0.5, 1.0, ... between attempts
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "20"))      # keep-alive connections per host
+HTTP_CONCURRENCY = int(os.getenv("HTTP_CONCURRENCY", "16"))  # in-flight requests for the *_many helpers
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+_session = None
+_session_pid = None
+_session_lock = threading.Lock()
+
+
+# ----------------------------
+# Sync client
+# ----------------------------
+def get_session():
+    """Process-wide requests.Session with pooled connections and retries (rebuilt after a fork)"""
+    global _session, _session_pid
+    if _session is None or _session_pid != os.getpid():
+        with _session_lock:
+            if _session is None or _session_pid != os.getpid():
+                retry = Retry(
+                    total=HTTP_RETRIES, backoff_factor=HTTP_BACKOFF, status_forcelist=RETRY_STATUSES,
+                    allowed_methods=frozenset(["GET"]), raise_on_status=False,
+                )
+                adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE, max_retries=retry)
+                session = requests.Session()
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                _session, _session_pid = session, os.getpid()
+    return _session
+
+
+def get_json(path, params=None, base=None, timeout=None):
+    """GET {base}{path} and decode the JSON body; raises requests.HTTPError on a final 4xx/5xx"""
+    resp = get_session().get(f"{base or SENTIMENT_API_BASE}{path}", params=params, timeout=timeout or HTTP_TIMEOUT)
+    resp.raise_for_status()
+    return resp.json()
+
+
+# ----------------------------
+# Async client
+# ----------------------------
+async def _get_json_async(client, semaphore, path, params):
+    import httpx
+    for attempt in range(HTTP_RETRIES + 1):
+        last = attempt == HTTP_RETRIES
+        async with semaphore:
+            try:
+                resp = await client.get(path, params=params)
+            except httpx.TransportError:
+                if last:
+                    raise
+            else:
+                if last or resp.status_code not in RETRY_STATUSES:
+                    resp.raise_for_status()
+                    return resp.json()
+        # back off outside the semaphore so a sleeping retry doesn't hold a slot
+        await asyncio.sleep(HTTP_BACKOFF * (2 ** attempt))
+
+
+async def get_json_many_async(path, params_list, base=None, concurrency=None, timeout=None):
+    """
+    GET `path` once per params dict, at most `concurrency` at a time over one
+    pooled httpx.AsyncClient. Results come back in input order; a request
+    that still fails after its retries yields its exception in that slot.
+    """
+    import httpx
+    concurrency = concurrency or HTTP_CONCURRENCY
+    semaphore = asyncio.Semaphore(concurrency)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base or SENTIMENT_API_BASE, timeout=timeout or HTTP_TIMEOUT,
+                                 limits=limits) as client:
+        return await asyncio.gather(
+            *(_get_json_async(client, semaphore, path, params) for params in params_list),
+            return_exceptions=True,
+        )
+
+
+def get_json_many(path, params_list, base=None, concurrency=None, timeout=None):
+    """Blocking wrapper around get_json_many_async; call it from sync code, not inside an event loop"""
+    return asyncio.run(get_json_many_async(path, list(params_list), base, concurrency, timeout))
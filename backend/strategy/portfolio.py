@@ -0,0 +1,93 @@
+import numpy as np
+import pandas as pd
+
+from strategy.engine import max_drawdown, roi_pct
+
+
+def align(prices, scores):
+    """
+    Build date x ticker matrices from per-ticker series.
+
+    prices: {ticker: Series of Close indexed by date}
+    scores: {ticker: Series of sentiment_score indexed by date}
+    Returns (dates, tickers, price_matrix, score_matrix). Prices are
+    forward-filled (NaN before a ticker's first bar); missing scores are 0.
+    """
+    tickers = sorted(prices)
+    price_df = pd.DataFrame({t: prices[t] for t in tickers}).sort_index().ffill()
+    score_df = pd.DataFrame({t: scores[t] for t in tickers if t in scores})
+    score_df = score_df.reindex(index=price_df.index, columns=tickers).fillna(0.0)
+    return (
+        list(price_df.index),
+        tickers,
+        price_df.to_numpy(dtype=np.float64),
+        score_df.to_numpy(dtype=np.float64),
+    )
+
+
+def simulate_portfolio(prices, scores, buy_threshold, sell_threshold, initial_capital, size_fraction=0.1):
+    """
+    Sentiment strategy over a whole universe with one shared cash balance.
+
+    Each bar, every held ticker whose score < sell_threshold is sold in full,
+    then size_fraction of the remaining cash is split across the tickers with
+    score > buy_threshold, weighted by how far each score clears the threshold,
+    and spent on whole shares. The loop runs over bars; all per-ticker work
+    inside a bar is vectorized, so memory is the two input matrices plus a few
+    per-ticker and per-bar arrays.
+    """
+    prices = np.asarray(prices, dtype=np.float64)
+    scores = np.asarray(scores, dtype=np.float64)
+    n_bars, n_tickers = prices.shape
+    cash = float(initial_capital)
+    pos = np.zeros(n_tickers, dtype=np.int64)
+    total_value = np.empty(n_bars)
+    cash_history = np.empty(n_bars)
+    buys = np.zeros(n_tickers, dtype=np.int64)
+    sells = np.zeros(n_tickers, dtype=np.int64)
+    listed = ~np.isnan(prices)
+    marks = np.nan_to_num(prices)
+
+    for t in range(n_bars):
+        p = marks[t]
+        s = scores[t]
+        ok = listed[t]
+
+        selling = ok & (s < sell_threshold) & (pos > 0)
+        if selling.any():
+            cash += float(pos[selling] @ p[selling])
+            pos[selling] = 0
+            sells += selling
+
+        buying = ok & (s > buy_threshold) & (p <= cash) & (p > 0)
+        if buying.any():
+            excess = s[buying] - buy_threshold
+            budget = size_fraction * cash * excess / excess.sum()
+            qty = np.floor_divide(budget, p[buying]).astype(np.int64)
+            cash -= float(qty @ p[buying])
+            pos[buying] += qty
+            buys[buying] += qty > 0
+
+        cash_history[t] = cash
+        total_value[t] = cash + float(pos @ p)
+
+    return {
+        "total_value": total_value,
+        "cash": cash_history,
+        "positions": pos,
+        "buys": buys,
+        "sells": sells,
+    }
+
+
+def portfolio_metrics(total_value, initial_capital):
+    """ROI% from the first bar's value (engine.roi_pct), like the single-ticker backtest"""
+    if len(total_value) == 0:
+        return {"InitialCapital": initial_capital, "ROI%": 0.0, "MaxDrawdown%": 0.0,
+                "CurrentPortfolioValue": initial_capital}
+    return {
+        "InitialCapital": initial_capital,
+        "ROI%": round(roi_pct(total_value), 2),
+        "MaxDrawdown%": round(max_drawdown(total_value) * 100, 2),
+        "CurrentPortfolioValue": round(float(total_value[-1]), 2),
+    }
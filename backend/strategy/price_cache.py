@@ -0,0 +1,207 @@
+import json
+import os
+import threading
+from datetime import date, datetime
+import numpy as np
+import pandas as pd
+
+# One memory-mappable .npy of (day, close) rows per ticker, plus a small JSON
+# file listing the [start, end) day ranges already fetched, so ranges with no
+# bars (weekends, holidays) are not fetched again either.
+# A range is only recorded once a download actually returned bars for the
+# ticker (yf.download reports failures as an empty frame), and never past
+# the last completed day, so today's and future bars are fetched again later.
+# A request that falls entirely on days without bars is therefore re-sent.
+PRICE_CACHE_DIR = os.getenv(
+    "PRICE_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "prices")
+)
+PRICE_CACHE_OFFLINE = os.getenv("PRICE_CACHE_OFFLINE", "0").lower() in ("1", "true", "yes")
+
+BAR_DTYPE = np.dtype([("day", "<i8"), ("close", "<f8")])
+
+
+def _to_day(d):
+    """date / datetime / 'YYYY-MM-DD' -> days since epoch"""
+    if isinstance(d, str):
+        d = datetime.strptime(d[:10], "%Y-%m-%d").date()
+    elif isinstance(d, datetime):
+        d = d.date()
+    return int(np.datetime64(d, "D").astype(np.int64))
+
+
+def _utc_today():
+    return datetime.utcnow().date()
+
+
+def _from_day(day):
+    return date.fromordinal(date(1970, 1, 1).toordinal() + int(day))
+
+
+def _merge_ranges(ranges):
+    merged = []
+    for s, e in sorted(ranges):
+        if merged and s <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], e)
+        else:
+            merged.append([s, e])
+    return merged
+
+
+def _gaps(ranges, start, end):
+    """Parts of [start, end) not covered by the (merged) ranges"""
+    gaps = []
+    cursor = start
+    for s, e in ranges:
+        if e <= cursor:
+            continue
+        if s >= end:
+            break
+        if s > cursor:
+            gaps.append((cursor, min(s, end)))
+        cursor = max(cursor, e)
+    if cursor < end:
+        gaps.append((cursor, end))
+    return gaps
+
+
+def download_closes(tickers, start, end):
+    """yf.download for one or more tickers; returns {ticker: Series of Close indexed by date}"""
+    import yfinance as yf
+    data = yf.download(list(tickers), start=start, end=end, progress=False)
+    if data.empty:
+        return {}
+
+    if isinstance(data.columns, pd.MultiIndex):
+        closes = data["Close"]
+    else:
+        if "Close" not in data.columns:
+            raise ValueError(f"Expected 'Close' column not found for {', '.join(tickers)}")
+        closes = data[["Close"]].rename(columns={"Close": tickers[0]})
+
+    out = {}
+    for ticker in tickers:
+        if ticker in closes.columns:
+            series = closes[ticker].dropna()
+            series.index = pd.to_datetime(series.index).date
+            out[ticker] = series
+    return out
+
+
+class PriceCache:
+    def __init__(self, root=PRICE_CACHE_DIR, offline=PRICE_CACHE_OFFLINE, downloader=download_closes,
+                 today=_utc_today):
+        self.root = root
+        self.offline = offline
+        self.downloader = downloader
+        self.today = today
+        self._lock = threading.Lock()
+
+    # ---- storage ----
+    def _paths(self, ticker):
+        safe = ticker.upper().replace("/", "_")
+        return os.path.join(self.root, f"{safe}.npy"), os.path.join(self.root, f"{safe}.json")
+
+    def _load(self, ticker):
+        bars_path, meta_path = self._paths(ticker)
+        bars = np.load(bars_path, mmap_mode="r") if os.path.exists(bars_path) else np.empty(0, dtype=BAR_DTYPE)
+        ranges = []
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                ranges = json.load(f)["ranges"]
+        return bars, ranges
+
+    def _store(self, ticker, days, closes, start, end):
+        """
+        Merge new bars and the fetched [start, end) range into the ticker's
+        files. The range is cut off at today: only days before it are settled.
+        """
+        os.makedirs(self.root, exist_ok=True)
+        bars_path, meta_path = self._paths(ticker)
+        old, ranges = self._load(ticker)
+
+        new = np.empty(len(days), dtype=BAR_DTYPE)
+        new["day"] = days
+        new["close"] = closes
+        # new bars win over cached ones for the same day
+        combined = np.concatenate([new, np.asarray(old)])
+        _, first = np.unique(combined["day"], return_index=True)
+        merged = combined[first]
+
+        tmp = bars_path + ".tmp.npy"
+        np.save(tmp, merged)
+        os.replace(tmp, bars_path)
+        end = min(end, _to_day(self.today()))
+        if end > start:
+            ranges = _merge_ranges(ranges + [[start, end]])
+        with open(meta_path + ".tmp", "w") as f:
+            json.dump({"ranges": ranges}, f)
+        os.replace(meta_path + ".tmp", meta_path)
+
+    def put(self, ticker, frame, start=None, end=None):
+        """
+        Seed the cache from a DataFrame with a date column/index and a Close
+        column (e.g. fetch_demo_prices output). start/end default to the
+        frame's own span. An empty frame is ignored.
+        """
+        frame = frame.reset_index() if "date" not in frame.columns else frame
+        if frame.empty:
+            return
+        days = np.array([_to_day(d) for d in frame["date"]], dtype=np.int64)
+        start = _to_day(start) if start is not None else int(days.min())
+        end = _to_day(end) if end is not None else int(days.max()) + 1
+        with self._lock:
+            self._store(ticker, days, frame["Close"].to_numpy(dtype=float), start, end)
+
+    def seed_from_csv(self, ticker, path):
+        """Seed from a CSV with Date/date and Close columns"""
+        frame = pd.read_csv(path)
+        frame = frame.rename(columns={"Date": "date"})
+        frame["date"] = pd.to_datetime(frame["date"]).dt.date
+        self.put(ticker, frame[["date", "Close"]])
+
+    # ---- reads ----
+    def missing(self, ticker, start, end):
+        _, ranges = self._load(ticker)
+        return _gaps(ranges, _to_day(start), _to_day(end))
+
+    def get_many(self, tickers, start, end):
+        """
+        Close prices for many tickers over [start, end), as {ticker: DataFrame}
+        in fetch_prices' shape. Only uncached ranges are downloaded, batched
+        into one download per distinct gap.
+        """
+        tickers = list(dict.fromkeys(tickers))
+        if not self.offline:
+            by_gap = {}
+            for ticker in tickers:
+                for gap in self.missing(ticker, start, end):
+                    by_gap.setdefault(gap, []).append(ticker)
+            for (gs, ge), group in by_gap.items():
+                fetched = self.downloader(group, _from_day(gs).isoformat(), _from_day(ge).isoformat())
+                with self._lock:
+                    for ticker in group:
+                        series = fetched.get(ticker)
+                        if series is None or series.empty:
+                            # a failed or empty download: leave the gap to be fetched next time
+                            continue
+                        days = np.array([_to_day(d) for d in series.index], dtype=np.int64)
+                        self._store(ticker, days, series.to_numpy(dtype=float), gs, ge)
+
+        start_day, end_day = _to_day(start), _to_day(end)
+        out = {}
+        for ticker in tickers:
+            bars, _ = self._load(ticker)
+            lo, hi = np.searchsorted(bars["day"], [start_day, end_day])
+            window = np.asarray(bars[lo:hi])
+            out[ticker] = pd.DataFrame(
+                {"Close": window["close"]},
+                index=pd.Index([_from_day(d) for d in window["day"]], name="date")
+            )
+        return out
+
+    def get(self, ticker, start, end):
+        return self.get_many([ticker], start, end)[ticker]
+
+
+cache = PriceCache()
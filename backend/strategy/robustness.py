@@ -0,0 +1,227 @@
+# strategy/robustness.py
+# How fragile is one backtest? Re-run the strategy over thousands of
+# resampled scenarios and summarise the spread of ROI% and MaxDrawdown%:
+#   bootstrap  circular block bootstrap of (daily return, sentiment) pairs,
+#              so the signal keeps its link to the move it preceded
+#   noise      Gaussian noise added to the sentiment scores
+#   shuffle    sentiment days permuted against prices: the null test for the
+#              signal's timing, giving a p-value for the observed ROI
+# Scenarios run BATCH_SIZE at a time, each batch one vectorized pass over the
+# bars, and batches are spread over a process pool shared by every call. Every
+# batch draws from its own child of SeedSequence(seed), so results do not
+# depend on the worker count.
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import numpy as np
+from strategy.engine import run_backtest, max_drawdown, roi_pct
+
+KINDS = ("bootstrap", "noise", "shuffle")
+# Scenarios per vectorized pass; bounds memory to a few (bars x BATCH_SIZE) arrays
+BATCH_SIZE = 1000
+ROBUSTNESS_WORKERS = int(os.getenv("ROBUSTNESS_WORKERS", "0"))  # 0 = one per CPU
+
+_pool = None  # ProcessPoolExecutor shared by every analyze() call, created on first use
+_pool_lock = threading.Lock()
+
+
+def _get_pool():
+    """
+    The shared pool of ROBUSTNESS_WORKERS (or one per CPU) processes. Spawned
+    rather than forked: the API calls this from request threads, and a forked
+    child would copy whatever locks those threads held.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=ROBUSTNESS_WORKERS or os.cpu_count() or 1,
+                                        mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+
+def _discard_pool(pool):
+    """A worker died (e.g. OOM-killed); don't hand the dead pool to the next call"""
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+
+
+def shutdown():
+    """Stop the shared pool (on app shutdown); the next analyze() starts a new one"""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def backtest_paths(prices, scores, buy_threshold, sell_threshold, initial_capital, size_fraction):
+    """
+    Run the strategy over many scenarios at once. prices and scores are
+    (bars, scenarios) arrays, one column per scenario; same rules as
+    engine.run_backtest with the state held in arrays of length `scenarios`.
+
+    Returns (roi_pct, max_drawdown_pct) arrays, ROI measured from the first
+    bar's value as in engine.roi_pct.
+    """
+    n_bars, n_paths = prices.shape
+    cash = np.full(n_paths, float(initial_capital))
+    pos = np.zeros(n_paths, dtype=np.int64)
+    max_dd = np.zeros(n_paths)
+    if n_bars == 0:
+        return np.zeros(n_paths), max_dd
+
+    for t in range(n_bars):
+        price = prices[t]
+        score = scores[t]
+        buying = (score > buy_threshold) & (cash >= price)
+        if buying.any():
+            qty = np.where(buying, np.floor_divide(size_fraction * cash, price), 0).astype(np.int64)
+            cash = cash - qty * price
+            pos = pos + qty
+        selling = ~buying & (score < sell_threshold) & (pos > 0)
+        if selling.any():
+            cash = np.where(selling, cash + pos * price, cash)
+            pos = np.where(selling, 0, pos)
+
+        value = cash + pos * price
+        if t == 0:
+            first = value
+            peak = value.copy()
+        else:
+            np.maximum(peak, value, out=peak)
+            np.maximum(max_dd, (peak - value) / peak, out=max_dd)
+
+    roi = (value - first) / first * 100
+    return roi, max_dd * 100
+
+
+# ----------------------------
+# Scenario generators: (prices, scores, n, rng, options) -> (bars, n) price and score paths
+# ----------------------------
+def bootstrap_paths(prices, scores, n, rng, block_size):
+    """Price paths rebuilt from block-resampled daily returns, each day keeping its own score"""
+    n_bars = len(prices)
+    n_returns = n_bars - 1
+    if n_returns < 1:
+        return np.broadcast_to(prices[:, None], (n_bars, n)), np.broadcast_to(scores[:, None], (n_bars, n))
+    block_size = min(block_size, n_returns)
+    n_blocks = -(-n_returns // block_size)
+    starts = rng.integers(0, n_returns, (n_blocks, 1, n))
+    # day index of bar t+1 in each scenario, blocks wrapping around the end
+    days = ((starts + np.arange(block_size)[None, :, None]) % n_returns).reshape(n_blocks * block_size, n)[:n_returns] + 1
+    growth = prices[1:] / prices[:-1]
+
+    path_prices = np.empty((n_bars, n))
+    path_prices[0] = prices[0]
+    path_prices[1:] = prices[0] * np.cumprod(growth[days - 1], axis=0)
+    path_scores = np.empty((n_bars, n))
+    path_scores[0] = scores[0]
+    path_scores[1:] = scores[days]
+    return path_prices, path_scores
+
+
+def noise_paths(prices, scores, n, rng, noise_std):
+    noisy = scores[:, None] + rng.normal(0.0, noise_std, (len(scores), n))
+    return np.broadcast_to(prices[:, None], (len(prices), n)), noisy
+
+
+def shuffle_paths(prices, scores, n, rng):
+    # an independent permutation of the days per scenario
+    order = np.argsort(rng.random((len(scores), n)), axis=0)
+    return np.broadcast_to(prices[:, None], (len(prices), n)), scores[order]
+
+
+def _run_batch(task):
+    kind, prices, scores, n, seed, params = task
+    rng = np.random.default_rng(seed)
+    if kind == "bootstrap":
+        path_prices, path_scores = bootstrap_paths(prices, scores, n, rng, params["block_size"])
+    elif kind == "noise":
+        path_prices, path_scores = noise_paths(prices, scores, n, rng, params["noise_std"])
+    else:
+        path_prices, path_scores = shuffle_paths(prices, scores, n, rng)
+    return backtest_paths(path_prices, path_scores, params["buy_threshold"], params["sell_threshold"],
+                          params["initial_capital"], params["size_fraction"])
+
+
+# ----------------------------
+# Analysis
+# ----------------------------
+def _distribution(values, confidence):
+    lo, hi = np.percentile(values, [(1 - confidence) / 2 * 100, (1 + confidence) / 2 * 100])
+    return {
+        "mean": round(float(values.mean()), 2),
+        "std": round(float(values.std()), 2),
+        "ci": [round(float(lo), 2), round(float(hi), 2)],
+    }
+
+
+def summarize(kind, roi, dd, observed_roi, confidence):
+    summary = {
+        "scenarios": int(len(roi)),
+        "ROI%": _distribution(roi, confidence),
+        "MaxDrawdown%": _distribution(dd, confidence),
+        "prob_loss": round(float((roi < 0).mean()), 4),
+    }
+    if kind == "shuffle":
+        # one-sided: how often random timing does at least as well as the real signal
+        summary["p_value"] = round(float((1 + (roi >= observed_roi).sum()) / (1 + len(roi))), 4)
+    return summary
+
+
+def analyze(prices, scores, buy_threshold, sell_threshold, initial_capital, size_fraction,
+            scenarios=10_000, kinds=KINDS, block_size=None, noise_std=0.1, confidence=0.95, seed=0, parallel=True):
+    """
+    Observed ROI% / MaxDrawdown% plus `scenarios` resampled runs per kind,
+    summarised as mean, std and a `confidence` interval (and a p-value for
+    the shuffle null test). block_size defaults to the cube root of the
+    number of bars. With `parallel`, batches run on the shared process pool.
+    """
+    prices = np.asarray(prices, dtype=np.float64)
+    scores = np.asarray(scores, dtype=np.float64)
+    observed = run_backtest(prices, scores, buy_threshold, sell_threshold, initial_capital, size_fraction)["total_value"]
+    observed_roi = roi_pct(observed)
+    observed_dd = max_drawdown(observed) * 100
+
+    params = {
+        "buy_threshold": buy_threshold, "sell_threshold": sell_threshold,
+        "initial_capital": initial_capital, "size_fraction": size_fraction,
+        "block_size": block_size or max(1, round(len(prices) ** (1 / 3))),
+        "noise_std": noise_std,
+    }
+    # one seed stream per kind, so a kind's results don't depend on which others were asked for
+    streams = dict(zip(KINDS, np.random.SeedSequence(seed).spawn(len(KINDS))))
+    tasks = []
+    for kind in kinds:
+        sizes = [min(BATCH_SIZE, scenarios - lo) for lo in range(0, scenarios, BATCH_SIZE)]
+        for n, batch_seed in zip(sizes, streams[kind].spawn(len(sizes))):
+            tasks.append((kind, prices, scores, n, batch_seed, params))
+
+    if parallel and len(tasks) > 1 and (ROBUSTNESS_WORKERS or os.cpu_count() or 1) > 1:
+        pool = _get_pool()
+        try:
+            results = list(pool.map(_run_batch, tasks))
+        except BrokenProcessPool:
+            _discard_pool(pool)
+            raise
+    else:
+        results = [_run_batch(task) for task in tasks]
+
+    out = {}
+    for kind in kinds:
+        batches = [r for task, r in zip(tasks, results) if task[0] == kind]
+        roi = np.concatenate([b[0] for b in batches])
+        dd = np.concatenate([b[1] for b in batches])
+        out[kind] = summarize(kind, roi, dd, observed_roi, confidence)
+    return {
+        "observed": {"ROI%": round(float(observed_roi), 2), "MaxDrawdown%": round(float(observed_dd), 2)},
+        "confidence": confidence,
+        "block_size": params["block_size"],
+        "noise_std": noise_std,
+        "seed": seed,
+        "scenarios": out,
+    }
@@ -0,0 +1,93 @@
+import itertools
+import numpy as np
+
+# Parameter combinations evaluated together per pass; bounds memory to a few
+# arrays of this length regardless of grid size.
+COMBO_BATCH = 4096
+
+
+def make_grid(buy_thresholds, sell_thresholds, size_fractions):
+    """Cartesian product of the parameter lists as three aligned arrays"""
+    combos = list(itertools.product(buy_thresholds, sell_thresholds, size_fractions))
+    if not combos:
+        return np.empty(0), np.empty(0), np.empty(0)
+    buy, sell, frac = (np.array(col, dtype=np.float64) for col in zip(*combos))
+    return buy, sell, frac
+
+
+def backtest_grid(prices, scores, buy, sell, frac, initial_capital):
+    """
+    Run the strategy for every parameter combination at once over one price
+    series. Same rules as engine.run_backtest, with the state held in arrays of
+    length len(buy) and advanced one bar at a time.
+
+    Returns (roi_pct, max_drawdown_pct) arrays, with ROI measured from the
+    first bar's value as in run_full_pipeline.simulate_strategy.
+    """
+    prices = np.asarray(prices, dtype=np.float64)
+    scores = np.asarray(scores, dtype=np.float64)
+    n_combos = len(buy)
+    cash = np.full(n_combos, float(initial_capital))
+    pos = np.zeros(n_combos, dtype=np.int64)
+    first = None
+    peak = None
+    max_dd = np.zeros(n_combos)
+
+    for price, score in zip(prices.tolist(), scores.tolist()):
+        buying = (score > buy) & (cash >= price)
+        if buying.any():
+            qty = np.where(buying, np.floor_divide(frac * cash, price), 0).astype(np.int64)
+            bought = qty > 0
+            cash = np.where(bought, cash - qty * price, cash)
+            pos = pos + qty
+        selling = ~buying & (score < sell) & (pos > 0)
+        if selling.any():
+            cash = np.where(selling, cash + pos * price, cash)
+            pos = np.where(selling, 0, pos)
+
+        value = cash + pos * price
+        if first is None:
+            first = value
+            peak = value.copy()
+        else:
+            np.maximum(peak, value, out=peak)
+            np.maximum(max_dd, (peak - value) / peak, out=max_dd)
+
+    if first is None:
+        return np.zeros(n_combos), np.zeros(n_combos)
+    roi = (value - first) / first * 100
+    return roi, max_dd * 100
+
+
+def sweep(series, buy_thresholds, sell_thresholds, size_fractions, initial_capital):
+    """
+    Evaluate a parameter grid over several tickers.
+
+    series: {ticker: (prices, scores)} loaded once by the caller and only read here.
+    Returns rows sorted by mean ROI% (best first), each with the parameters, the
+    mean ROI% across tickers and the worst MaxDrawdown% across tickers.
+    """
+    buy, sell, frac = make_grid(buy_thresholds, sell_thresholds, size_fractions)
+    n_combos = len(buy)
+    roi_sum = np.zeros(n_combos)
+    worst_dd = np.zeros(n_combos)
+
+    for prices, scores in series.values():
+        for lo in range(0, n_combos, COMBO_BATCH):
+            hi = lo + COMBO_BATCH
+            roi, dd = backtest_grid(prices, scores, buy[lo:hi], sell[lo:hi], frac[lo:hi], initial_capital)
+            roi_sum[lo:hi] += roi
+            np.maximum(worst_dd[lo:hi], dd, out=worst_dd[lo:hi])
+
+    mean_roi = roi_sum / max(len(series), 1)
+    order = np.lexsort((worst_dd, -mean_roi))
+    return [
+        {
+            "buy_threshold": float(buy[i]),
+            "sell_threshold": float(sell[i]),
+            "size_fraction": float(frac[i]),
+            "ROI%": round(float(mean_roi[i]), 2),
+            "MaxDrawdown%": round(float(worst_dd[i]), 2),
+        }
+        for i in order
+    ]
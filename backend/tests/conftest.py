@@ -0,0 +1,48 @@
+# tests/conftest.py
+import os
+
+import pytest
+
+
+@pytest.fixture
+def sqlite_db(tmp_path, monkeypatch):
+    """Point db.db_connect at a fresh SQLite file for one test; yields the URL"""
+    from db import db_connect
+    url = f"sqlite:///{tmp_path / 'test.db'}"
+    monkeypatch.setattr(db_connect, "DATABASE_URL", url)
+    # spawned worker processes read it from the environment
+    monkeypatch.setenv("DATABASE_URL", url)
+    db_connect.reset_engine()
+    yield url
+    db_connect.get_engine().dispose()
+    db_connect.reset_engine()
+
+
+@pytest.fixture
+def postgres_db(monkeypatch):
+    """
+    Point db.db_connect at TEST_POSTGRES_URL, a scratch database whose tables
+    are dropped before and after the test; skipped when it isn't set.
+    """
+    url = os.getenv("TEST_POSTGRES_URL")
+    if not url:
+        pytest.skip("TEST_POSTGRES_URL is not set")
+    pytest.importorskip("psycopg2")
+    from db import db_connect
+    monkeypatch.setattr(db_connect, "DATABASE_URL", url)
+    monkeypatch.setenv("DATABASE_URL", url)
+    db_connect.reset_engine()
+    _drop_tables(db_connect.get_engine())
+    yield url
+    _drop_tables(db_connect.get_engine())
+    db_connect.get_engine().dispose()
+    db_connect.reset_engine()
+
+
+def _drop_tables(engine):
+    from sqlalchemy import text
+    from db.db_connect import Base
+    from db import models  # noqa: F401 (registers the tables on Base)
+    with engine.begin() as conn:
+        for table in [*Base.metadata.tables, "news_sentiment_unpartitioned"]:
+            conn.execute(text(f"DROP TABLE IF EXISTS {table} CASCADE"))
@@ -0,0 +1,110 @@
+# tests/test_archive.py
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy import func, text
+
+pytest.importorskip("pyarrow")
+
+from db import changes
+from db.archive import apply_retention, read_news, rebuild_archived_rollup
+from db.db_connect import SessionLocal, get_engine
+from db.migrate import migrate
+from db.models import NewsSentiment, NewsContent
+from db.partitions import ensure_partitions, is_partitioned, partition_name, partition_names
+from db.queries import sentiment_summary
+from db.rollup import rollup_articles
+
+TODAY = date(2025, 12, 15)  # keep_months=1 keeps November and December
+MONTHS = [datetime(2025, 9, 10), datetime(2025, 10, 10), datetime(2025, 11, 10), datetime(2025, 12, 10)]
+
+
+@pytest.fixture
+def notified(monkeypatch):
+    calls = []
+    monkeypatch.setattr(changes, "_listeners", [calls.append])
+    return calls
+
+
+def seed(session):
+    rows = [NewsSentiment(ticker=t, title=f"{t} {i} {day:%m}", sentiment=("Positive", "Negative")[i % 2],
+                          confidence=0.75, created_at=day)
+            for day in MONTHS for t in ("AAPL", "TSLA") for i in range(3)]
+    session.add_all(rows)
+    session.flush()
+    session.add_all([NewsContent(id=r.id, content=f"body {r.id}") for r in rows])
+    rollup_articles(session, rows)
+    session.commit()
+    return rows
+
+
+def test_retention_archives_old_months_and_notifies(sqlite_db, tmp_path, notified):
+    migrate()
+    session = SessionLocal()
+    try:
+        seed(session)
+        before = sentiment_summary(session, "AAPL", date(2025, 9, 1))
+        notified.clear()  # migrate's rebuilds
+
+        done = apply_retention(session, keep_months=1, today=TODAY, archive_dir=str(tmp_path))
+        assert done == [{"month": "2025-09", "rows": 6}, {"month": "2025-10", "rows": 6}]
+        assert session.query(func.min(NewsSentiment.created_at)).scalar() == MONTHS[2]
+        assert session.query(func.count(NewsContent.id)).scalar() == 12
+        assert notified == [{"AAPL", "TSLA"}, {"AAPL", "TSLA"}]
+
+        archived = read_news(["aapl"], archive_dir=str(tmp_path))
+        assert len(archived) == 6
+        assert all(archived["content"] == "body " + archived["id"].astype(str))
+        # the rollup keeps the archived days
+        assert sentiment_summary(session, "AAPL", date(2025, 9, 1)) == before
+
+        assert rebuild_archived_rollup(session, archive_dir=str(tmp_path)) == 12
+        assert notified[-1] is None
+        assert sentiment_summary(session, "AAPL", date(2025, 9, 1)) == before
+    finally:
+        session.close()
+
+
+def test_postgres_partitions(postgres_db, tmp_path):
+    # a table from before partitioning, bodies still inline
+    with get_engine().begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE news_sentiment (id SERIAL PRIMARY KEY, title VARCHAR, content TEXT, sentiment VARCHAR, "
+            "confidence FLOAT, ticker VARCHAR, source VARCHAR, created_at TIMESTAMP)"
+        ))
+        for i, day in enumerate(MONTHS[:3]):
+            conn.execute(text(
+                "INSERT INTO news_sentiment (title, content, sentiment, confidence, ticker, created_at) "
+                "VALUES (:t, :c, 'Positive', 0.9, 'AAPL', :d)"
+            ), {"t": f"AAPL {i}", "c": f"body {i}", "d": day})
+
+    migrate()
+    session = SessionLocal()
+    try:
+        assert is_partitioned(session)
+        assert {partition_name(date(2025, m, 1)) for m in (9, 10, 11)} <= partition_names(session)
+        assert session.query(func.count(NewsContent.id)).scalar() == 3
+        ids = [r.id for r in session.query(NewsSentiment.id).order_by(NewsSentiment.id)]
+        assert ids == [1, 2, 3]
+        session.add(NewsSentiment(ticker="AAPL", title="new", created_at=MONTHS[2]))
+        session.commit()
+        assert session.query(func.max(NewsSentiment.id)).scalar() == 4
+
+        # a month with no partition lands in the default one until ensure_partitions moves it out
+        session.add(NewsSentiment(ticker="AAPL", title="stray", created_at=datetime(2024, 1, 5)))
+        session.commit()
+        ensure_partitions(session, [datetime(2024, 1, 5)])
+        session.commit()
+        assert partition_name(date(2024, 1, 1)) in partition_names(session)
+        assert session.execute(text("SELECT count(*) FROM news_sentiment_default")).scalar() == 0
+
+        done = apply_retention(session, keep_months=1, today=TODAY, archive_dir=str(tmp_path))
+        assert [m["month"] for m in done] == ["2024-01", "2025-09", "2025-10"]
+        names = partition_names(session)
+        assert not {partition_name(date(2024, 1, 1)), partition_name(date(2025, 9, 1)),
+                    partition_name(date(2025, 10, 1))} & names
+        assert partition_name(date(2025, 11, 1)) in names
+        assert session.query(func.count(NewsSentiment.id)).scalar() == 2
+        assert len(read_news(["AAPL"], archive_dir=str(tmp_path))) == 3
+    finally:
+        session.close()
@@ -0,0 +1,105 @@
+# tests/test_engine.py
+# strategy.engine.run_backtest against the original iterrows loop from
+# simulate_strategy: same portfolio values and the same transactions, bar for bar.
+import numpy as np
+import pandas as pd
+import pytest
+
+from strategy.engine import run_backtest, max_drawdown, BUY, SELL
+
+
+def legacy_loop(closes, scores, buy_threshold, sell_threshold, initial_capital, size_fraction=0.1):
+    """The original row loop, kept as the reference"""
+    merged = pd.DataFrame({"Close": closes, "sentiment_score": scores})
+    cash = initial_capital
+    position = 0
+    portfolio_values = []
+    transactions = []
+    for i, row in merged.iterrows():
+        price = row["Close"]
+        score = row["sentiment_score"]
+        if score > buy_threshold and cash >= price:
+            qty = int((size_fraction*cash)//price)
+            if qty > 0:
+                cash -= qty*price
+                position += qty
+                transactions.append((i, BUY, qty, price))
+        elif score < sell_threshold and position > 0:
+            cash += position*price
+            transactions.append((i, SELL, position, price))
+            position = 0
+        portfolio_values.append(cash + position*price)
+    return np.array(portfolio_values), transactions
+
+
+def assert_parity(closes, scores, buy_threshold=0.15, sell_threshold=-0.15, initial_capital=100000.0,
+                  size_fraction=0.1):
+    values, transactions = legacy_loop(closes, scores, buy_threshold, sell_threshold, initial_capital, size_fraction)
+    result = run_backtest(closes, scores, buy_threshold, sell_threshold, initial_capital, size_fraction)
+    np.testing.assert_array_equal(result["total_value"], values)
+    got = list(zip(result["tx_index"].tolist(), result["tx_action"].tolist(),
+                   result["tx_qty"].tolist(), result["tx_price"].tolist()))
+    assert got == transactions
+    return result
+
+
+def random_series(n, seed):
+    rng = np.random.default_rng(seed)
+    closes = 150 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    scores = np.clip(rng.normal(0, 0.2, n), -1, 1)
+    return closes, scores
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2, 3])
+@pytest.mark.parametrize("size_fraction", [0.1, 0.5, 1.0])
+def test_matches_legacy_loop(seed, size_fraction):
+    closes, scores = random_series(500, seed)
+    result = assert_parity(closes, scores, size_fraction=size_fraction)
+    assert len(result["tx_index"]) > 0
+
+
+def test_no_trades():
+    closes, _ = random_series(100, 4)
+    result = assert_parity(closes, np.zeros(100))
+    assert len(result["tx_index"]) == 0
+    np.testing.assert_array_equal(result["total_value"], np.full(100, 100000.0))
+
+
+def test_insufficient_cash():
+    # every bar is a buy signal, but no share is affordable
+    closes = np.full(50, 250.0)
+    result = assert_parity(closes, np.ones(50), initial_capital=200.0)
+    assert len(result["tx_index"]) == 0
+
+
+def test_fraction_too_small_for_one_share():
+    # cash >= price, yet size_fraction * cash buys nothing; the bar must not fall through to a sell
+    closes = np.array([100.0, 100.0, 900.0, 900.0])
+    scores = np.array([0.5, 0.5, 0.5, -0.5])
+    assert_parity(closes, scores, initial_capital=1000.0, size_fraction=0.5)
+
+
+def test_buy_and_sell_signal_on_same_bar():
+    # overlapping thresholds: every score is both a buy and a sell signal; the buy wins while cash lasts,
+    # the sell takes over once it does not
+    closes, _ = random_series(200, 5)
+    scores = np.zeros(200)
+    result = assert_parity(closes, scores, buy_threshold=-0.5, sell_threshold=0.5, size_fraction=1.0)
+    assert set(result["tx_action"].tolist()) == {BUY, SELL}
+
+
+def test_sell_then_buy_on_consecutive_bars():
+    closes = np.array([10.0, 11.0, 12.0, 13.0, 9.0])
+    scores = np.array([0.9, -0.9, 0.9, -0.9, 0.9])
+    result = assert_parity(closes, scores, initial_capital=1000.0)
+    assert result["tx_action"].tolist() == [BUY, SELL, BUY, SELL, BUY]
+
+
+def test_empty_series():
+    result = assert_parity(np.array([]), np.array([]))
+    assert len(result["total_value"]) == 0
+    assert max_drawdown(result["total_value"]) == 0.0
+
+
+def test_max_drawdown():
+    assert max_drawdown([100.0, 120.0, 90.0, 130.0, 65.0]) == pytest.approx(0.5)
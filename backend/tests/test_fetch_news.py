@@ -0,0 +1,33 @@
+# tests/test_fetch_news.py
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+
+from db.db_connect import SessionLocal
+from db.migrate import migrate
+from db.models import NewsSentiment
+
+
+def test_fetch_news_pages_by_default(sqlite_db, monkeypatch):
+    import main
+    migrate()
+    session = SessionLocal()
+    now = datetime.now()
+    session.add_all(NewsSentiment(ticker="AAPL", title=f"Headline {i}", sentiment="Neutral", confidence=0.5,
+                                  created_at=now - timedelta(hours=i)) for i in range(5))
+    session.commit()
+    session.close()
+    monkeypatch.setattr(main, "MAX_NEWS_PAGE", 2)
+
+    titles, cursor = [], None
+    with TestClient(main.app) as client:
+        for _ in range(3):
+            params = {"fields": "title"} if cursor is None else {"fields": "title", "cursor": cursor}
+            body = client.get("/fetch_news/AAPL", params=params).json()
+            assert body["count"] <= 2
+            titles += [row["title"] for row in body["data"]]
+            cursor = body["next_cursor"]
+        assert cursor is None
+        assert titles == [f"Headline {i}" for i in range(5)]
+        assert client.get("/fetch_news/AAPL", params={"limit": 3}).status_code == 400
+        assert client.get("/fetch_news/MSFT").json()["next_cursor"] is None
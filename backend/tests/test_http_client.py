@@ -0,0 +1,99 @@
+# tests/test_http_client.py
+# The pooled sync client and the async fan-out against a local stub server:
+# retries on 5xx, the concurrency cap and result order.
+import json
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+import pytest
+import requests
+
+from strategy import http_client
+
+
+class StubApi(BaseHTTPRequestHandler):
+    """Echoes the ticker. A ticker's first request gets a 503; "BAD" always gets a 500."""
+    protocol_version = "HTTP/1.1"
+    latency = 0.05
+    lock = threading.Lock()
+    seen = {}
+    in_flight = 0
+    max_in_flight = 0
+
+    def do_GET(self):
+        ticker = parse_qs(urlparse(self.path).query).get("ticker", ["?"])[0]
+        cls = type(self)
+        with cls.lock:
+            cls.seen[ticker] = cls.seen.get(ticker, 0) + 1
+            attempt = cls.seen[ticker]
+            cls.in_flight += 1
+            cls.max_in_flight = max(cls.max_in_flight, cls.in_flight)
+        time.sleep(self.latency)
+        with cls.lock:
+            cls.in_flight -= 1
+        if ticker == "BAD":
+            return self._send(500, {})
+        if attempt == 1:
+            return self._send(503, {})
+        self._send(200, {"ticker": ticker, "attempt": attempt})
+
+    def _send(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def api(monkeypatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubApi)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    StubApi.seen.clear()
+    StubApi.in_flight = StubApi.max_in_flight = 0
+    monkeypatch.setattr(http_client, "SENTIMENT_API_BASE", f"http://127.0.0.1:{server.server_address[1]}")
+    monkeypatch.setattr(http_client, "HTTP_BACKOFF", 0.01)
+    monkeypatch.setattr(http_client, "HTTP_RETRIES", 2)
+    monkeypatch.setattr(http_client, "_session", None)  # rebuilt with the settings above
+    yield StubApi
+    server.shutdown()
+    server.server_close()
+
+
+def test_sync_retries_5xx(api):
+    assert http_client.get_json("/sentiment", {"ticker": "AAPL"}) == {"ticker": "AAPL", "attempt": 2}
+
+
+def test_sync_raises_after_last_retry(api):
+    with pytest.raises(requests.HTTPError):
+        http_client.get_json("/sentiment", {"ticker": "BAD"})
+    assert api.seen["BAD"] == 3
+
+
+def test_many_keeps_order_and_retries(api):
+    tickers = [f"T{i:02d}" for i in range(24)]
+    results = http_client.get_json_many("/sentiment", [{"ticker": t} for t in tickers], concurrency=4)
+    assert results == [{"ticker": t, "attempt": 2} for t in tickers]
+
+
+def test_many_respects_concurrency_cap(api):
+    tickers = [f"T{i:02d}" for i in range(24)]
+    t0 = time.perf_counter()
+    http_client.get_json_many("/sentiment", [{"ticker": t} for t in tickers], concurrency=4)
+    elapsed = time.perf_counter() - t0
+    assert 1 < api.max_in_flight <= 4
+    # 48 requests of 50 ms, four at a time
+    assert elapsed >= 48 * api.latency / 4
+
+
+def test_many_returns_failures_in_their_slot(api):
+    results = http_client.get_json_many("/sentiment", [{"ticker": "A"}, {"ticker": "BAD"}, {"ticker": "B"}])
+    assert results[0] == {"ticker": "A", "attempt": 2} and results[2] == {"ticker": "B", "attempt": 2}
+    assert isinstance(results[1], Exception)
+    assert api.seen["BAD"] == 3
@@ -0,0 +1,97 @@
+# tests/test_ingest.py
+# NewsApiSource checkpoints: a failed page or the max_pages budget must not
+# move the `since` window past articles that were never read.
+import pytest
+
+from db.db_connect import SessionLocal
+from db.migrate import migrate
+from db.models import NewsSentiment
+from sentiment import ingest as ingest_module
+from sentiment.ingest import NewsApiSource, ingest, load_checkpoint
+
+
+class FakeNewsApi:
+    """Pages over a fixed newest-first list; raises for the pages in `failing`"""
+
+    def __init__(self, n):
+        self.articles = [
+            {"title": f"Headline {i}", "url": f"https://news.example/{i}", "description": "body",
+             "source": {"name": "Example"}, "publishedAt": f"2025-10-{28 - i:02d}T12:00:00Z"}
+            for i in range(n)
+        ]
+        self.failing = set()
+        self.requests = []
+
+    def __call__(self, query, page=1, page_size=100, from_date=None, raise_errors=False):
+        self.requests.append(page)
+        if page in self.failing:
+            raise RuntimeError("HTTP 500")
+        window = [a for a in self.articles if not from_date or a["publishedAt"] >= from_date]
+        return window[(page - 1) * page_size:page * page_size]
+
+
+def scorer(titles):
+    return [{"sentiment": "Positive", "confidence": 0.9} for _ in titles]
+
+
+@pytest.fixture
+def session(sqlite_db):
+    migrate()
+    session = SessionLocal()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def api(monkeypatch):
+    api = FakeNewsApi(7)
+    monkeypatch.setattr(ingest_module, "get_news", api)
+    return api
+
+
+def run(session, source):
+    return ingest(source, "AAPL", scorer=scorer, chunk_size=2, db=session)
+
+
+def checkpoint(session, source):
+    return load_checkpoint(session, f"{source.name}|AAPL")
+
+
+def titles(session):
+    return {r.title for r in session.query(NewsSentiment.title)}
+
+
+def test_reads_every_page_then_moves_window(session, api):
+    source = NewsApiSource("AAPL", page_size=2, max_pages=10)
+    assert run(session, source)["inserted"] == 7
+    assert checkpoint(session, source) == "2025-10-28T12:00:00Z|1|2025-10-28T12:00:00Z"
+
+
+def test_failed_page_is_retried_next_run(session, api):
+    source = NewsApiSource("AAPL", page_size=2, max_pages=10)
+    api.failing = {3}
+    assert run(session, source)["inserted"] == 4
+    assert checkpoint(session, source).split("|")[:2] == ["", "3"]
+
+    api.failing = set()
+    assert run(session, source)["inserted"] == 3
+    assert titles(session) == {f"Headline {i}" for i in range(7)}
+    assert checkpoint(session, source).startswith("2025-10-28T12:00:00Z|1|")
+
+
+def test_max_pages_resumes_on_next_page(session, api):
+    source = NewsApiSource("AAPL", page_size=2, max_pages=2)
+    assert run(session, source)["inserted"] == 4
+    assert checkpoint(session, source) == "|3|2025-10-28T12:00:00Z"
+
+    assert run(session, source)["inserted"] == 3
+    assert api.requests == [1, 2, 3, 4]
+    # the newest timestamp from the first run is carried over
+    assert checkpoint(session, source) == "2025-10-28T12:00:00Z|1|2025-10-28T12:00:00Z"
+
+
+def test_legacy_cursor(session, api):
+    source = NewsApiSource("AAPL", page_size=2, max_pages=10)
+    ingest_module.save_checkpoint(session, f"{source.name}|AAPL", "2025-10-25T00:00:00Z|1")
+    session.commit()
+    assert run(session, source)["inserted"] == 4  # published on or after the 25th
@@ -0,0 +1,28 @@
+# tests/test_jobs.py
+import threading
+
+from jobs import Job
+
+
+def test_to_dict_while_progress_is_reported():
+    job = Job("pipeline", {})
+    errors = []
+
+    def worker():
+        # every call adds a ticker, so the dicts keep growing while they are read
+        for i in range(20_000):
+            job.progress(f"T{i}", "running", None)
+            job.progress(f"T{i}", "done", {"ROI%": 0.0})
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    try:
+        while thread.is_alive():
+            snapshot = job.to_dict()
+            assert snapshot["progress"]["done"] <= snapshot["progress"]["total"]
+    except Exception as e:
+        errors.append(e)
+    finally:
+        thread.join()
+    assert not errors
+    assert job.to_dict()["progress"] == {"done": 20_000, "total": 20_000}
@@ -0,0 +1,57 @@
+# tests/test_live.py
+from datetime import datetime
+
+import pytest
+
+import live
+from db.db_connect import SessionLocal
+from db.migrate import migrate
+from db.models import NewsSentiment
+
+
+@pytest.fixture
+def session(sqlite_db):
+    migrate()
+    session = SessionLocal()
+    yield session
+    session.close()
+
+
+def add(session, *ids, ticker="AAPL"):
+    session.add_all([NewsSentiment(id=i, ticker=ticker, title=f"{ticker} {i}", sentiment="Positive", confidence=0.9,
+                                   created_at=datetime.now()) for i in ids])
+    session.commit()
+
+
+def sent_ids(hub):
+    articles, _ = hub._load_changes({"AAPL"})
+    return [a["id"] for a in articles]
+
+
+def test_late_commit_below_watermark_is_sent_once(session):
+    add(session, 1, 2, 3)
+    hub = live.Hub()
+    hub._start_at_head()
+    assert hub._last_id == 3
+    assert sent_ids(hub) == []
+
+    # id 4 was handed out first but its transaction commits after id 5's
+    add(session, 5)
+    assert sent_ids(hub) == [5]
+    add(session, 4)
+    assert sent_ids(hub) == [4]
+    assert hub._last_id == 5
+    assert sent_ids(hub) == []
+
+
+def test_rescan_window_is_bounded(session, monkeypatch):
+    monkeypatch.setattr(live, "LIVE_RESCAN", 3)
+    add(session, 1)
+    hub = live.Hub()
+    hub._start_at_head()
+    add(session, *range(3, 11))
+    assert sent_ids(hub) == list(range(3, 11))
+    assert hub._seen == {8, 9, 10}
+    # older than the window: a known gap, left to the client's next REST load
+    add(session, 2)
+    assert sent_ids(hub) == []
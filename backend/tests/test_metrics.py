@@ -0,0 +1,22 @@
+# tests/test_metrics.py
+import subprocess
+import sys
+
+from fastapi.testclient import TestClient
+
+from db.migrate import migrate
+
+
+def test_db_layer_does_not_import_metrics():
+    code = "import sys, db.db_connect, db.queries, db.rollup; assert 'metrics' not in sys.modules"
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+def test_requests_count_db_queries(sqlite_db):
+    import main
+    migrate()
+    with TestClient(main.app) as client:
+        response = client.get("/ticker_summary/AAPL")
+    assert response.status_code == 200
+    assert 'db;desc="0 queries"' not in response.headers["Server-Timing"]
+    assert "queries" in response.headers["Server-Timing"]
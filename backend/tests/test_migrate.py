@@ -0,0 +1,33 @@
+# tests/test_migrate.py
+# The API's ticker/date window read must be served by the
+# (lower(ticker), created_at) index once db.migrate has run.
+from datetime import datetime, timedelta
+
+from db.db_connect import SessionLocal
+from db.migrate import migrate, explain_window_query
+from db.models import NewsSentiment
+
+INDEX = "ix_news_sentiment_ticker_lower_created_at"
+
+
+def test_window_query_uses_index(sqlite_db):
+    migrate()
+    session = SessionLocal()
+    start = datetime(2025, 10, 1)
+    session.add_all(
+        NewsSentiment(ticker=t, title=f"{t} {i}", sentiment="Neutral", confidence=0.5,
+                      created_at=start + timedelta(hours=i))
+        for t in ("AAPL", "tsla", "MSFT") for i in range(50)
+    )
+    session.commit()
+    session.close()
+
+    plan = explain_window_query("aapl", start.date())
+    assert any(INDEX in line for line in plan), plan
+    assert not any(line.startswith("SCAN news_sentiment") and "INDEX" not in line for line in plan), plan
+
+
+def test_migrate_is_repeatable(sqlite_db):
+    migrate()
+    migrate()
+    assert any(INDEX in line for line in explain_window_query())
@@ -0,0 +1,55 @@
+# tests/test_pipeline.py
+# run_pipeline_parallel against run_pipeline: same per-ticker results and
+# progress states, and a stop request honoured before any chunk is handed out.
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+import pytest
+
+from db.db_connect import SessionLocal
+from db.migrate import migrate
+from db.models import NewsSentiment
+from db.rollup import rollup_articles
+import run_full_pipeline
+
+START, END = "2025-01-01", "2025-03-01"
+TICKERS = [f"T{i}" for i in range(6)]
+
+
+@pytest.fixture
+def seeded(sqlite_db):
+    migrate()
+    session = SessionLocal()
+    start = datetime(2025, 1, 1)
+    rows = [
+        NewsSentiment(ticker=t, title=f"{t} headline {d}", sentiment=("Positive", "Negative", "Neutral")[(i + d) % 3],
+                      confidence=0.9, created_at=start + timedelta(days=d))
+        for i, t in enumerate(TICKERS) for d in range(50)
+    ]
+    session.add_all(rows)
+    rollup_articles(session, rows)
+    session.commit()
+    session.close()
+    return sqlite_db
+
+
+def test_parallel_matches_sequential(seeded):
+    sequential = {}
+    run_full_pipeline.run_pipeline(START, END, on_progress=lambda t, s, p: sequential.__setitem__(t, (s, p)))
+
+    states = defaultdict(list)
+    results = run_full_pipeline.run_pipeline_parallel(
+        START, END, workers=2, chunk_size=2, on_progress=lambda t, s, p: states[t].append(s))
+
+    assert [t for t, _, _ in results] == sorted(TICKERS)
+    assert {t: (s, p) for t, s, p in results} == sequential
+    assert all(states[t] == ["pending", "running", "done"] for t in TICKERS), dict(states)
+
+
+def test_parallel_stop_before_first_chunk(seeded):
+    states = {}
+    results = run_full_pipeline.run_pipeline_parallel(
+        START, END, workers=2, chunk_size=1, on_progress=lambda t, s, p: states.__setitem__(t, s),
+        should_stop=lambda: True)
+    assert results == []
+    assert set(states.values()) == {"pending"}
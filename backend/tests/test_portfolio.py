@@ -0,0 +1,57 @@
+# tests/test_portfolio.py
+import numpy as np
+import pytest
+
+from run_full_pipeline import _strategy_metrics
+from strategy.engine import run_backtest, roi_pct, BUY
+from strategy.portfolio import simulate_portfolio, portfolio_metrics
+
+
+def test_one_ticker_portfolio_matches_backtest():
+    rng = np.random.default_rng(0)
+    closes = 150 * np.exp(np.cumsum(rng.normal(0, 0.01, 300)))
+    scores = np.clip(rng.normal(0, 0.3, 300), -1, 1)
+
+    single = run_backtest(closes, scores, 0.15, -0.15, 100000.0)
+    portfolio = simulate_portfolio(closes[:, None], scores[:, None], 0.15, -0.15, 100000.0)
+    np.testing.assert_allclose(portfolio["total_value"], single["total_value"], rtol=1e-12)
+
+    # same ROI% convention on both endpoints
+    assert portfolio_metrics(portfolio["total_value"], 100000.0)["ROI%"] == _strategy_metrics(single["total_value"])["ROI%"]
+
+
+def test_roi_is_measured_from_first_bar():
+    assert roi_pct([200.0, 150.0, 250.0]) == pytest.approx(25.0)
+    assert roi_pct([]) == 0.0
+    assert portfolio_metrics(np.array([200.0, 250.0]), 100.0)["ROI%"] == 25.0
+
+
+def test_one_ticker_portfolio_matches_simulate_strategy_window(sqlite_db):
+    from datetime import datetime
+    from db.db_connect import SessionLocal
+    from db.migrate import migrate
+    from db.models import NewsSentiment
+    from db.rollup import rollup_articles
+    from run_full_pipeline import (load_merged, simulate_portfolio as portfolio_endpoint, BUY_THRESHOLD,
+                                   SELL_THRESHOLD, INITIAL_CAPITAL, SIZE_FRACTION)
+
+    migrate()
+    session = SessionLocal()
+    try:
+        rows = [NewsSentiment(ticker="AAPL", title=f"AAPL {d}", sentiment=s, confidence=0.9,
+                              created_at=datetime(2025, 10, d, 12))
+                for d, s in [(2, "Positive"), (5, "Negative"), (8, "Positive"), (10, "Positive")]]
+        session.add_all(rows)
+        rollup_articles(session, rows)
+        session.commit()
+
+        # the end date's (Oct 10) buy signal must count in both or in neither
+        merged = load_merged("AAPL", "2025-10-01", "2025-10-10", session)
+        single = run_backtest(merged["Close"].to_numpy(dtype=float), merged["sentiment_score"].to_numpy(dtype=float),
+                              BUY_THRESHOLD, SELL_THRESHOLD, INITIAL_CAPITAL, SIZE_FRACTION)
+        portfolio = portfolio_endpoint(["AAPL"], "2025-10-01", "2025-10-10", session)
+    finally:
+        session.close()
+    assert portfolio["history"]["date"] == merged["date"].astype(str).tolist()
+    assert portfolio["history"]["total_value"] == [round(v, 2) for v in single["total_value"].tolist()]
+    assert portfolio["trades"]["buys"] == int((single["tx_action"] == BUY).sum())
@@ -0,0 +1,78 @@
+# tests/test_price_cache.py
+from datetime import date
+
+import pandas as pd
+
+from strategy.price_cache import PriceCache
+
+
+class FakeDownloader:
+    """Weekday closes for every requested ticker, or nothing while `failing`"""
+
+    def __init__(self):
+        self.calls = []
+        self.failing = False
+
+    def __call__(self, tickers, start, end):
+        self.calls.append((tuple(tickers), start, end))
+        if self.failing:
+            return {}
+        days = [d.date() for d in pd.bdate_range(start, end, inclusive="left")]
+        return {t: pd.Series([100.0 + i for i in range(len(days))], index=days) for t in tickers}
+
+
+def make_cache(tmp_path, today=date(2025, 6, 30)):
+    downloader = FakeDownloader()
+    return PriceCache(root=str(tmp_path), offline=False, downloader=downloader, today=lambda: today), downloader
+
+
+def test_cached_range_is_not_downloaded_again(tmp_path):
+    cache, downloader = make_cache(tmp_path)
+    first = cache.get("AAPL", "2025-01-01", "2025-02-01")
+    second = cache.get("AAPL", "2025-01-01", "2025-02-01")
+    assert len(downloader.calls) == 1
+    pd.testing.assert_frame_equal(first, second)
+    assert len(first) == 23
+
+
+def test_only_the_gap_is_downloaded(tmp_path):
+    cache, downloader = make_cache(tmp_path)
+    cache.get("AAPL", "2025-01-01", "2025-02-01")
+    cache.get("AAPL", "2025-01-15", "2025-03-01")
+    assert downloader.calls[-1] == (("AAPL",), "2025-02-01", "2025-03-01")
+
+
+def test_failed_download_records_no_coverage(tmp_path):
+    cache, downloader = make_cache(tmp_path)
+    downloader.failing = True
+    assert cache.get("AAPL", "2025-01-01", "2025-02-01").empty
+    assert cache.missing("AAPL", "2025-01-01", "2025-02-01") == [(20089, 20120)]
+
+    downloader.failing = False
+    assert len(cache.get("AAPL", "2025-01-01", "2025-02-01")) == 23
+    assert len(downloader.calls) == 2
+
+
+def test_ticker_missing_from_batch_records_no_coverage(tmp_path):
+    cache, downloader = make_cache(tmp_path)
+    cache.downloader = lambda tickers, start, end: {"AAPL": FakeDownloader()(["AAPL"], start, end)["AAPL"]}
+    out = cache.get_many(["AAPL", "MSFT"], "2025-01-01", "2025-02-01")
+    assert len(out["AAPL"]) == 23 and out["MSFT"].empty
+    assert cache.missing("AAPL", "2025-01-01", "2025-02-01") == []
+    assert cache.missing("MSFT", "2025-01-01", "2025-02-01") != []
+
+
+def test_coverage_stops_at_today(tmp_path):
+    cache, downloader = make_cache(tmp_path, today=date(2025, 1, 15))
+    cache.get("AAPL", "2025-01-01", "2025-02-01")
+    assert cache.missing("AAPL", "2025-01-01", "2025-02-01") == [(20103, 20120)]  # [2025-01-15, 2025-02-01)
+
+    cache.today = lambda: date(2025, 1, 20)
+    cache.get("AAPL", "2025-01-01", "2025-02-01")
+    assert downloader.calls[-1] == (("AAPL",), "2025-01-15", "2025-02-01")
+
+
+def test_put_ignores_empty_frame(tmp_path):
+    cache, _ = make_cache(tmp_path)
+    cache.put("AAPL", pd.DataFrame({"date": [], "Close": []}))
+    assert cache.missing("AAPL", "2025-01-01", "2025-02-01") == [(20089, 20120)]
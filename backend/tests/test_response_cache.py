@@ -0,0 +1,52 @@
+# tests/test_response_cache.py
+# Every writer of the derived tables must invalidate cached responses.
+from datetime import datetime
+
+import pytest
+
+from db.db_connect import SessionLocal
+from db.keywords import rebuild_keyword_index
+from db.migrate import migrate
+from db.models import NewsSentiment
+from db.rollup import rebuild_daily_sentiment
+from response_cache import ResponseCache, MemoryBackend, cache
+
+
+@pytest.fixture
+def session(sqlite_db):
+    migrate()
+    session = SessionLocal()
+    session.add(NewsSentiment(ticker="AAPL", title="Record quarter", sentiment="Positive", confidence=0.9,
+                              created_at=datetime(2025, 10, 2)))
+    session.commit()
+    yield session
+    session.close()
+
+
+def keys():
+    return cache.key("xai", "AAPL", {}), cache.key("xai", "MSFT", {})
+
+
+def test_bump_only_touches_its_tickers():
+    local = ResponseCache(MemoryBackend(), ttl=60)
+    aapl, msft = local.key("xai", "AAPL", {}), local.key("xai", "MSFT", {})
+    local.bump(["aapl"])
+    assert local.key("xai", "AAPL", {}) != aapl
+    assert local.key("xai", "MSFT", {}) == msft
+    local.bump_all()
+    assert local.key("xai", "MSFT", {}) != msft
+
+
+@pytest.mark.parametrize("rebuild", [rebuild_daily_sentiment, rebuild_keyword_index])
+def test_full_rebuild_invalidates_every_ticker(session, rebuild):
+    aapl, msft = keys()
+    rebuild(session)
+    after = keys()
+    assert after[0] != aapl and after[1] != msft
+
+
+@pytest.mark.parametrize("rebuild", [rebuild_daily_sentiment, rebuild_keyword_index])
+def test_ticker_rebuild_invalidates_that_ticker(session, rebuild):
+    aapl, msft = keys()
+    rebuild(session, "aapl")
+    assert keys() == (keys()[0], msft) and keys()[0] != aapl
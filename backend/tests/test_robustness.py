@@ -0,0 +1,46 @@
+# tests/test_robustness.py
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from strategy import robustness
+
+
+@pytest.fixture
+def series():
+    rng = np.random.default_rng(7)
+    prices = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, 120)))
+    scores = rng.normal(0, 0.3, 120)
+    return prices, scores
+
+
+def analyze(series, scenarios, parallel=True):
+    prices, scores = series
+    return robustness.analyze(prices, scores, 0.2, -0.2, 10_000, 0.5, scenarios=scenarios, parallel=parallel)
+
+
+def test_calls_share_one_pool_and_match_serial(series, monkeypatch):
+    monkeypatch.setattr(robustness, "ROBUSTNESS_WORKERS", 2)
+    try:
+        serial = analyze(series, 1500, parallel=False)
+        assert robustness._pool is None
+        assert analyze(series, 1500) == serial
+        pool = robustness._pool
+        # a request with a different number of batches reuses the same pool
+        analyze(series, 2500)
+        assert robustness._pool is pool and pool._max_workers == 2
+    finally:
+        robustness.shutdown()
+    assert robustness._pool is None
+
+
+def test_scenario_cap_counts_every_kind(sqlite_db, monkeypatch):
+    import main
+    monkeypatch.setattr(main, "MAX_ROBUSTNESS_SCENARIOS", 1000)
+    with TestClient(main.app) as client:
+        body = {"ticker": "AAPL", "scenarios": 400, "kinds": ["bootstrap", "noise", "shuffle"]}
+        assert client.post("/robustness", json=body).status_code == 400
+        # repeated kinds only run once
+        body["kinds"] = ["noise", "shuffle", "noise"]
+        response = client.post("/robustness", json=body)
+        assert response.status_code != 400, response.text
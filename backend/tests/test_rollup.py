@@ -0,0 +1,81 @@
+# tests/test_rollup.py
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from db.db_connect import SessionLocal
+from db.migrate import migrate
+from db.models import NewsSentiment
+from db.queries import sentiment_summary
+from db.rollup import rebuild_daily_sentiment, rollup_articles, rollup_in_sync
+
+
+@pytest.fixture
+def session(sqlite_db):
+    migrate()
+    session = SessionLocal()
+    yield session
+    session.close()
+
+
+def articles(n, ticker="AAPL"):
+    start = datetime(2025, 10, 1)
+    return [NewsSentiment(ticker=ticker, title=f"{ticker} {i}", sentiment=("Positive", "Negative", "Neutral")[i % 3],
+                          confidence=0.5 + i / (2 * n), created_at=start + timedelta(hours=7 * i)) for i in range(n)]
+
+
+def test_incremental_rollup_matches_rebuild(session):
+    rows = articles(40) + articles(25, "tsla")
+    session.add_all(rows)
+    rollup_articles(session, rows[:30])
+    rollup_articles(session, rows[30:])
+    session.commit()
+    incremental = {t: sentiment_summary(session, t, date(2025, 10, 1)) for t in ("AAPL", "TSLA")}
+    assert rollup_in_sync(session)
+
+    rebuild_daily_sentiment(session)
+    rebuilt = {t: sentiment_summary(session, t, date(2025, 10, 1)) for t in ("AAPL", "TSLA")}
+    assert incremental["AAPL"]["total_articles"] == 40
+    assert incremental["AAPL"]["daily"] == rebuilt["AAPL"]["daily"]
+    assert incremental["TSLA"]["counts"] == rebuilt["TSLA"]["counts"]
+    assert incremental["TSLA"]["score_sum"] == pytest.approx(rebuilt["TSLA"]["score_sum"])
+
+
+def test_migrate_rebuilds_after_direct_writes(session):
+    session.bulk_insert_mappings(NewsSentiment, [
+        {"ticker": a.ticker, "title": a.title, "sentiment": a.sentiment, "confidence": a.confidence,
+         "created_at": a.created_at} for a in articles(12)
+    ])
+    session.commit()
+    assert not rollup_in_sync(session)
+    assert sentiment_summary(session, "AAPL", date(2025, 10, 1))["total_articles"] == 0
+
+    migrate()
+    session.expire_all()
+    assert rollup_in_sync(session)
+    assert sentiment_summary(session, "AAPL", date(2025, 10, 1))["total_articles"] == 12
+
+
+def test_labels_are_normalised_the_same_everywhere(session):
+    from db.keywords import index_articles, rebuild_keyword_index, top_keywords
+    labels = ["positive", "positive", "NEGATIVE", None, "mixed"]
+    rows = [NewsSentiment(ticker="AAPL", title=f"shared word{i}", sentiment=label, confidence=0.5,
+                          created_at=datetime(2025, 10, 1, i)) for i, label in enumerate(labels)]
+    session.add_all(rows)
+    rollup_articles(session, rows)
+    index_articles(session, rows)
+    session.commit()
+
+    summary = sentiment_summary(session, "AAPL", date(2025, 10, 1))
+    assert summary["counts"] == {"Positive": 2, "Negative": 1, "Neutral": 2}
+    assert summary["score_sum"] == pytest.approx(0.5)
+    # "shared" is in every title, so its keyword score is the day's score_sum
+    keywords = {k["word"]: k["score"] for k in top_keywords(session, "AAPL", date(2025, 10, 1), date(2025, 10, 2))}
+    assert keywords["shared"] == pytest.approx(summary["score_sum"])
+
+    # the SQL rebuild reads labels the same way
+    rebuild_daily_sentiment(session)
+    rebuild_keyword_index(session)
+    assert sentiment_summary(session, "AAPL", date(2025, 10, 1)) == summary
+    assert {k["word"]: k["score"] for k in top_keywords(session, "AAPL", date(2025, 10, 1), date(2025, 10, 2))} \
+        == keywords
@@ -0,0 +1,76 @@
+# tests/test_sentiment_model.py
+import numpy as np
+import pytest
+
+from sentiment import sentiment_model
+from sentiment import export
+
+
+class FakeTokenizer:
+    def __call__(self, texts, truncation=True, max_length=None):
+        ids = [[1] * (len(t) % 5 + 1) for t in texts]
+        return {"input_ids": ids, "attention_mask": [[1] * len(i) for i in ids]}
+
+    def pad(self, features, return_tensors="np"):
+        width = max(len(f["input_ids"]) for f in features)
+        return {k: np.array([f[k] + [0] * (width - len(f[k])) for f in features]) for k in features[0]}
+
+
+class FakeInput:
+    def __init__(self, name):
+        self.name = name
+
+
+class FakeSession:
+    """Stands in for an onnxruntime session; switches the backend after its first batch"""
+
+    def __init__(self):
+        self.batches = 0
+
+    def get_inputs(self):
+        return [FakeInput("input_ids"), FakeInput("attention_mask")]
+
+    def run(self, outputs, feed):
+        self.batches += 1
+        sentiment_model.set_backend("torch")
+        return [np.tile([2.0, 0.0, 0.0], (len(feed["input_ids"]), 1))]
+
+
+@pytest.fixture
+def restore_backend():
+    previous = sentiment_model.backend()
+    yield
+    sentiment_model.set_backend(previous)
+
+
+def test_backend_switch_mid_call_keeps_loaded_model(restore_backend, monkeypatch):
+    session = FakeSession()
+    sentiment_model.set_backend("onnx")
+    monkeypatch.setattr(sentiment_model, "_loaded", ("onnx", FakeTokenizer(), session))
+
+    results = sentiment_model.analyze_batch([f"headline {i}" for i in range(10)], batch_size=2)
+
+    # every batch ran on the ONNX session it started with, not the torch path
+    assert session.batches == 5
+    assert [r["sentiment"] for r in results] == ["Positive"] * 10
+    assert sentiment_model.backend() == "torch" and sentiment_model._loaded is None
+
+
+@pytest.fixture(scope="module")
+def onnx_model(tmp_path_factory):
+    pytest.importorskip("onnxruntime")
+    pytest.importorskip("torch")
+    try:
+        from transformers import AutoTokenizer
+        AutoTokenizer.from_pretrained(sentiment_model.MODEL_NAME)
+    except Exception as e:
+        pytest.skip(f"{sentiment_model.MODEL_NAME} is not available: {e}")
+    return export.export_onnx(str(tmp_path_factory.mktemp("onnx") / "finbert-tone.onnx"))
+
+
+def test_fast_backends_agree_with_fp32_on_fixture(onnx_model, restore_backend, monkeypatch):
+    monkeypatch.setattr(sentiment_model, "ONNX_MODEL_PATH", onnx_model)
+    reports = export.check_parity(("torch-int8", "onnx"))
+    for r in reports:
+        assert r["ok"], r
+    assert {r["backend"] for r in reports} == {"torch", "torch-int8", "onnx"}
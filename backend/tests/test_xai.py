@@ -0,0 +1,83 @@
+# tests/test_xai.py
+# /xai's sentences and keywords read the same window, with `end` as an inclusive date.
+from datetime import datetime
+
+import pytest
+
+from db.db_connect import SessionLocal
+from db.keywords import rebuild_keyword_index, tokenize
+from db.migrate import migrate
+from db.models import NewsSentiment
+import run_full_pipeline
+from run_full_pipeline import generate_xai_sentences, xai_keywords, demo_headlines
+
+START, END = "2025-10-01", "2025-11-12"
+
+
+@pytest.fixture
+def session(sqlite_db):
+    migrate()
+    session = SessionLocal()
+    session.add_all([
+        NewsSentiment(ticker="AAPL", title="Before window rally", sentiment="Positive", confidence=0.9,
+                      created_at=datetime(2025, 9, 30, 23, 0)),
+        NewsSentiment(ticker="AAPL", title="Record earnings beat", sentiment="Positive", confidence=0.9,
+                      created_at=datetime(2025, 10, 2, 9, 0)),
+        NewsSentiment(ticker="AAPL", title="Regulator probe widens", sentiment="Negative", confidence=0.8,
+                      created_at=datetime(2025, 11, 12, 15, 30)),
+        NewsSentiment(ticker="AAPL", title="After window slump", sentiment="Negative", confidence=0.9,
+                      created_at=datetime(2025, 11, 13, 0, 0)),
+    ])
+    session.commit()
+    yield session
+    session.close()
+
+
+def test_sentences_include_the_whole_end_day(session):
+    sentences = generate_xai_sentences("AAPL", START, END, session)
+    assert len(sentences) == 2
+    assert "Record earnings beat" in sentences[0] and "Regulator probe widens" in sentences[1]
+
+
+def test_sentences_unbounded_by_default(session):
+    session.add_all(NewsSentiment(ticker="AAPL", title=f"Headline {i}", sentiment="Neutral", confidence=0.5,
+                                  created_at=datetime(2025, 10, 20, 0, i)) for i in range(30))
+    session.commit()
+    assert len(generate_xai_sentences("AAPL", START, END, session)) == 32
+    latest = generate_xai_sentences("AAPL", START, END, session, max_sentences=5)
+    assert len(latest) == 5 and "Regulator probe widens" in latest[-1]
+
+
+def test_xai_endpoint_caps_sentences(session, monkeypatch):
+    import main
+    session.add_all(NewsSentiment(ticker="AAPL", title=f"Headline {i}", sentiment="Neutral", confidence=0.5,
+                                  created_at=datetime(2025, 10, 20, 0, i)) for i in range(30))
+    session.commit()
+    monkeypatch.setattr(main, "XAI_MAX_SENTENCES", 4)
+    sentences = main._explain_ticker("AAPL", session)["explanations"]
+    assert len(sentences) == 4 and "Regulator probe widens" in sentences[-1]
+
+
+def test_keywords_match_sentence_window(session):
+    rebuild_keyword_index(session)
+    words = {k["word"] for k in xai_keywords("AAPL", START, END, session)}
+    assert {"record", "probe"} <= words
+    assert not words & {"before", "after", "rally", "slump"}
+
+
+def test_keywords_from_articles_when_not_indexed(session):
+    words = {k["word"]: k["score"] for k in xai_keywords("AAPL", START, END, session)}
+    assert words["record"] == pytest.approx(0.9)
+    assert words["probe"] == pytest.approx(-0.8)
+    assert "rally" not in words
+
+
+def test_keyword_fallback_reads_latest_articles_only(session, monkeypatch):
+    monkeypatch.setattr(run_full_pipeline, "XAI_KEYWORD_FALLBACK_ROWS", 1)
+    words = {k["word"] for k in xai_keywords("AAPL", START, END, session)}
+    assert "probe" in words and "record" not in words
+
+
+def test_demo_keywords_only_without_articles(session):
+    words = {k["word"] for k in xai_keywords("MSFT", START, END, session)}
+    assert words and words <= {w for h in demo_headlines("MSFT") for w in tokenize(h)}
@@ -40,3 +40,20 @@ export async function fetchXAI(ticker: string) {
 		keywords: data.keywords || []
 	};
 }
+
+export type LiveHandlers = {
+	onSnapshot?: (data: { aggregates: any[] }) => void;
+	onUpdate?: (data: { articles: any[]; aggregates: any[] }) => void;
+	// the stream dropped updates for this client; refetch over REST
+	onResync?: () => void;
+};
+
+// Server-sent events for new articles and rolling aggregates, instead of polling.
+// Returns a function that closes the stream.
+export function subscribeLive(tickers: string[], handlers: LiveHandlers) {
+	const source = new EventSource(`${API_BASE}/stream?tickers=${encodeURIComponent(tickers.join(","))}`);
+	source.addEventListener("snapshot", (e) => handlers.onSnapshot?.(JSON.parse((e as MessageEvent).data)));
+	source.addEventListener("update", (e) => handlers.onUpdate?.(JSON.parse((e as MessageEvent).data)));
+	source.addEventListener("resync", () => handlers.onResync?.());
+	return () => source.close();
+}